@@ -0,0 +1,289 @@
+# analytics.py
+"""관리자 대시보드용 메시지 통계 (일별 집계 테이블 message_stats_daily)
+
+- 부서별 / 채팅방별 / 일별 메시지 수, 활성 사용자 수, 첨부파일 수·용량을 미리 집계해 두고
+  /api/admin/stats 는 집계 테이블만 읽는다 (messages 전체 집계 없음)
+- 백그라운드 작업이 마지막으로 반영한 메시지 id(high-water mark, job_checkpoints 'analytics.messages')
+  이후의 메시지만 배치로 읽어 증분 반영 → 집계 반영과 high-water mark 갱신은 같은 트랜잭션
+  (체크포인트 행을 잠그므로 여러 워커 프로세스가 동시에 돌아도 같은 메시지를 두 번 세지 않음)
+- id 는 INSERT 시점에, 행이 보이는 건 commit 시점이라 늦게 commit 된 작은 id 를 건너뛰지 않도록
+  ANALYTICS_GRACE_SECONDS 보다 오래된 메시지까지만 반영
+- 보낸 메시지 수 기준 (나중에 삭제되어도 빼지 않음), 날짜는 ANALYTICS_UTC_OFFSET_HOURS 기준 (기본 KST)
+
+환경 변수
+    ANALYTICS_ENABLED=1             백그라운드 집계 실행 여부
+    ANALYTICS_INTERVAL=60           실행 주기(초)
+    ANALYTICS_BATCH_SIZE=5000       배치당 메시지 수
+    ANALYTICS_BATCHES_PER_RUN=20    1회 실행당 최대 배치 수 (나머지는 다음 실행에서 이어서)
+    ANALYTICS_GRACE_SECONDS=60
+    ANALYTICS_UTC_OFFSET_HOURS=9
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from db import db
+from metrics import ANALYTICS_ROLLUP
+from models import JobCheckpoint, Message, MessageStat, User
+from attachments import owner_names, room_owner
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT = 'analytics.messages'
+DIMENSIONS = ('all', 'department', 'room', 'user')
+MAX_RANGE_DAYS = 366
+
+_options = {'batch_size': 5000, 'grace_seconds': 60, 'utc_offset_hours': 9}
+
+
+def local_today():
+    return (datetime.utcnow() + timedelta(hours=_options['utc_offset_hours'])).date()
+
+
+# ---------------------------------------------------------------------------
+# 증분 집계
+# ---------------------------------------------------------------------------
+
+def _lock_checkpoint():
+    """high-water mark 행을 잠가서 반환 (없으면 0 으로 생성)"""
+    query = JobCheckpoint.query.filter_by(name=CHECKPOINT).with_for_update()
+    row = query.first()
+    if row is None:
+        try:
+            with db.session.begin_nested():
+                db.session.add(JobCheckpoint(name=CHECKPOINT, position='0', updated_at=datetime.utcnow()))
+        except IntegrityError:
+            pass  # 다른 워커가 먼저 만듦
+        row = query.first()
+    return row
+
+
+def _apply(deltas):
+    """{(dimension, day, key): [messages, files, file_bytes]} 를 집계 테이블에 더함 (commit 은 호출한 쪽)"""
+    by_dimension = defaultdict(set)
+    for dimension, day, key in deltas:
+        by_dimension[dimension].add((day, key))
+
+    existing = {}
+    for dimension, pairs in by_dimension.items():
+        rows = MessageStat.query.filter(
+            MessageStat.dimension == dimension,
+            MessageStat.day.in_({day for day, _ in pairs}),
+            MessageStat.key.in_({key for _, key in pairs}),
+        )
+        existing.update({(r.dimension, r.day, r.key): r for r in rows})
+
+    for pk, (messages, files, file_bytes) in deltas.items():
+        row = existing.get(pk)
+        if row is None:
+            dimension, day, key = pk
+            db.session.add(MessageStat(dimension=dimension, day=day, key=key, messages=messages,
+                                       files=files, file_bytes=file_bytes))
+            continue
+        row.messages += messages
+        row.files += files
+        row.file_bytes += file_bytes
+
+
+def rollup_batch(batch_size=None, grace_seconds=None):
+    """high-water mark 이후 메시지를 최대 batch_size 건 반영하고 commit → 반영한 메시지 수 (0 = 따라잡음)"""
+    batch_size = batch_size or _options['batch_size']
+    grace_seconds = _options['grace_seconds'] if grace_seconds is None else grace_seconds
+    checkpoint = _lock_checkpoint()
+    high_water = int(checkpoint.position or 0)
+    rows = (
+        db.session.query(Message.id, Message.timestamp, Message.sender_uuid, Message.room_uuid,
+                         Message.conversation_id, Message.file_path, Message.file_size, User.department)
+        .outerjoin(User, User.user_uuid == Message.sender_uuid)
+        .filter(Message.id > high_water)
+        .order_by(Message.id)
+        .limit(batch_size)
+        .all()
+    )
+
+    cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    offset = timedelta(hours=_options['utc_offset_hours'])
+    deltas = defaultdict(lambda: [0, 0, 0])
+    last_id = high_water
+    for r in rows:
+        if r.timestamp is not None and r.timestamp > cutoff:
+            break  # 이후 메시지는 다음 실행에서 (아직 commit 되지 않은 앞 id 가 있을 수 있음)
+        day = ((r.timestamp or datetime.utcnow()) + offset).date()
+        has_file = 1 if r.file_path else 0
+        size = r.file_size or 0
+        keys = [('all', ''), ('department', r.department or ''), ('user', r.sender_uuid or '')]
+        owner = room_owner(room_uuid=r.room_uuid, conversation_id=r.conversation_id)
+        if owner:
+            keys.append(('room', owner))
+        for dimension, key in keys:
+            delta = deltas[(dimension, day, key)]
+            delta[0] += 1
+            delta[1] += has_file
+            delta[2] += size
+        last_id = r.id
+
+    processed = sum(v[0] for (dimension, _, _), v in deltas.items() if dimension == 'all')
+    if not processed:
+        db.session.rollback()  # 체크포인트 잠금 해제
+        return 0
+
+    _apply(deltas)
+    checkpoint.position = str(last_id)
+    checkpoint.updated_at = datetime.utcnow()
+    db.session.commit()
+    ANALYTICS_ROLLUP.inc(processed)
+    return processed
+
+
+def run_rollup(max_batches=20, should_continue=lambda: True):
+    """따라잡을 때까지 (최대 max_batches 배치) 반영 → 반영한 메시지 수"""
+    total = 0
+    for _ in range(max_batches):
+        if not should_continue():
+            break
+        processed = rollup_batch()
+        total += processed
+        if processed < _options['batch_size']:
+            break
+    if total:
+        logger.info("📊 메시지 통계 집계", extra={'messages': total})
+    return total
+
+
+def rebuild():
+    """집계 테이블을 비우고 high-water mark 를 0 으로 (다음 실행부터 처음부터 다시 집계)"""
+    checkpoint = _lock_checkpoint()
+    MessageStat.query.delete(synchronize_session=False)
+    checkpoint.position = '0'
+    checkpoint.updated_at = datetime.utcnow()
+    db.session.commit()
+
+
+# ---------------------------------------------------------------------------
+# 조회 (집계 테이블만 읽음)
+# ---------------------------------------------------------------------------
+
+def parse_range(args):
+    """?from=YYYY-MM-DD&to=YYYY-MM-DD (포함, 기본 최근 30일) → (since, until), 잘못되면 ValueError"""
+    try:
+        until = date.fromisoformat(args['to']) if args.get('to') else local_today()
+        since = date.fromisoformat(args['from']) if args.get('from') else until - timedelta(days=29)
+    except ValueError:
+        raise ValueError('from / to 는 YYYY-MM-DD 형식이어야 합니다.')
+    if since > until:
+        raise ValueError('from 이 to 보다 늦습니다.')
+    if (until - since).days >= MAX_RANGE_DAYS:
+        raise ValueError(f'최대 {MAX_RANGE_DAYS}일까지 조회할 수 있습니다.')
+    return since, until
+
+
+def _totals(dimension, since, until):
+    return (
+        db.session.query(MessageStat.key, func.sum(MessageStat.messages), func.sum(MessageStat.files),
+                         func.sum(MessageStat.file_bytes))
+        .filter(MessageStat.dimension == dimension, MessageStat.day >= since, MessageStat.day <= until)
+        .group_by(MessageStat.key)
+    )
+
+
+def _counts(messages, files, file_bytes):
+    return {'messages': int(messages or 0), 'files': int(files or 0), 'file_bytes': int(file_bytes or 0)}
+
+
+def stats(since, until, top=20):
+    """기간(since ~ until, 포함) 통계 - 일별 / 부서별 / 상위 채팅방 / 활성 사용자"""
+    in_range = (MessageStat.day >= since, MessageStat.day <= until)
+    daily = {
+        day: {'day': day.isoformat(), **_counts(m, f, b), 'active_users': 0}
+        for day, m, f, b in db.session.query(
+            MessageStat.day, MessageStat.messages, MessageStat.files, MessageStat.file_bytes
+        ).filter(MessageStat.dimension == 'all', *in_range)
+    }
+    active = (
+        db.session.query(MessageStat.day, func.count(MessageStat.key))
+        .filter(MessageStat.dimension == 'user', *in_range)
+        .group_by(MessageStat.day)
+    )
+    for day, n in active:
+        if day in daily:
+            daily[day]['active_users'] = n
+    active_users = (
+        db.session.query(func.count(func.distinct(MessageStat.key)))
+        .filter(MessageStat.dimension == 'user', *in_range)
+        .scalar()
+    )
+
+    departments = [
+        {'department': key or None, **_counts(m, f, b)}
+        for key, m, f, b in _totals('department', since, until).order_by(func.sum(MessageStat.messages).desc())
+    ]
+    rooms = _totals('room', since, until).order_by(func.sum(MessageStat.messages).desc()).limit(top).all()
+    names = owner_names('room', [key for key, *_ in rooms])
+
+    checkpoint = db.session.get(JobCheckpoint, CHECKPOINT)
+    days = [daily[d] for d in sorted(daily)]
+    return {
+        'from': since.isoformat(),
+        'to': until.isoformat(),
+        'totals': {
+            'messages': sum(d['messages'] for d in days),
+            'files': sum(d['files'] for d in days),
+            'file_bytes': sum(d['file_bytes'] for d in days),
+            'active_users': active_users or 0,
+        },
+        'daily': days,
+        'departments': departments,
+        'rooms': [{'room': key, 'name': names.get(key), **_counts(m, f, b)} for key, m, f, b in rooms],
+        'high_water_mark': int(checkpoint.position or 0) if checkpoint else 0,
+        'updated_at': checkpoint.updated_at.isoformat() if checkpoint and checkpoint.updated_at else None,
+    }
+
+
+# ---------------------------------------------------------------------------
+# 백그라운드 실행 / CLI
+# ---------------------------------------------------------------------------
+
+def init_analytics(app):
+    """ANALYTICS_* 설정 + 백그라운드 집계 시작 (ANALYTICS_ENABLED)"""
+    _options.update(
+        batch_size=app.config.get('ANALYTICS_BATCH_SIZE', 5000),
+        grace_seconds=app.config.get('ANALYTICS_GRACE_SECONDS', 60),
+        utc_offset_hours=app.config.get('ANALYTICS_UTC_OFFSET_HOURS', 9),
+    )
+    if not app.config.get('ANALYTICS_ENABLED'):
+        return None
+
+    interval = app.config.get('ANALYTICS_INTERVAL', 60)
+    max_batches = app.config.get('ANALYTICS_BATCHES_PER_RUN', 20)
+
+    def _loop():
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                try:
+                    run_rollup(max_batches)
+                except Exception:
+                    logger.exception("❌ 메시지 통계 집계 실패")
+                    db.session.rollback()
+
+    thread = threading.Thread(target=_loop, name='analytics-rollup', daemon=True)
+    thread.start()
+    return thread
+
+
+@click.command('analytics-rollup')
+@click.option('--rebuild', 'full_rebuild', is_flag=True, help='집계를 비우고 처음부터 다시 집계')
+@with_appcontext
+def analytics_command(full_rebuild):
+    """메시지 통계 집계를 최신으로 (high-water mark 이후 메시지 반영)"""
+    if full_rebuild:
+        rebuild()
+    total = run_rollup(max_batches=10 ** 9)
+    click.echo(f"✅ 메시지 {total}건 반영")
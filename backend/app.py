@@ -1,39 +1,179 @@
+from gevent import monkey
+monkey.patch_all()  # ✅ 소켓 I/O(PyMySQL 등)가 다른 greenlet을 막지 않도록 가장 먼저 패치
+
 from flask import Flask
-from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_migrate import Migrate
 from flask_socketio import SocketIO
 import os
+import logging
+from datetime import timedelta
 from dotenv import load_dotenv
 from db import db
-from sockets import register_socket_events
+from sockets import register_socket_events, connections
 from routes import register_routes
+from json_provider import init_json_provider
+from compression import init_compression
+from db_pool import resolve_database_uri, build_engine_options
+from db_routing import replica_binds, init_db_routing
+from metrics import init_metrics
+from query_budget import init_query_inspector
+from seed import seed_command
+from logging_setup import setup_logging
+from room_cache import init_room_cache
+from tombstones import init_purger, purge_command
+from storage import init_storage
+from attachments import init_attachment_gc, gc_attachments_command
+from export import export_command
+from analytics import init_analytics, analytics_command
+from jobs import init_jobs
+from fanout import init_fanout
+from delivery import init_delivery
+from payloads import init_payloads
+from rate_limit import init_rate_limit
+from read_status import init_read_status
+from tokens import CachingJWTManager, init_tokens
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '../.env'))
 
 socketio = SocketIO(cors_allowed_origins="*", async_mode='gevent')  # ✅ gevent 사용
-jwt = JWTManager()
+jwt = CachingJWTManager()  # ✅ 서명 검증 결과 캐시 + 폐기된 토큰 거절 (tokens)
+logger = logging.getLogger(__name__)
 
 def create_app():
+    setup_logging()  # ✅ 구조화 로그 + 백그라운드 writer (LOG_LEVEL, LOG_LEVELS, LOG_FORMAT)
     app = Flask(__name__)
 
     base_url = os.environ.get('REACT_APP_REA_BASE')
     if not base_url:
         raise ValueError("❌ REACT_APP_REA_BASE 환경 변수가 설정되지 않았습니다.")
 
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'mysql://root:@localhost/hi_msg_db'
+    # ✅ DB 접속 정보 / 커넥션 풀 옵션은 환경 변수로 설정 (DATABASE_URL, DB_DRIVER, DB_POOL_*)
+    app.config['SQLALCHEMY_DATABASE_URI'] = resolve_database_uri()
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    # ✅ 읽기 replica (DATABASE_REPLICA_URLS=url1,url2) + 쓰기 직후 primary 고정 시간 / 허용 복제 지연
+    app.config['SQLALCHEMY_BINDS'] = replica_binds()
+    app.config['DB_STICKY_SECONDS'] = float(os.environ.get('DB_STICKY_SECONDS', 5))
+    app.config['DB_REPLICA_MAX_LAG'] = float(os.environ.get('DB_REPLICA_MAX_LAG', 10))
+    app.config['DB_REPLICA_CHECK_INTERVAL'] = float(os.environ.get('DB_REPLICA_CHECK_INTERVAL', 5))
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['JWT_SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY')
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(seconds=int(os.environ.get('JWT_ACCESS_TOKEN_SECONDS', 3600)))
+    # ✅ JWT 검증 캐시 크기 (0 = 사용 안 함) / 다른 프로세스의 토큰 폐기를 다시 읽는 주기(초)
+    app.config['JWT_CACHE_SIZE'] = int(os.environ.get('JWT_CACHE_SIZE', 10000))
+    app.config['JWT_REVOCATION_REFRESH'] = int(os.environ.get('JWT_REVOCATION_REFRESH', 30))
+    app.config['JSON_PROVIDER'] = os.environ.get('JSON_PROVIDER', 'orjson')
+    app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    # ✅ 디버그/테스트용 요청별 SQL 기록 (N+1 감지, @query_budget 검사)
+    app.config['QUERY_DEBUG'] = os.environ.get('QUERY_DEBUG', '0') == '1'
+    app.config['N_PLUS_ONE_THRESHOLD'] = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 5))
+    # 예산 초과 / N+1 시 예외 (1 / 0, 지정하지 않으면 app.testing 일 때만)
+    strict = os.environ.get('QUERY_BUDGET_STRICT')
+    app.config['QUERY_BUDGET_STRICT'] = None if strict is None else strict == '1'
+    # ✅ 채팅방 목록 캐시 (기본: 프로세스 메모리, ROOM_CACHE_URL=redis://... 이면 공유)
+    app.config['ROOM_CACHE_URL'] = os.environ.get('ROOM_CACHE_URL')
+    app.config['ROOM_CACHE_TTL'] = int(os.environ.get('ROOM_CACHE_TTL', 300))
+    # ✅ soft delete 된 메시지 / 채팅방 백그라운드 정리 (PURGE_HOURS=20-7 → 업무 시간 제외)
+    app.config['PURGE_ENABLED'] = os.environ.get('PURGE_ENABLED', '1') == '1'
+    app.config['PURGE_INTERVAL'] = float(os.environ.get('PURGE_INTERVAL', 60))
+    app.config['PURGE_BATCH_SIZE'] = int(os.environ.get('PURGE_BATCH_SIZE', 200))
+    app.config['PURGE_BATCH_PAUSE'] = float(os.environ.get('PURGE_BATCH_PAUSE', 0.5))
+    app.config['PURGE_HOURS'] = os.environ.get('PURGE_HOURS', '0-24')
+    # ✅ 첨부파일 저장소 (local | s3) - S3 호환 저장소는 S3_ENDPOINT_URL 로 MinIO 등 지정
+    app.config['STORAGE_BACKEND'] = os.environ.get('STORAGE_BACKEND', 'local')
+    app.config['STORAGE_LOCAL_ROOT'] = os.environ.get('STORAGE_LOCAL_ROOT')
+    app.config['S3_BUCKET'] = os.environ.get('S3_BUCKET')
+    app.config['S3_PREFIX'] = os.environ.get('S3_PREFIX', '')
+    app.config['S3_ENDPOINT_URL'] = os.environ.get('S3_ENDPOINT_URL')
+    app.config['S3_REGION'] = os.environ.get('S3_REGION')
+    app.config['S3_MULTIPART_THRESHOLD'] = int(os.environ.get('S3_MULTIPART_THRESHOLD', 8 * 1024 * 1024))
+    app.config['S3_MULTIPART_CHUNKSIZE'] = int(os.environ.get('S3_MULTIPART_CHUNKSIZE', 8 * 1024 * 1024))
+    # ✅ 고아 첨부파일 GC (체크포인트에서 이어서 배치 탐색) / 사용량 한도 (0 = 무제한)
+    app.config['ATTACHMENT_GC_ENABLED'] = os.environ.get('ATTACHMENT_GC_ENABLED', '1') == '1'
+    app.config['ATTACHMENT_GC_INTERVAL'] = float(os.environ.get('ATTACHMENT_GC_INTERVAL', 300))
+    app.config['ATTACHMENT_GC_BATCH_SIZE'] = int(os.environ.get('ATTACHMENT_GC_BATCH_SIZE', 500))
+    app.config['ATTACHMENT_GC_BATCHES_PER_RUN'] = int(os.environ.get('ATTACHMENT_GC_BATCHES_PER_RUN', 20))
+    app.config['ATTACHMENT_GC_GRACE_SECONDS'] = int(os.environ.get('ATTACHMENT_GC_GRACE_SECONDS', 3600))
+    app.config['ATTACHMENT_QUOTA_USER_BYTES'] = int(os.environ.get('ATTACHMENT_QUOTA_USER_MB', 0)) * 1024 * 1024
+    app.config['ATTACHMENT_QUOTA_ROOM_BYTES'] = int(os.environ.get('ATTACHMENT_QUOTA_ROOM_MB', 0)) * 1024 * 1024
+    # ✅ 백그라운드 작업 (memory | db) - API 는 핵심 쓰기만 commit 하고 후속 작업은 worker 가 처리
+    app.config['JOBS_BACKEND'] = os.environ.get('JOBS_BACKEND', 'memory')
+    app.config['JOBS_WORKERS'] = int(os.environ.get('JOBS_WORKERS', 4))
+    app.config['JOBS_POLL_INTERVAL'] = float(os.environ.get('JOBS_POLL_INTERVAL', 1.0))
+    app.config['JOBS_LEASE_SECONDS'] = int(os.environ.get('JOBS_LEASE_SECONDS', 600))
+    app.config['JOBS_RETENTION_HOURS'] = int(os.environ.get('JOBS_RETENTION_HOURS', 24))
+    app.config['JOBS_HISTORY'] = int(os.environ.get('JOBS_HISTORY', 1000))
+    # ✅ 소켓 fan-out: 접속 대상이 CHUNK_SIZE 를 넘는 방은 청크로 나눠 백그라운드 전송
+    app.config['FANOUT_CHUNK_SIZE'] = int(os.environ.get('FANOUT_CHUNK_SIZE', 200))
+    app.config['FANOUT_MAX_CONCURRENT_CHUNKS'] = int(os.environ.get('FANOUT_MAX_CONCURRENT_CHUNKS', 4))
+    # 느린 수신자: 송신 대기열이 이 크기 이상이면 이벤트 보류 / 버림 (0 = 제한 없음)
+    app.config['SOCKET_OUTBOUND_MAX_QUEUE'] = int(os.environ.get('SOCKET_OUTBOUND_MAX_QUEUE', 256))
+    # ✅ 채팅 메시지 전송 확인: ack 가 없으면 대기 시간을 2배씩 늘려 재전송, 사용자별 ack 대기 전송 수 제한
+    app.config['SOCKET_ACK_TIMEOUT'] = float(os.environ.get('SOCKET_ACK_TIMEOUT', 2.0))
+    app.config['SOCKET_ACK_MAX_ATTEMPTS'] = int(os.environ.get('SOCKET_ACK_MAX_ATTEMPTS', 4))
+    app.config['SOCKET_ACK_WINDOW'] = int(os.environ.get('SOCKET_ACK_WINDOW', 64))
+    # ✅ 소켓 압축 전송: 협상한 클라이언트에는 BATCH_INTERVAL 동안 모은 이벤트를 MessagePack frame 하나로
+    app.config['SOCKET_COMPACT_ENABLED'] = os.environ.get('SOCKET_COMPACT_ENABLED', '1') == '1'
+    app.config['SOCKET_BATCH_INTERVAL_MS'] = int(os.environ.get('SOCKET_BATCH_INTERVAL_MS', 10))
+    # ✅ 그룹 채팅방 읽음 표시: 같은 방을 이 시간 안에 다시 표시하면 모아서 기록 (0 = 매번 기록)
+    app.config['READ_STATUS_DEBOUNCE_SECONDS'] = float(os.environ.get('READ_STATUS_DEBOUNCE_SECONDS', 5))
+    # ✅ 대화 내보내기: server-side cursor 로 한 번에 가져오는 행 수
+    app.config['EXPORT_BATCH_SIZE'] = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+    # ✅ 관리자 통계: high-water mark 이후 메시지만 주기적으로 일별 집계 테이블에 반영
+    app.config['ANALYTICS_ENABLED'] = os.environ.get('ANALYTICS_ENABLED', '1') == '1'
+    app.config['ANALYTICS_INTERVAL'] = float(os.environ.get('ANALYTICS_INTERVAL', 60))
+    app.config['ANALYTICS_BATCH_SIZE'] = int(os.environ.get('ANALYTICS_BATCH_SIZE', 5000))
+    app.config['ANALYTICS_BATCHES_PER_RUN'] = int(os.environ.get('ANALYTICS_BATCHES_PER_RUN', 20))
+    app.config['ANALYTICS_GRACE_SECONDS'] = int(os.environ.get('ANALYTICS_GRACE_SECONDS', 60))
+    app.config['ANALYTICS_UTC_OFFSET_HOURS'] = float(os.environ.get('ANALYTICS_UTC_OFFSET_HOURS', 9))
+
+    # ✅ /metrics 접근 제한: METRICS_TOKEN 이 있으면 'Authorization: Bearer <토큰>', 없으면 METRICS_ALLOW_IPS 에서만
+    # (reverse proxy 뒤라면 proxy 에서 /metrics 를 막고 수집기는 앱 포트로 직접)
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+    app.config['METRICS_ALLOW_IPS'] = [
+        ip.strip() for ip in os.environ.get('METRICS_ALLOW_IPS', '127.0.0.1,::1').split(',') if ip.strip()
+    ]
+
+    # ✅ 요청 제한 (토큰 버킷 "초당 개수,최대 연속" - 설정하지 않으면 rate_limit.DEFAULT_LIMITS)
+    app.config['RATE_LIMIT_ENABLED'] = os.environ.get('RATE_LIMIT_ENABLED', '1') == '1'
+    for name in ('SOCKET_CHAT', 'SOCKET_AUTH', 'SOCKET_AUTH_IP', 'API_WRITE', 'API_AUTH'):
+        app.config[f'RATE_LIMIT_{name}'] = os.environ.get(f'RATE_LIMIT_{name}')
+
+    # ✅ 대용량 응답용 JSON 직렬화 / 압축
+    init_json_provider(app)
+    init_compression(app)
+    init_storage(app)
 
     db.init_app(app)
     jwt.init_app(app)
     Migrate(app, db)
+    app.cli.add_command(seed_command)  # ✅ flask seed (벤치마크용 대용량 데이터)
+    app.cli.add_command(purge_command)  # ✅ flask purge-deleted (soft delete 즉시 정리)
+    app.cli.add_command(gc_attachments_command)  # ✅ flask gc-attachments (고아 첨부파일 정리)
+    app.cli.add_command(export_command)  # ✅ flask export-messages (대화 내보내기)
+    app.cli.add_command(analytics_command)  # ✅ flask analytics-rollup (관리자 통계 집계)
     CORS(app, resources={r"/api/*": {"origins": base_url}}, supports_credentials=True)
     socketio.init_app(app)
+    init_room_cache(app, socketio, connections)
+    init_fanout(app, socketio)
+    init_delivery(app, socketio, connections)
+    init_payloads(app, socketio, connections)
+    init_rate_limit(app)
 
     with app.app_context():
-        from models import User, Message, MessageRead, ChatRoom, ChatRoomMember, PasswordResetRequest, GroupChatReadStatus
+        from models import User, Message, MessageRead, ChatRoom, ChatRoomMember, PasswordResetRequest, GroupChatReadStatus, DirectConversation, AttachmentUsage, JobCheckpoint, Job, DirectoryChange, MessageStat
         db.create_all()
+        # ✅ 라우트별 지연 / SQL 카운터 / 소켓 접속 수 → /metrics
+        init_metrics(app, db.engine, connections)
+        init_query_inspector(app, db.engines.values())
+        init_db_routing(app, db)
+        init_tokens(app, socketio, connections)
+
+    init_purger(app)
+    init_attachment_gc(app)
+    init_jobs(app)
+    init_read_status(app)
+    init_analytics(app)
 
     register_routes(app)
     register_socket_events(socketio)
@@ -43,7 +183,7 @@ def create_app():
 
 if __name__ == '__main__':
     app = create_app()
-    print("✅ 서버 실행 시작")
+    logger.info("✅ 서버 실행 시작")
     socketio.run(app, host='0.0.0.0', port=5050, debug=True)
 # app.py 마지막 줄 근처에 추가
 app = create_app()
\ No newline at end of file
@@ -0,0 +1,124 @@
+# approvals.py
+"""관리자 승인 대기열 (가입 승인 / 비밀번호 재설정 요청)
+
+- 목록: 한 번의 조회(재설정 요청은 users 와 join)로 한 페이지씩, id 기준 keyset 페이지
+  (cursor = 이전 페이지 마지막 id → OFFSET 없이 대기열이 커져도 같은 비용)
+- 일괄 처리: id 목록을 받아 UPDATE ... WHERE id IN (...) AND <아직 대기 중> 한 문장
+  → 이미 처리된 항목은 건너뛰고 실제로 바뀐 수를 반환
+"""
+import logging
+from datetime import datetime
+
+from sqlalchemy import func
+
+from db import db
+from models import PasswordResetRequest, User
+import directory
+
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 200
+MAX_BULK_IDS = 1000
+RESET_STATUSES = ('pending', 'approved', 'rejected')
+
+
+def parse_ids(data):
+    """요청 본문 {'ids': [...]} → 정수 id 목록 (중복 제거), 형식이 틀리면 ValueError"""
+    ids = (data or {}).get('ids')
+    if not isinstance(ids, list) or not ids:
+        raise ValueError('ids 목록이 필요합니다.')
+    if len(ids) > MAX_BULK_IDS:
+        raise ValueError(f'한 번에 최대 {MAX_BULK_IDS}건까지 처리할 수 있습니다.')
+    try:
+        return sorted({int(i) for i in ids})
+    except (TypeError, ValueError):
+        raise ValueError('ids 는 정수 목록이어야 합니다.')
+
+
+def _pending_users():
+    return db.session.query(User).filter(User.is_approved == False, User.is_rejected == False)
+
+
+def pending_users_page(limit=50, cursor=None):
+    """가입 승인 대기 사용자 (오래된 순) → {'items', 'next_cursor', 'total'}"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = (
+        db.session.query(User.id, User.name, User.username, User.email, User.department,
+                         User.position, User.created_at)
+        .filter(User.is_approved == False, User.is_rejected == False)
+    )
+    if cursor:
+        query = query.filter(User.id > cursor)
+    rows = query.order_by(User.id).limit(limit + 1).all()
+    total = _pending_users().with_entities(func.count(User.id)).scalar()
+    items = [{
+        'id': u.id,
+        'name': u.name,
+        'username': u.username,
+        'email': u.email,
+        'department': u.department,
+        'position': u.position,
+        'created_at': u.created_at.isoformat() if u.created_at else None,
+    } for u in rows[:limit]]
+    return {
+        'items': items,
+        'next_cursor': rows[limit - 1].id if len(rows) > limit else None,
+        'total': total,
+    }
+
+
+def set_users_status(ids, approve):
+    """가입 대기 중인 사용자 일괄 승인 / 반려 (commit 은 호출한 쪽) → 바뀐 수"""
+    pending = _pending_users().filter(User.id.in_(ids))
+    # 사용자 목록 버전 기록용 uuid (잠금을 걸어 UPDATE 대상과 같은 행)
+    user_uuids = [u for (u,) in pending.with_entities(User.user_uuid).with_for_update().order_by(User.id)]
+    if not user_uuids:
+        return 0
+    values = {'is_approved': True} if approve else {'is_rejected': True}
+    updated = (
+        db.session.query(User)
+        .filter(User.user_uuid.in_(user_uuids), User.is_approved == False, User.is_rejected == False)
+        .update(values, synchronize_session=False)
+    )
+    directory.record_changes(user_uuids)
+    return updated
+
+
+def reset_requests_page(status='pending', limit=50, cursor=None):
+    """비밀번호 재설정 요청 (최근 순, users join) → {'items', 'next_cursor', 'total'}"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = (
+        db.session.query(PasswordResetRequest, User.name, User.email)
+        .outerjoin(User, User.user_uuid == PasswordResetRequest.user_uuid)
+        .filter(PasswordResetRequest.status == status)
+    )
+    if cursor:
+        query = query.filter(PasswordResetRequest.id < cursor)
+    rows = query.order_by(PasswordResetRequest.id.desc()).limit(limit + 1).all()
+    total = (
+        db.session.query(func.count(PasswordResetRequest.id))
+        .filter(PasswordResetRequest.status == status).scalar()
+    )
+    items = [{
+        **req.to_dict(),
+        'user_name': name if name is not None else 'Unknown',
+        'email': email,
+    } for req, name, email in rows[:limit]]
+    return {
+        'items': items,
+        'next_cursor': rows[limit - 1][0].id if len(rows) > limit else None,
+        'total': total,
+    }
+
+
+def set_reset_requests_status(ids, status, admin_uuid):
+    """대기 중인 비밀번호 재설정 요청 일괄 승인 / 거부 (commit 은 호출한 쪽) → 바뀐 수"""
+    return (
+        db.session.query(PasswordResetRequest)
+        .filter(PasswordResetRequest.id.in_(ids), PasswordResetRequest.status == 'pending')
+        .update({
+            'status': status,
+            'processed_at': datetime.utcnow(),
+            'processed_by': admin_uuid,
+        }, synchronize_session=False)
+    )
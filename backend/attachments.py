@@ -0,0 +1,345 @@
+# attachments.py
+"""첨부파일 사용량 집계 + 고아 파일 GC
+
+사용량 (attachment_usage)
+    업로드 시 증가, 메시지 행이 실제로 삭제될 때(purge / 사용자 삭제) 감소 → 관리자 조회 / 쿼터 검사는
+    이 테이블만 읽는다 (파일 시스템 탐색 없음). GC 가 저장소를 한 바퀴 다 돌 때마다 messages 기준으로 재계산.
+
+고아 파일 GC
+    저장소 key 를 사전순으로 배치 단위 탐색 → messages.file_path 가 가리키지 않는 파일 삭제.
+    마지막으로 확인한 key 를 job_checkpoints 에 기록해 다음 실행은 그 다음 key 부터 이어서 진행하고,
+    끝까지 가면 처음부터 다시 시작한다. 업로드 직후 DB commit 전인 파일을 지우지 않도록
+    수정 시각이 ATTACHMENT_GC_GRACE_SECONDS 이내인 파일은 건너뛴다. 내부 보관 파일(ARCHIVE_PREFIX)도 건너뜀.
+
+환경 변수
+    ATTACHMENT_GC_ENABLED=1            백그라운드 GC 실행 여부 (PURGE_HOURS 시간대에만 실행)
+    ATTACHMENT_GC_INTERVAL=300         실행 주기(초)
+    ATTACHMENT_GC_BATCH_SIZE=500       배치당 key 수
+    ATTACHMENT_GC_BATCHES_PER_RUN=20   1회 실행당 최대 배치 수 (나머지는 다음 실행에서 이어서)
+    ATTACHMENT_GC_GRACE_SECONDS=3600   최근 파일 보호 시간
+    ATTACHMENT_QUOTA_USER_MB=0         사용자별 업로드 한도 (0 = 무제한)
+    ATTACHMENT_QUOTA_ROOM_MB=0         채팅방별 한도 (0 = 무제한)
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import islice
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from db import db
+from metrics import ATTACHMENT_GC_BYTES, ATTACHMENT_GC_FILES
+from models import AttachmentUsage, ChatRoom, DirectConversation, JobCheckpoint, Message, User
+from storage import ARCHIVE_PREFIX, get_storage, StorageError
+
+logger = logging.getLogger(__name__)
+
+GC_CHECKPOINT = 'attachment_gc.keys'
+SCOPES = ('user', 'room')
+
+
+# ---------------------------------------------------------------------------
+# 사용량 집계 (호출한 쪽에서 commit)
+# ---------------------------------------------------------------------------
+
+def room_owner(message=None, room_uuid=None, conversation_id=None):
+    """채팅방 사용량 key: 그룹은 room_uuid, 1:1 은 'direct:<conversation_id>'"""
+    if message is not None:
+        room_uuid, conversation_id = message.room_uuid, message.conversation_id
+    if room_uuid:
+        return room_uuid
+    if conversation_id:
+        return f'direct:{conversation_id}'
+    return None
+
+
+def _bump(scope, owner, size, files):
+    values = {
+        'bytes': AttachmentUsage.bytes + size,
+        'files': AttachmentUsage.files + files,
+        'updated_at': datetime.utcnow(),
+    }
+    query = AttachmentUsage.query.filter_by(scope=scope, owner=owner)
+    if query.update(values, synchronize_session=False):
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(AttachmentUsage(scope=scope, owner=owner, bytes=max(size, 0),
+                                           files=max(files, 0), updated_at=datetime.utcnow()))
+    except IntegrityError:
+        # 동시에 첫 행을 만든 경우 → 상대가 만든 행에 더함
+        query.update(values, synchronize_session=False)
+
+
+def _owners(message):
+    yield 'user', message.sender_uuid
+    owner = room_owner(message)
+    if owner:
+        yield 'room', owner
+
+
+def record_upload(message):
+    """첨부파일 메시지 저장 시 사용량 증가"""
+    if not message.file_size:
+        return
+    for scope, owner in _owners(message):
+        _bump(scope, owner, message.file_size, 1)
+
+
+def release(messages):
+    """메시지 행 삭제 시 사용량 감소 (같은 대상은 합쳐서 한 번에 갱신)"""
+    deltas = defaultdict(lambda: [0, 0])
+    for message in messages:
+        if message.file_path and message.file_size:
+            for key in _owners(message):
+                deltas[key][0] += message.file_size
+                deltas[key][1] += 1
+    for (scope, owner), (size, files) in deltas.items():
+        _bump(scope, owner, -size, -files)
+
+
+def get_usage(scope, owner):
+    row = AttachmentUsage.query.get((scope, owner)) if owner else None
+    return (row.bytes, row.files) if row else (0, 0)
+
+
+def check_quota(user_uuid, owner, size):
+    """업로드하면 한도를 넘는지 확인 → 초과 시 오류 메시지, 아니면 None"""
+    config = current_app.config
+    for scope, key, limit, label in (
+        ('user', user_uuid, config.get('ATTACHMENT_QUOTA_USER_BYTES', 0), '사용자'),
+        ('room', owner, config.get('ATTACHMENT_QUOTA_ROOM_BYTES', 0), '채팅방'),
+    ):
+        if not limit or not key:
+            continue
+        used, _ = get_usage(scope, key)
+        if used + size > limit:
+            return f'{label} 첨부파일 용량 한도({limit // (1024 * 1024)}MB)를 초과합니다.'
+    return None
+
+
+def rebuild_usage():
+    """messages 기준으로 사용량 테이블 재계산 (증분 갱신 누락 보정)"""
+    rows = []
+    has_file = Message.file_path.isnot(None) & (Message.file_size > 0)
+    for scope, column in (('user', Message.sender_uuid), ('room', Message.room_uuid),
+                          ('room', Message.conversation_id)):
+        query = (
+            db.session.query(column, func.sum(Message.file_size), func.count(Message.id))
+            .filter(has_file, column.isnot(None)).group_by(column)
+        )
+        for owner, size, files in query:
+            if column is Message.conversation_id:
+                owner = room_owner(conversation_id=owner)
+            rows.append({'scope': scope, 'owner': owner, 'bytes': int(size or 0), 'files': files,
+                         'updated_at': datetime.utcnow()})
+
+    AttachmentUsage.query.delete()
+    if rows:
+        db.session.bulk_insert_mappings(AttachmentUsage, rows)
+    db.session.commit()
+    logger.info("📊 첨부파일 사용량 재계산", extra={'rows': len(rows)})
+    return len(rows)
+
+
+def owner_names(scope, owners):
+    """사용량 / 통계 key → 표시 이름 (사용자 이름, 그룹 채팅방 이름, 1:1 은 '이름, 이름')"""
+    owners = [o for o in owners if o]
+    if scope == 'user':
+        return dict(
+            db.session.query(User.user_uuid, User.name).filter(User.user_uuid.in_(owners)).all()
+        )
+    names = dict(
+        db.session.query(ChatRoom.room_uuid, ChatRoom.name).filter(ChatRoom.room_uuid.in_(owners)).all()
+    )
+    conversation_ids = [int(o.split(':', 1)[1]) for o in owners if o.startswith('direct:')]
+    if conversation_ids:
+        conversations = DirectConversation.query.filter(DirectConversation.id.in_(conversation_ids)).all()
+        user_names = dict(
+            db.session.query(User.user_uuid, User.name).filter(User.user_uuid.in_(
+                [c.user_low_uuid for c in conversations] + [c.user_high_uuid for c in conversations]
+            )).all()
+        )
+        for c in conversations:
+            names[room_owner(conversation_id=c.id)] = ', '.join(
+                user_names.get(u, u) for u in (c.user_low_uuid, c.user_high_uuid)
+            )
+    return names
+
+
+def usage_report(scope, limit=50):
+    """관리자 화면용 사용량 상위 목록 (이름 포함)"""
+    rows = (
+        AttachmentUsage.query.filter_by(scope=scope)
+        .order_by(AttachmentUsage.bytes.desc()).limit(limit).all()
+    )
+    names = owner_names(scope, [r.owner for r in rows])
+
+    return [{
+        'owner': r.owner,
+        'name': names.get(r.owner),
+        'bytes': r.bytes,
+        'files': r.files,
+        'updated_at': r.updated_at.isoformat() if r.updated_at else None,
+    } for r in rows]
+
+
+# ---------------------------------------------------------------------------
+# 고아 파일 GC (배치마다 commit + 체크포인트)
+# ---------------------------------------------------------------------------
+
+def get_checkpoint(name):
+    row = JobCheckpoint.query.get(name)
+    return row.position if row else ''
+
+
+def save_checkpoint(name, position):
+    row = JobCheckpoint.query.get(name)
+    if row is None:
+        row = JobCheckpoint(name=name)
+        db.session.add(row)
+    row.position = position
+    row.updated_at = datetime.utcnow()
+
+
+def collect_batch(batch_size=500, grace_seconds=3600, dry_run=False, start_after=None):
+    """체크포인트(또는 start_after) 다음 key 부터 batch_size 개 확인 → 참조 없는 파일 삭제
+
+    반환: {'checked', 'deleted', 'bytes', 'finished', 'position'}
+    (finished=True → 한 바퀴 완료, 체크포인트 초기화 / dry_run 은 체크포인트를 바꾸지 않음)
+    """
+    storage = get_storage()
+    if start_after is None:
+        start_after = get_checkpoint(GC_CHECKPOINT)
+    objects = list(islice(storage.iter_objects(start_after=start_after), batch_size))
+    keys = [key for key, _, _ in objects]
+    referenced = {
+        path for (path,) in db.session.query(Message.file_path).filter(Message.file_path.in_(keys))
+    } if keys else set()
+
+    cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    deleted = freed = 0
+    for key, size, modified in objects:
+        if key in referenced or modified > cutoff or key.startswith(ARCHIVE_PREFIX + '/'):
+            continue
+        if not dry_run:
+            try:
+                storage.delete(key)
+            except Exception as e:
+                logger.warning("⚠️ 고아 첨부파일 삭제 실패", extra={'path': key, 'error': str(e)})
+                continue
+        logger.info("🗑️ 고아 첨부파일", extra={'path': key, 'size': size, 'dry_run': dry_run})
+        deleted += 1
+        freed += size
+
+    finished = len(objects) < batch_size
+    position = '' if finished else keys[-1]
+    if not dry_run:
+        save_checkpoint(GC_CHECKPOINT, position)
+        db.session.commit()
+        ATTACHMENT_GC_FILES.inc(deleted, result='deleted')
+        ATTACHMENT_GC_BYTES.inc(freed)
+    return {'checked': len(objects), 'deleted': deleted, 'bytes': freed, 'finished': finished,
+            'position': position}
+
+
+def backfill_sizes(batch_size=500):
+    """file_size 가 없는 첨부파일 메시지(마이그레이션 이전 업로드)의 크기 기록 → 채운 행 수
+
+    저장소에 파일이 없는 행은 0 으로 기록하고 경고 로그 (다음 배치에서 다시 확인하지 않음)
+    """
+    storage = get_storage()
+    messages = (
+        Message.query.filter(Message.file_path.isnot(None), Message.file_size.is_(None))
+        .order_by(Message.id).limit(batch_size).all()
+    )
+    missing = 0
+    for message in messages:
+        try:
+            message.file_size = storage.size(message.file_path)
+        except (OSError, StorageError):
+            message.file_size = 0
+            missing += 1
+            logger.warning("⚠️ 첨부파일 없음", extra={'message_id': message.id, 'path': message.file_path})
+    db.session.commit()
+    if missing:
+        ATTACHMENT_GC_FILES.inc(missing, result='missing')
+    return len(messages)
+
+
+def run_gc(batch_size=500, grace_seconds=3600, max_batches=20, dry_run=False,
+           should_continue=lambda: True):
+    """GC 1회 실행: 최대 max_batches 배치 (나머지는 체크포인트에서 이어서), 한 바퀴를 마치면 사용량 재계산"""
+    totals = {'checked': 0, 'deleted': 0, 'bytes': 0, 'finished': False}
+    position = None
+    for _ in range(max_batches):
+        if not should_continue():
+            break
+        result = collect_batch(batch_size, grace_seconds, dry_run, start_after=position)
+        if dry_run:
+            position = result['position']
+        for key in ('checked', 'deleted', 'bytes'):
+            totals[key] += result[key]
+        if result['finished']:
+            totals['finished'] = True
+            break
+
+    if totals['finished'] and not dry_run:
+        while should_continue() and backfill_sizes(batch_size) == batch_size:
+            pass
+        rebuild_usage()
+
+    if totals['deleted'] or totals['finished']:
+        logger.info("🧹 첨부파일 GC", extra=totals)
+    return totals
+
+
+def init_attachment_gc(app):
+    """백그라운드 GC 시작 (ATTACHMENT_GC_ENABLED, PURGE_HOURS 시간대에만 실행)"""
+    from tombstones import _parse_hours, in_purge_window
+
+    if not app.config.get('ATTACHMENT_GC_ENABLED'):
+        return None
+
+    interval = app.config.get('ATTACHMENT_GC_INTERVAL', 300)
+    options = {
+        'batch_size': app.config.get('ATTACHMENT_GC_BATCH_SIZE', 500),
+        'grace_seconds': app.config.get('ATTACHMENT_GC_GRACE_SECONDS', 3600),
+        'max_batches': app.config.get('ATTACHMENT_GC_BATCHES_PER_RUN', 20),
+    }
+    hours = _parse_hours(app.config.get('PURGE_HOURS', '0-24'))
+
+    def _loop():
+        while True:
+            time.sleep(interval)
+            if not in_purge_window(hours):
+                continue
+            with app.app_context():
+                try:
+                    run_gc(should_continue=lambda: in_purge_window(hours), **options)
+                except Exception:
+                    logger.exception("❌ 첨부파일 GC 실패")
+                    db.session.rollback()
+
+    thread = threading.Thread(target=_loop, name='attachment-gc', daemon=True)
+    thread.start()
+    return thread
+
+
+@click.command('gc-attachments')
+@click.option('--batch-size', default=500, show_default=True, help='배치당 key 수')
+@click.option('--grace', default=3600, show_default=True, help='최근 파일 보호 시간(초)')
+@click.option('--full', is_flag=True, help='체크포인트부터 끝까지 한 번에 진행')
+@click.option('--dry-run', is_flag=True, help='삭제하지 않고 대상만 로그')
+@with_appcontext
+def gc_attachments_command(batch_size, grace, full, dry_run):
+    """참조 없는 첨부파일 정리 + 사용량 재계산"""
+    result = run_gc(batch_size, grace, max_batches=10 ** 9 if full else 20, dry_run=dry_run)
+    click.echo(f"✅ {result['checked']}개 확인, {result['deleted']}개 정리 ({result['bytes']} bytes)"
+               + (" - 한 바퀴 완료" if result['finished'] else " - 다음 실행에서 이어서 진행"))
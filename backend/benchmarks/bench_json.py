@@ -0,0 +1,97 @@
+# benchmarks/bench_json.py
+"""10k 메시지 히스토리 기준 JSON 직렬화 시간 / 전송 바이트 비교
+
+    python benchmarks/bench_json.py [--messages 10000] [--repeat 20]
+
+before: Flask 기본 provider + 행마다 isoformat(), 비압축
+after : JSON_PROVIDER(orjson) + datetime 네이티브 직렬화, gzip/brotli 압축
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from json_provider import OrjsonProvider, StdJSONProvider, orjson  # noqa: E402
+from compression import brotli, compress  # noqa: E402
+
+
+def make_rows(n):
+    """get_messages 가 조회하는 컬럼 형태의 가짜 메시지"""
+    a, b = str(uuid.uuid4()), str(uuid.uuid4())
+    start = datetime(2025, 1, 1, 9, 0, 0)
+    rows = []
+    for i in range(n):
+        sender, receiver = (a, b) if i % 2 else (b, a)
+        rows.append({
+            'id': i + 1,
+            'sender_uuid': sender,
+            'receiver_uuid': receiver,
+            'message_text': f'안녕하세요 회의 자료 확인 부탁드립니다 #{i}',
+            'timestamp': start + timedelta(seconds=i * 37, microseconds=i),
+            'file_name': None,
+            'file_type': None,
+        })
+    return rows
+
+
+def to_payload(rows, iso):
+    return [
+        {
+            'sender': m['sender_uuid'],
+            'receiver': m['receiver_uuid'],
+            'sender_uuid': m['sender_uuid'],
+            'receiver_uuid': m['receiver_uuid'],
+            'text': m['message_text'],
+            'timestamp': m['timestamp'].isoformat() if iso else m['timestamp'],
+            'file_name': m['file_name'],
+            'file_type': m['file_type'],
+            'message_id': m['id'],
+        } for m in rows
+    ]
+
+
+def measure(fn, repeat):
+    times = []
+    body = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        body = fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times), body
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.messages)
+
+    app = Flask(__name__)
+    providers = [('before (flask default)', DefaultJSONProvider(app), True)]
+    providers.append(('after (std json)', StdJSONProvider(app), False))
+    if orjson is not None:
+        providers.append(('after (orjson)', OrjsonProvider(app), False))
+
+    print(f"📊 {args.messages} messages, median of {args.repeat} runs")
+    print(f"{'provider':<26}{'serialize ms':>14}{'raw bytes':>12}{'gzip':>10}{'br':>10}")
+    for name, provider, iso in providers:
+        with app.app_context():
+            ms, resp = measure(lambda: provider.response(to_payload(rows, iso)), args.repeat)
+        raw = resp.get_data()
+        gz = len(compress(raw, 'gzip', 6))
+        br = len(compress(raw, 'br', 4)) if brotli is not None else '-'
+        # before 는 압축 없이 전송되므로 wire bytes = raw bytes
+        print(f"{name:<26}{ms:>14.2f}{len(raw):>12}{gz:>10}{br:>10}")
+
+
+if __name__ == '__main__':
+    main()
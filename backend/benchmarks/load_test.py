@@ -0,0 +1,382 @@
+# benchmarks/load_test.py
+"""REST + Socket.IO 부하 테스트
+
+    python benchmarks/load_test.py --duration 30 --socket-clients 50 --rest-workers 20 \
+        --mix chat-rooms=4,messages=4,upload=1,download=1
+
+- create_app 으로 서버를 별도 프로세스로 띄우고 (DATABASE_URL 의 로컬 DB 사용, --url 지정 시 생략)
+- 소켓 클라이언트: 연결(handshake auth) → chat 반복 (본인에게 되돌아오는 echo 까지 지연 측정) → disconnect
+  서버는 chat 을 'delivery' 로 감싸 보내고(--compact 면 MessagePack 'frame'), ack 가 없으면 재전송하므로
+  둘 다 풀어서 ack 한다. 서버가 CHAT_FIELDS 외의 필드는 버리므로 echo 는 text('bench <id>') 로 찾는다.
+- 직접 띄우는 서버는 RATE_LIMIT_ENABLED=0 (socket_chat 제한 5/s 에 걸리면 처리량이 아니라 제한을 재게 됨)
+  --url 로 기존 서버를 쓸 때는 그 서버도 RATE_LIMIT_ENABLED=0 으로 실행할 것
+- REST 워커: --mix 가중치대로 /api/chat-rooms, /api/messages/<uuid>, /api/upload-file, /api/download-file 호출
+- 처리량, p50/p95/p99, 요청당 쿼리 수(X-Query-Count) 를 출력하고 JSON 으로 저장
+"""
+from gevent import monkey
+monkey.patch_all()
+
+import argparse  # noqa: E402
+import hashlib  # noqa: E402
+import json  # noqa: E402
+import math  # noqa: E402
+import os  # noqa: E402
+import random  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+import uuid  # noqa: E402
+from collections import defaultdict  # noqa: E402
+from datetime import datetime  # noqa: E402
+
+import gevent  # noqa: E402
+import requests  # noqa: E402
+import socketio  # noqa: E402
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+BENCH_PASSWORD = 'bench-pw'
+BENCH_TEXT = 'bench '
+
+DEFAULT_MIX = 'chat-rooms=4,messages=4,upload=1,download=1'
+
+
+def percentile(sorted_values, p):
+    """nearest-rank 백분위수"""
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)   # op -> [latency seconds]
+        self.errors = defaultdict(int)     # op -> count
+        self.queries = defaultdict(list)   # op -> [X-Query-Count]
+
+    def add(self, op, seconds, ok=True, queries=None):
+        if ok:
+            self.samples[op].append(seconds)
+        else:
+            self.errors[op] += 1
+        if queries is not None:
+            self.queries[op].append(queries)
+
+    def summary(self, elapsed):
+        result = {}
+        for op in sorted(set(self.samples) | set(self.errors)):
+            lat = sorted(self.samples[op])
+            q = self.queries.get(op) or []
+            result[op] = {
+                'count': len(lat),
+                'errors': self.errors[op],
+                'throughput_rps': round(len(lat) / elapsed, 2) if elapsed else 0,
+                'p50_ms': _ms(percentile(lat, 50)),
+                'p95_ms': _ms(percentile(lat, 95)),
+                'p99_ms': _ms(percentile(lat, 99)),
+                'max_ms': _ms(lat[-1] if lat else None),
+                'queries_per_request': round(sum(q) / len(q), 2) if q else None,
+            }
+        return result
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(REST_OPS)
+    if unknown:
+        raise SystemExit(f"❌ 알 수 없는 REST 작업: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def ensure_bench_users(count):
+    """부하 테스트용 승인된 사용자 생성 (이미 있으면 재사용)"""
+    sys.path.insert(0, BACKEND_DIR)
+    from app import app as flask_app
+    from db import db
+    from models import User
+
+    password_hash = hashlib.sha256(BENCH_PASSWORD.encode()).hexdigest()
+    with flask_app.app_context():
+        existing = {
+            u.username: u.user_uuid
+            for u in db.session.query(User.username, User.user_uuid)
+            .filter(User.username.like('bench_user_%')).all()
+        }
+        for i in range(count):
+            username = f'bench_user_{i}'
+            if username in existing:
+                continue
+            user = User(
+                user_uuid=str(uuid.uuid4()),
+                name=f'벤치{i}',
+                employee_id=f'BENCH{i:06d}',
+                department='벤치마크',
+                email=f'{username}@bench.local',
+                username=username,
+                password_hash=password_hash,
+                is_approved=True,
+            )
+            db.session.add(user)
+            existing[username] = user.user_uuid
+        db.session.commit()
+    return [(f'bench_user_{i}', existing[f'bench_user_{i}']) for i in range(count)]
+
+
+def start_server(port, env):
+    code = (
+        "from app import app, socketio; "
+        f"socketio.run(app, host='127.0.0.1', port={port}, debug=False, log_output=False)"
+    )
+    proc = subprocess.Popen([sys.executable, '-c', code], cwd=BACKEND_DIR, env=env)
+    base = f'http://127.0.0.1:{port}'
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit("❌ 서버 프로세스가 종료되었습니다.")
+        try:
+            requests.get(base + '/metrics', timeout=1)
+            return proc, base
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    proc.kill()
+    raise SystemExit("❌ 서버 시작 시간 초과")
+
+
+def login(base, username):
+    r = requests.post(base + '/api/login', json={'username': username, 'password': BENCH_PASSWORD}, timeout=10)
+    r.raise_for_status()
+    return r.json()['token']
+
+
+# ---------------------------------------------------------------- REST 작업
+
+def op_chat_rooms(ctx, http, user):
+    return http.get(f"{ctx['base']}/api/chat-rooms", headers=user['headers'], timeout=30)
+
+
+def op_messages(ctx, http, user):
+    peer = random.choice(ctx['users'])
+    return http.get(f"{ctx['base']}/api/messages/{peer['uuid']}", headers=user['headers'], timeout=30)
+
+
+def op_upload(ctx, http, user):
+    peer = random.choice([u for u in ctx['users'] if u is not user] or ctx['users'])
+    payload = os.urandom(ctx['upload_size'])
+    r = http.post(
+        f"{ctx['base']}/api/upload-file",
+        headers=user['headers'],
+        data={'target_uuid': peer['uuid']},
+        files={'file': ('bench.txt', payload, 'text/plain')},
+        timeout=60,
+    )
+    if r.ok:
+        ctx['uploaded'].append((r.json()['message_id'], user, peer))
+    return r
+
+
+def op_download(ctx, http, user):
+    if not ctx['uploaded']:
+        return op_upload(ctx, http, user)
+    message_id, owner, peer = random.choice(ctx['uploaded'])
+    return http.get(f"{ctx['base']}/api/download-file/{message_id}", headers=owner['headers'], timeout=60)
+
+
+REST_OPS = {
+    'chat-rooms': op_chat_rooms,
+    'messages': op_messages,
+    'upload': op_upload,
+    'download': op_download,
+}
+
+
+def rest_worker(ctx, recorder, mix, stop_at):
+    http = requests.Session()
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    while time.time() < stop_at:
+        name = random.choices(names, weights)[0]
+        user = random.choice(ctx['users'])
+        start = time.perf_counter()
+        try:
+            r = REST_OPS[name](ctx, http, user)
+            elapsed = time.perf_counter() - start
+            q = r.headers.get('X-Query-Count')
+            recorder.add(name, elapsed, ok=r.ok, queries=int(q) if q else None)
+        except requests.RequestException:
+            recorder.add(name, time.perf_counter() - start, ok=False)
+
+
+# ---------------------------------------------------------------- 소켓 클라이언트
+
+def _frame_events(body):
+    """압축 frame (MessagePack) → [(event, data), ...] - 짧은 key / 번호는 backend/payloads.py 의 표로 복원"""
+    import msgpack
+    from payloads import EVENT_CODES, KEYS
+
+    names = {code: name for name, code in EVENT_CODES.items()}
+    full_keys = {short: full for full, short in KEYS.items()}
+
+    def expand(entries):
+        events = []
+        for entry in entries:
+            event, data = names.get(entry[0], entry[0]), entry[1]
+            if data is None:  # 앞 이벤트 데이터 참조 [code, None, ref, keys]
+                source = events[entry[2]][1]
+                data = {full_keys.get(k, k): source[full_keys.get(k, k)] for k in entry[3]}
+            elif event == 'delivery':
+                data = {'id': data['id'], 'events': expand(data['e'])}
+            else:
+                data = {full_keys.get(k, k): v for k, v in data.items()}
+            events.append((event, data))
+        return events
+
+    return expand(msgpack.unpackb(body, raw=False))
+
+
+def socket_client(ctx, recorder, user, stop_at, chat_interval):
+    sio = socketio.Client(reconnection=False)
+    pending = {}
+
+    def on_chat(data):
+        text = data.get('text') or ''
+        sent = pending.pop(text[len(BENCH_TEXT):], None) if text.startswith(BENCH_TEXT) else None
+        if sent is not None:
+            recorder.add('socket:chat_echo', time.perf_counter() - sent)
+
+    def dispatch(events):
+        for event, data in events:
+            if event == 'chat':
+                on_chat(data)
+            elif event == 'delivery':
+                dispatch(data['events'])
+
+    @sio.on('delivery')
+    def on_delivery(data):
+        dispatch(data['events'])
+        return True  # ack (없으면 서버가 재전송)
+
+    @sio.on('frame')
+    def on_frame(body):
+        dispatch(_frame_events(body))
+        return True
+
+    auth = {'token': user['token']}
+    if ctx['compact']:
+        auth.update(encoding='msgpack', encoding_version=1)
+    start = time.perf_counter()
+    try:
+        sio.connect(ctx['base'], transports=['websocket'], wait_timeout=10, auth=auth)
+        recorder.add('socket:connect', time.perf_counter() - start)
+    except Exception:
+        recorder.add('socket:connect', time.perf_counter() - start, ok=False)
+        return
+
+    while time.time() < stop_at:
+        gevent.sleep(random.expovariate(1.0 / chat_interval))
+        peer = random.choice(ctx['users'])
+        bench_id = uuid.uuid4().hex
+        pending[bench_id] = time.perf_counter()
+        sio.emit('chat', {'receiver_uuid': peer['uuid'], 'text': BENCH_TEXT + bench_id})
+
+    gevent.sleep(1)  # 마지막 echo 대기
+    recorder.errors['socket:chat_echo'] += len(pending)
+    start = time.perf_counter()
+    sio.disconnect()
+    recorder.add('socket:disconnect', time.perf_counter() - start)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='이미 실행 중인 서버 주소 (지정하지 않으면 직접 실행)')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--socket-clients', type=int, default=50)
+    parser.add_argument('--chat-interval', type=float, default=1.0, help='소켓 클라이언트당 평균 chat 간격(초)')
+    parser.add_argument('--rest-workers', type=int, default=20)
+    parser.add_argument('--mix', default=DEFAULT_MIX)
+    parser.add_argument('--upload-size', type=int, default=64 * 1024)
+    parser.add_argument('--compact', action='store_true', help='소켓 압축 전송(MessagePack frame) 협상')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='결과 JSON 경로 (기본: benchmarks/results/<시각>-<커밋>.json)')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    mix = parse_mix(args.mix)
+    accounts = ensure_bench_users(args.users)
+
+    proc = None
+    if args.url:
+        base = args.url.rstrip('/')
+        print("⚠️ --url 서버는 RATE_LIMIT_ENABLED=0 으로 실행해야 chat 이 제한(socket_chat)에 걸리지 않습니다.")
+    else:
+        env = dict(os.environ, QUERY_DEBUG='1', RATE_LIMIT_ENABLED='0')
+        proc, base = start_server(args.port, env)
+
+    try:
+        users = [{'username': name, 'uuid': uid} for name, uid in accounts]
+        for u in users:
+            u['token'] = login(base, u['username'])
+            u['headers'] = {'Authorization': f"Bearer {u['token']}"}
+
+        ctx = {'base': base, 'users': users, 'uploaded': [], 'upload_size': args.upload_size,
+               'compact': args.compact}
+        recorder = Recorder()
+        print(f"🚀 {args.duration}s / socket {args.socket_clients} / rest {args.rest_workers} / mix {mix}")
+
+        started = time.time()
+        stop_at = started + args.duration
+        greenlets = [
+            gevent.spawn(socket_client, ctx, recorder, users[i % len(users)], stop_at, args.chat_interval)
+            for i in range(args.socket_clients)
+        ]
+        greenlets += [gevent.spawn(rest_worker, ctx, recorder, mix, stop_at) for _ in range(args.rest_workers)]
+        gevent.joinall(greenlets)
+        elapsed = time.time() - started
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    summary = recorder.summary(elapsed)
+    print(f"{'op':<26}{'count':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'q/req':>8}")
+    for op, s in summary.items():
+        print(f"{op:<26}{s['count']:>8}{s['errors']:>6}{s['throughput_rps']:>9}"
+              f"{s['p50_ms'] or '-':>9}{s['p95_ms'] or '-':>9}{s['p99_ms'] or '-':>9}"
+              f"{s['queries_per_request'] if s['queries_per_request'] is not None else '-':>8}")
+
+    revision = git_revision()
+    result = {
+        'revision': revision,
+        'started_at': datetime.utcfromtimestamp(started).isoformat(),
+        'elapsed_seconds': round(elapsed, 3),
+        'config': {k: v for k, v in vars(args).items() if k != 'output'},
+        'results': summary,
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{revision or 'unknown'}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"💾 결과 저장: {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# compression.py
+import gzip
+
+from flask import request
+
+try:
+    import brotli  # 선택 의존성: 없으면 gzip만 사용
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'text/plain',
+    'text/html',
+    'text/csv',
+    'application/x-ndjson',
+}
+
+
+def choose_encoding(accept_encodings):
+    """클라이언트 Accept-Encoding 중 서버가 지원하는 가장 좋은 인코딩 선택"""
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level)
+
+
+def init_compression(app):
+    """임계값 이상 크기의 응답을 gzip/brotli로 압축하는 after_request 훅 등록"""
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESS_GZIP_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BR_LEVEL', 4)
+
+    @app.after_request
+    def compress_response(response):
+        # 파일 전송(send_file)·스트리밍·이미 인코딩된 응답은 건드리지 않음
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code >= 300
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        data = response.get_data()
+        if len(data) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        level = app.config['COMPRESS_BR_LEVEL'] if encoding == 'br' else app.config['COMPRESS_GZIP_LEVEL']
+        response.set_data(compress(data, encoding, level))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    return compress_response
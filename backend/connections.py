@@ -0,0 +1,132 @@
+# connections.py
+"""소켓 연결 목록 (사용자 1명 = 연결 여러 개: 탭 / 기기)
+
+- sid → Connection (사용자, 접속 시각, 주소)  /  user_uuid → {sid, ...}
+- 접속 상태는 연결 수로 판단: 첫 연결이 인증될 때 접속, 마지막 연결이 끊길 때 종료
+  (탭 하나를 닫아도 다른 탭이 남아 있으면 접속 중)
+- 인증된 연결은 'user:<uuid>' 방에 들어가므로, 한 사용자의 모든 연결에 emit 한 번으로 전송 (fanout.send_user)
+- 연결마다 이벤트 인코딩 ('json' / authenticate 에서 협상한 'msgpack' → payloads)
+- 연결이 1만 개 이상이어도 작도록 Connection 은 __slots__ (연결당 크기는 memory_bytes() / socket_registry_bytes)
+
+프로세스 단위 (각 프로세스는 자기에게 붙은 연결만 관리)
+"""
+import sys
+import threading
+import time
+
+USER_ROOM_PREFIX = 'user:'
+
+
+def user_room(user_uuid):
+    return USER_ROOM_PREFIX + user_uuid
+
+
+class Connection:
+    __slots__ = ('sid', 'user_uuid', 'connected_at', 'remote_addr', 'encoding')
+
+    def __init__(self, sid, remote_addr=None):
+        self.sid = sid
+        self.user_uuid = None  # authenticate 전
+        self.connected_at = time.time()
+        self.remote_addr = remote_addr
+        self.encoding = 'json'
+
+
+class ConnectionRegistry:
+    def __init__(self):
+        self._by_sid = {}   # sid -> Connection
+        self._by_user = {}  # user_uuid -> {sid, ...}
+        self._lock = threading.Lock()
+
+    def connect(self, sid, remote_addr=None):
+        with self._lock:
+            conn = self._by_sid.get(sid)
+            if conn is None:
+                conn = self._by_sid[sid] = Connection(sid, remote_addr)
+            return conn
+
+    def authenticate(self, sid, user_uuid):
+        """연결을 사용자에 연결 → (이전 사용자, 접속 시작 여부: 이 사용자의 첫 연결이면 True)"""
+        with self._lock:
+            conn = self._by_sid.get(sid)
+            if conn is None:
+                conn = self._by_sid[sid] = Connection(sid)
+            previous = conn.user_uuid
+            if previous == user_uuid:
+                return previous, False
+            if previous is not None:
+                self._discard(previous, sid)
+            conn.user_uuid = user_uuid
+            sids = self._by_user.setdefault(user_uuid, set())
+            sids.add(sid)
+            return previous, len(sids) == 1
+
+    def disconnect(self, sid):
+        """연결 종료 → (user_uuid, 접속 종료 여부: 마지막 연결이면 True) / 모르는 연결이면 (None, False)"""
+        with self._lock:
+            conn = self._by_sid.pop(sid, None)
+            if conn is None or conn.user_uuid is None:
+                return None, False
+            return conn.user_uuid, self._discard(conn.user_uuid, sid)
+
+    def _discard(self, user_uuid, sid):
+        sids = self._by_user.get(user_uuid)
+        if sids is None:
+            return False
+        sids.discard(sid)
+        if sids:
+            return False
+        del self._by_user[user_uuid]
+        return True
+
+    def set_encoding(self, sid, encoding):
+        conn = self._by_sid.get(sid)
+        if conn is not None:
+            conn.encoding = encoding
+
+    def encoding(self, sid):
+        conn = self._by_sid.get(sid)
+        return conn.encoding if conn is not None else 'json'
+
+    def user_of(self, sid):
+        conn = self._by_sid.get(sid)
+        return conn.user_uuid if conn is not None else None
+
+    def sids(self, user_uuid):
+        """사용자의 연결 목록 (접속 중이 아니면 빈 tuple)"""
+        sids = self._by_user.get(user_uuid)
+        if not sids:
+            return ()
+        with self._lock:
+            return tuple(sids)
+
+    def is_online(self, user_uuid):
+        return user_uuid in self._by_user
+
+    def online_users(self):
+        with self._lock:
+            return list(self._by_user)
+
+    def authenticated_sids(self):
+        with self._lock:
+            return [sid for sids in self._by_user.values() for sid in sids]
+
+    def connection_count(self):
+        return len(self._by_sid)
+
+    def user_count(self):
+        return len(self._by_user)
+
+    def memory_bytes(self):
+        """연결 목록이 차지하는 대략적인 메모리 (dict / set / Connection / 문자열)"""
+        with self._lock:
+            conns = list(self._by_sid.values())
+            user_sets = list(self._by_user.items())
+        size = sys.getsizeof(self._by_sid) + sys.getsizeof(self._by_user)
+        for conn in conns:
+            size += sys.getsizeof(conn) + sys.getsizeof(conn.sid)
+            if conn.remote_addr:
+                size += sys.getsizeof(conn.remote_addr)
+        for user_uuid, sids in user_sets:
+            size += sys.getsizeof(user_uuid) + sys.getsizeof(sids)
+        return size
@@ -0,0 +1,79 @@
+# conversations.py
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from db import db
+from models import DirectConversation, Message
+
+
+def ordered_pair(uuid_a, uuid_b):
+    return (uuid_a, uuid_b) if uuid_a <= uuid_b else (uuid_b, uuid_a)
+
+
+def find_direct_conversation(uuid_a, uuid_b):
+    low, high = ordered_pair(uuid_a, uuid_b)
+    return DirectConversation.query.filter_by(user_low_uuid=low, user_high_uuid=high).first()
+
+
+class ConversationRaceError(RuntimeError):
+    """동시 생성에서 unique 충돌이 났는데 상대가 만든 행을 읽지 못함"""
+
+
+def get_or_create_direct_conversation(uuid_a, uuid_b):
+    """두 사용자의 1:1 대화 행 조회, 없으면 생성 (동시 생성 시 unique 제약으로 한쪽만 성공)
+
+    충돌한 쪽은 잠금 읽기(FOR UPDATE)로 다시 조회 - MySQL REPEATABLE READ 의 일반 SELECT 는 앞서 읽은
+    snapshot 을 그대로 보므로 상대가 commit 한 행이 보이지 않는다.
+    """
+    conversation = find_direct_conversation(uuid_a, uuid_b)
+    if conversation:
+        return conversation
+
+    low, high = ordered_pair(uuid_a, uuid_b)
+    try:
+        with db.session.begin_nested():
+            conversation = DirectConversation(user_low_uuid=low, user_high_uuid=high)
+            db.session.add(conversation)
+    except IntegrityError:
+        conversation = (
+            DirectConversation.query.filter_by(user_low_uuid=low, user_high_uuid=high)
+            .with_for_update().populate_existing().first()
+        )
+        if conversation is None:
+            raise ConversationRaceError(f'1:1 대화 생성 충돌 후 조회 실패: {low} / {high}')
+    return conversation
+
+
+def record_last_message(conversation, message):
+    """새 메시지를 대화의 마지막 메시지로 기록 (message 는 flush 되어 id 가 있어야 함)"""
+    if conversation.last_message_at is None or message.timestamp >= conversation.last_message_at:
+        conversation.last_message_id = message.id
+        conversation.last_message_at = message.timestamp
+
+
+def refresh_last_message(conversation, exclude_id=None):
+    """메시지 삭제 후 마지막 메시지 다시 계산"""
+    query = Message.query.filter(Message.conversation_id == conversation.id, Message.deleted_at.is_(None))
+    if conversation.cleared_at is not None:
+        query = query.filter(Message.timestamp > conversation.cleared_at)
+    if exclude_id is not None:
+        query = query.filter(Message.id != exclude_id)
+    last = query.order_by(Message.timestamp.desc(), Message.id.desc()).first()
+    conversation.last_message_id = last.id if last else None
+    conversation.last_message_at = last.timestamp if last else None
+
+
+def backfill_last_messages():
+    """모든 대화의 last_message_at / last_message_id 를 messages 기준으로 일괄 갱신"""
+    db.session.execute(text("""
+        UPDATE direct_conversations SET last_message_at = (
+            SELECT MAX(m.timestamp) FROM messages m WHERE m.conversation_id = direct_conversations.id
+        )
+    """))
+    db.session.execute(text("""
+        UPDATE direct_conversations SET last_message_id = (
+            SELECT MAX(m.id) FROM messages m
+            WHERE m.conversation_id = direct_conversations.id
+              AND m.timestamp = direct_conversations.last_message_at
+        )
+    """))
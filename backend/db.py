@@ -1,4 +1,7 @@
 # backend/db.py
 from flask_sqlalchemy import SQLAlchemy
 
-db = SQLAlchemy()
\ No newline at end of file
+from db_routing import RoutingSession
+
+# ✅ @read_only 라우트의 조회는 replica 로 (DATABASE_REPLICA_URLS 미설정 시 항상 primary)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
\ No newline at end of file
@@ -0,0 +1,127 @@
+# db_pool.py
+import os
+import threading
+import time
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+DEFAULT_DATABASE_URL = 'mysql://root:@localhost/hi_msg_db'
+
+# ✅ gevent 환경에서는 순수 파이썬 드라이버(PyMySQL)가 monkey patch 된 소켓을 사용해
+#    다른 greenlet을 막지 않는다. mysqlclient(MySQLdb)는 C 확장이라 I/O 동안 루프 전체가 멈춤
+MYSQL_DRIVERS = {
+    'pymysql': 'mysql+pymysql',
+    'mysqldb': 'mysql+mysqldb',
+}
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class PoolStats:
+    """커넥션 풀 사용 통계 (checkout 대기 시간, 타임아웃 횟수 등)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds):
+        with self.lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            if seconds > self.wait_seconds_max:
+                self.wait_seconds_max = seconds
+
+    def record_timeout(self):
+        with self.lock:
+            self.timeouts += 1
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool + 커넥션 획득 대기 시간 측정"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        new_pool = super().recreate()
+        new_pool.stats = self.stats
+        return new_pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return conn
+
+
+def resolve_database_uri(uri=None):
+    """DATABASE_URL(또는 주어진 URI) + DB_DRIVER 환경 변수로 접속 URI 결정"""
+    if uri is None:
+        uri = os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URL)
+    url = make_url(uri)
+    if url.get_backend_name() == 'mysql':
+        driver = os.environ.get('DB_DRIVER', 'pymysql').lower()
+        if driver not in MYSQL_DRIVERS:
+            raise ValueError(f"❌ 지원하지 않는 DB_DRIVER: {driver} ({', '.join(MYSQL_DRIVERS)})")
+        url = url.set(drivername=MYSQL_DRIVERS[driver])
+    return url.render_as_string(hide_password=False)
+
+
+def build_engine_options(uri):
+    """환경 변수 기반 SQLALCHEMY_ENGINE_OPTIONS 생성"""
+    if make_url(uri).get_backend_name() == 'sqlite':
+        # sqlite 는 풀 크기 옵션을 지원하지 않음 (로컬 테스트용)
+        return {}
+
+    return {
+        'poolclass': MeteredQueuePool,
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        # MySQL wait_timeout 보다 짧게 → 서버가 끊은 유휴 커넥션 재사용 방지
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+    }
+
+
+def get_pool_metrics(engine):
+    """현재 풀 상태 + 누적 통계"""
+    pool = engine.pool
+    metrics = {'pool_class': type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        metrics.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            # overflow() 는 음수(-size)부터 시작하므로 실제 초과분만 노출
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow,
+        })
+
+    stats = getattr(pool, 'stats', None)
+    if stats is not None:
+        with stats.lock:
+            metrics.update({
+                'checkouts_total': stats.checkouts,
+                'timeouts_total': stats.timeouts,
+                'wait_seconds_total': round(stats.wait_seconds_total, 6),
+                'wait_seconds_max': round(stats.wait_seconds_max, 6),
+                'wait_seconds_avg': round(stats.wait_seconds_total / stats.checkouts, 6) if stats.checkouts else 0.0,
+            })
+    return metrics
@@ -0,0 +1,237 @@
+# db_routing.py
+"""읽기 전용 엔드포인트를 replica DB 로 보내는 세션 라우팅
+
+- DATABASE_REPLICA_URLS=mysql://...replica1,mysql://...replica2 → SQLALCHEMY_BINDS 'replica_N'
+- @read_only 라우트의 SELECT 만 replica 로 (flush / INSERT·UPDATE·DELETE 는 항상 primary)
+- 사용자가 쓰기 직후 DB_STICKY_SECONDS 동안은 그 사용자의 읽기를 primary 로 (read-your-writes)
+  ⚠️ 마지막 쓰기 시각(router.last_write)은 프로세스 메모리 → 보장은 쓰기를 처리한 프로세스 안에서만.
+  워커가 여러 개면 다른 워커로 간 읽기는 replica 에서 이전 값을 볼 수 있다
+  (현재 배포는 gevent 단일 프로세스. 워커를 늘리면 sticky 세션 또는 공유 저장소로 옮길 것)
+- 백그라운드 헬스체크: 연결 실패 또는 복제 지연 > DB_REPLICA_MAX_LAG 인 replica 는 제외 → 전부 제외되면 primary
+"""
+import itertools
+import logging
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import g, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+
+from metrics import DB_READ_ROUTE, DB_REPLICA_HEALTHY, DB_REPLICA_LAG, init_sql_metrics, registry
+
+logger = logging.getLogger(__name__)
+
+REPLICA_PREFIX = 'replica_'
+
+
+def replica_binds():
+    """DATABASE_REPLICA_URLS 환경 변수 → SQLALCHEMY_BINDS (replica 마다 primary 와 같은 풀 옵션)"""
+    from db_pool import resolve_database_uri, build_engine_options
+
+    urls = [u.strip() for u in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if u.strip()]
+    binds = {}
+    for i, url in enumerate(urls):
+        uri = resolve_database_uri(url)
+        binds[f'{REPLICA_PREFIX}{i}'] = {'url': uri, **build_engine_options(uri)}
+    return binds
+
+
+def read_only(fn):
+    """이 라우트의 조회 쿼리는 replica 로 보내도 된다고 표시"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        g.db_read_only = True
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def _current_identity():
+    try:
+        from flask_jwt_extended import get_jwt_identity
+        return get_jwt_identity()
+    except RuntimeError:
+        return None
+
+
+class ReplicaRouter:
+    def __init__(self):
+        self.replicas = {}        # bind_key -> engine
+        self.healthy = set()
+        self.lag = {}             # bind_key -> 복제 지연(초) / None
+        self.last_write = {}      # user_uuid -> monotonic (프로세스마다 따로)
+        self.sticky_seconds = 5.0
+        self.max_lag = 10.0
+        self.check_interval = 5.0
+        self._cycle = itertools.cycle(())
+        self._lock = threading.Lock()
+        self._monitor = None
+
+    def configure(self, engines, sticky_seconds, max_lag, check_interval):
+        self.replicas = {k: e for k, e in engines.items() if k and k.startswith(REPLICA_PREFIX)}
+        self.healthy = set(self.replicas)
+        self.sticky_seconds = sticky_seconds
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._cycle = itertools.cycle(sorted(self.replicas))
+        for key, engine in self.replicas.items():
+            self._watch_errors(key, engine)
+        if self.replicas and self._monitor is None:
+            self._monitor = threading.Thread(target=self._monitor_loop, name='replica-monitor', daemon=True)
+            self._monitor.start()
+
+    def _watch_errors(self, key, engine):
+        @event.listens_for(engine, 'handle_error')
+        def _on_error(context):
+            # 연결이 끊긴 replica 는 다음 헬스체크까지 즉시 제외
+            if context.is_disconnect:
+                self._mark(key, False, None)
+
+    def _mark(self, key, ok, lag):
+        with self._lock:
+            self.lag[key] = lag
+            if ok:
+                if key not in self.healthy:
+                    logger.info("🟢 replica 복구", extra={'bind': key, 'lag': lag})
+                self.healthy.add(key)
+            else:
+                if key in self.healthy:
+                    logger.warning("🔴 replica 제외", extra={'bind': key, 'lag': lag})
+                self.healthy.discard(key)
+
+    def check(self, key):
+        engine = self.replicas[key]
+        try:
+            with engine.connect() as conn:
+                lag = None
+                if engine.dialect.name == 'mysql':
+                    row = conn.execute(text('SHOW REPLICA STATUS')).mappings().first()
+                    if row is not None:
+                        lag = row.get('Seconds_Behind_Source')
+                        if lag is None:
+                            # 복제 스레드 중지 상태
+                            self._mark(key, False, None)
+                            return
+                else:
+                    conn.execute(text('SELECT 1'))
+        except Exception as e:
+            logger.warning("⚠️ replica 헬스체크 실패", extra={'bind': key, 'error': str(e)})
+            self._mark(key, False, None)
+            return
+        self._mark(key, lag is None or lag <= self.max_lag, lag)
+
+    def _monitor_loop(self):
+        while True:
+            for key in list(self.replicas):
+                self.check(key)
+            time.sleep(self.check_interval)
+
+    def record_write(self, user_uuid):
+        if user_uuid:
+            self.last_write[user_uuid] = time.monotonic()
+
+    def is_sticky(self, user_uuid):
+        if not user_uuid:
+            return False
+        at = self.last_write.get(user_uuid)
+        if at is None:
+            return False
+        if time.monotonic() - at > self.sticky_seconds:
+            self.last_write.pop(user_uuid, None)
+            return False
+        return True
+
+    def _pick(self):
+        if self.is_sticky(_current_identity()):
+            return None, 'sticky'
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                key = next(self._cycle)
+                if key in self.healthy:
+                    return key, 'ok'
+        return None, 'replica_down'
+
+    def choose(self):
+        """현재 요청의 읽기를 보낼 replica 엔진 (None → primary)
+
+        요청 안에서는 처음 고른 대상을 계속 사용 → 한 응답이 여러 replica 시점을 섞지 않음
+        """
+        if not self.replicas or not has_request_context() or not g.get('db_read_only'):
+            return None
+        if 'db_route' not in g:
+            key, reason = self._pick()
+            g.db_route = key
+            DB_READ_ROUTE.inc(target=key or 'primary', reason=reason)
+        key = g.db_route
+        return self.replicas[key] if key else None
+
+    def status(self):
+        return {
+            key: {'healthy': key in self.healthy, 'lag_seconds': self.lag.get(key)}
+            for key in sorted(self.replicas)
+        }
+
+
+router = ReplicaRouter()
+
+
+def _is_write(clause):
+    return clause is not None and getattr(clause, 'is_dml', False)
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy 세션 + replica 라우팅"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not _is_write(clause) and not self.info.get('wrote'):
+            engine = router.choose()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _after_flush(session, flush_context):
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _on_execute(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _after_rollback(session):
+    session.info.pop('wrote', None)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _after_commit(session):
+    if session.info.pop('wrote', False) and has_request_context():
+        router.record_write(_current_identity())
+
+
+def init_db_routing(app, db):
+    """create_app 에서 db.init_app 이후 호출 (app context 필요)"""
+    router.configure(
+        db.engines,
+        sticky_seconds=app.config.get('DB_STICKY_SECONDS', 5.0),
+        max_lag=app.config.get('DB_REPLICA_MAX_LAG', 10.0),
+        check_interval=app.config.get('DB_REPLICA_CHECK_INTERVAL', 5.0),
+    )
+    for key, engine in router.replicas.items():
+        init_sql_metrics(engine)
+
+    @registry.add_collector
+    def _collect_replicas():
+        for key, state in router.status().items():
+            DB_REPLICA_HEALTHY.set(1 if state['healthy'] else 0, bind=key)
+            if state['lag_seconds'] is not None:
+                DB_REPLICA_LAG.set(state['lag_seconds'], bind=key)
+
+    if router.replicas:
+        logger.info("✅ replica 라우팅 활성화", extra={'replicas': sorted(router.replicas)})
+    return router
@@ -0,0 +1,191 @@
+# delivery.py
+"""소켓 전송 확인(ack) + 서버 재전송
+
+채팅 메시지는 'delivery' 이벤트 {'id', 'events': [[event, data], ...]} 로 보내고 클라이언트의 ack 를 기다린다.
+(socket.js 가 id 로 중복을 거른 뒤 각 이벤트 핸들러에 전달하고 ack)
+
+- 사용자의 모든 연결(탭 / 기기)로 보내고, 어느 연결에서든 ack 가 오면 전달 완료
+- ack 가 SOCKET_ACK_TIMEOUT 안에 오지 않으면 그 시점에 살아 있는 연결들로 재전송
+  → 재접속으로 sid 가 바뀐 경우에도 새 연결로 전달, 대기 시간은 시도마다 2배
+- SOCKET_ACK_MAX_ATTEMPTS 번 보내도 ack 가 없으면 포기(lost)하고 'resync' 로 클라이언트가 재조회
+- 접속이 끊긴 사용자는 포기(offline) - 메시지는 DB 에 있으므로 다음 접속 시 조회
+- 재접속(authenticate) 시 ack 대기 중인 전송은 새 연결로 바로 재전송
+- 사용자별로 ack 대기 중인 전송은 SOCKET_ACK_WINDOW 개까지 (넘치면 오래된 것부터 포기 + resync)
+
+프로세스 단위 보관 (연결이 있는 프로세스에서만 ack 를 받으므로)
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from itertools import count
+
+from metrics import SOCKET_DELIVERY, SOCKET_DELIVERY_LATENCY, registry
+import fanout
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_EVENT = 'delivery'
+CHECK_INTERVAL = 0.25
+
+_socketio = None
+_connections = None
+_timeout = 2.0
+_max_attempts = 4
+_window = 64
+_ids = count(1)
+_prefix = uuid.uuid4().hex[:8]  # 서버 재시작 후 id 가 겹쳐 클라이언트가 중복으로 거르지 않도록
+_pending = {}          # user_uuid -> OrderedDict(delivery_id -> _Delivery)
+_lock = threading.Lock()
+_checker_running = False
+
+
+class _Delivery:
+    def __init__(self, delivery_id, user_uuid, kind, events):
+        self.id = delivery_id
+        self.user_uuid = user_uuid
+        self.kind = kind
+        self.events = events
+        self.sids = ()
+        self.attempts = 0
+        self.first_sent = time.monotonic()
+        self.deadline = 0.0
+
+
+def init_delivery(app, socketio, connections):
+    """SOCKET_ACK_TIMEOUT / SOCKET_ACK_MAX_ATTEMPTS / SOCKET_ACK_WINDOW 설정"""
+    global _socketio, _connections, _timeout, _max_attempts, _window
+    _socketio = socketio
+    _connections = connections
+    _timeout = app.config.get('SOCKET_ACK_TIMEOUT', 2.0)
+    _max_attempts = max(1, app.config.get('SOCKET_ACK_MAX_ATTEMPTS', 4))
+    _window = max(1, app.config.get('SOCKET_ACK_WINDOW', 64))
+    registry.gauge('socket_delivery_pending', 'ack 대기 중인 전송 수',
+                   func=lambda: sum(len(entries) for entries in list(_pending.values())))
+
+
+def _transmit(entry, sids):
+    """연결마다 ack callback 을 달아 전송 (callback 은 연결 하나에만 달 수 있어 사용자 방 emit 대신 sid 별로)"""
+    entry.sids = sids
+    entry.attempts += 1
+    entry.deadline = time.monotonic() + _timeout * 2 ** (entry.attempts - 1)
+    payload = {'id': entry.id, 'events': [[event, data] for event, data in entry.events]}
+    for sid in sids:
+        fanout.send(sid, [(DELIVERY_EVENT, payload)],
+                    callback=lambda *_: ack(entry.user_uuid, entry.id))
+
+
+def send(user_uuid, sids, events, kind='chat'):
+    """ack 를 기다리는 전송 (fanout.deliver 의 send_fn)"""
+    global _checker_running
+    if not events:
+        return
+    entry = _Delivery(f'{_prefix}-{next(_ids)}', user_uuid, kind, events)
+    overflow = []
+    with _lock:
+        entries = _pending.setdefault(user_uuid, OrderedDict())
+        while len(entries) >= _window:
+            overflow.append(entries.popitem(last=False)[1])
+        entries[entry.id] = entry
+        start = not _checker_running
+        _checker_running = True
+    if overflow:
+        for old in overflow:
+            SOCKET_DELIVERY.inc(kind=old.kind, result='overflow')
+        fanout.send_user(user_uuid, sids, [(fanout.RESYNC_EVENT, {'dropped': len(overflow)})])
+    _transmit(entry, sids)
+    if start:
+        _socketio.start_background_task(_check_loop)
+
+
+def ack(user_uuid, delivery_id):
+    """클라이언트 ack → 대기 목록에서 제거하고 지연 기록 (재전송분에 대한 중복 ack 는 무시)"""
+    with _lock:
+        entries = _pending.get(user_uuid)
+        entry = entries.pop(delivery_id, None) if entries else None
+        if entries is not None and not entries:
+            _pending.pop(user_uuid, None)
+    if entry is None:
+        return
+    SOCKET_DELIVERY.inc(kind=entry.kind, result='acked' if entry.attempts == 1 else 'acked_retry')
+    SOCKET_DELIVERY_LATENCY.observe(time.monotonic() - entry.first_sent, kind=entry.kind)
+
+
+def _give_up(entry, result):
+    with _lock:
+        entries = _pending.get(entry.user_uuid)
+        if not entries or entries.pop(entry.id, None) is None:
+            return False  # 그 사이 ack
+        if not entries:
+            _pending.pop(entry.user_uuid, None)
+    SOCKET_DELIVERY.inc(kind=entry.kind, result=result)
+    return True
+
+
+def _check_loop():
+    """기한이 지난 전송 재전송 / 포기 (대기 중인 전송이 없으면 종료)
+
+    예외로 멈추지 않고, 어떤 이유로든 끝나면 _checker_running 을 풀어 다음 send 가 다시 시작
+    """
+    global _checker_running
+    stopped = False
+    try:
+        while True:
+            time.sleep(CHECK_INTERVAL)
+            try:
+                _check_expired(time.monotonic())
+            except Exception:
+                logger.exception("❌ 소켓 전송 확인 실패 처리 중 오류")
+            with _lock:
+                if not _pending:
+                    _checker_running = False
+                    stopped = True
+                    return
+    finally:
+        if not stopped:
+            with _lock:
+                _checker_running = False
+
+
+def _check_expired(now):
+    with _lock:
+        expired = [e for entries in _pending.values() for e in entries.values() if e.deadline <= now]
+    resync = {}
+    for entry in expired:
+        try:
+            sids = _connections.sids(entry.user_uuid)
+            if not sids:
+                _give_up(entry, 'offline')
+            elif entry.attempts >= _max_attempts:
+                if _give_up(entry, 'lost'):
+                    resync[entry.user_uuid] = resync.get(entry.user_uuid, 0) + 1
+                    logger.warning("⚠️ 소켓 전송 확인 실패", extra={
+                        'user_uuid': entry.user_uuid, 'delivery_id': entry.id, 'attempts': entry.attempts,
+                    })
+            else:
+                SOCKET_DELIVERY.inc(kind=entry.kind, result='retried')
+                _transmit(entry, sids)
+        except Exception:
+            logger.exception("❌ 소켓 재전송 실패", extra={'user_uuid': entry.user_uuid})
+    for user_uuid, n in resync.items():
+        try:
+            fanout.send_user(user_uuid, _connections.sids(user_uuid), [(fanout.RESYNC_EVENT, {'dropped': n})])
+        except Exception:
+            logger.exception("❌ 소켓 resync 전송 실패", extra={'user_uuid': user_uuid})
+
+
+def resume(user_uuid, sid):
+    """재접속 / 새 기기 → ack 대기 중인 전송을 새 연결로 바로 재전송"""
+    with _lock:
+        entries = [e for e in _pending.get(user_uuid, {}).values() if sid not in e.sids]
+    for entry in entries:
+        SOCKET_DELIVERY.inc(kind=entry.kind, result='retried')
+        _transmit(entry, (sid,))
+
+
+def pending_count(user_uuid=None):
+    with _lock:
+        if user_uuid is not None:
+            return len(_pending.get(user_uuid, ()))
+        return sum(len(entries) for entries in _pending.values())
@@ -0,0 +1,185 @@
+# directory.py
+"""사용자 목록 (승인된 사용자) - 버전 / 변경분 / 초성 검색
+
+- 승인 / 반려 / 삭제 / 정보 변경 시 record_change() → directory_changes 에 새 버전 기록
+  (마지막 행을 잠그고 +1 → 버전이 commit 순서대로 빠짐없이 증가)
+- 프로세스마다 현재 버전의 스냅샷(목록, JSON 본문, 검색 색인)을 메모리에 두고, 버전이 바뀌면 다시 만든다
+  → 요청마다 전체 사용자 조회 대신 버전 조회 1번
+- 클라이언트는 ETag(W/"users-<버전>") 로 304 를 받거나, ?since=<버전> 으로 바뀐 사용자만 받는다
+
+검색: 이름 / 아이디 접두어, 한글 초성 (예: 'ㄱㅁ', '김ㅊ' → '김철수')
+"""
+import logging
+import threading
+from bisect import bisect_left
+
+from flask import current_app
+from sqlalchemy import func
+
+from db import db
+from models import DirectoryChange, User
+
+logger = logging.getLogger(__name__)
+
+HISTORY = 5000  # 보관하는 변경 이력 수 (이보다 오래된 버전은 전체 다시 받기)
+
+CHOSUNG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+_CHOSUNG_SET = set(CHOSUNG)
+_HANGUL_FIRST, _HANGUL_LAST = 0xAC00, 0xD7A3
+
+
+def chosung(text):
+    """한글 음절은 초성으로, 나머지 글자는 소문자로 ('김철수' → 'ㄱㅊㅅ')"""
+    out = []
+    for ch in text.lower():
+        code = ord(ch)
+        if _HANGUL_FIRST <= code <= _HANGUL_LAST:
+            out.append(CHOSUNG[(code - _HANGUL_FIRST) // 588])
+        else:
+            out.append(ch)
+    return ''.join(out)
+
+
+def _prefix_match(query, text):
+    """query 의 각 글자가 text 의 같은 위치 글자와 같거나, 초성이면 그 글자의 초성과 같은지"""
+    text = text.lower()
+    if len(query) > len(text):
+        return False
+    for q, t in zip(query, text):
+        if q == t:
+            continue
+        if q in _CHOSUNG_SET and chosung(t) == q:
+            continue
+        return False
+    return True
+
+
+def serialize(u):
+    return {
+        "id": u.id,
+        "uuid": u.user_uuid,
+        "name": u.name,
+        "username": u.username,
+        "position": u.position,
+        "department": u.department,
+        "is_admin": u.is_admin
+    }
+
+
+class Snapshot:
+    """한 버전의 사용자 목록 + 검색 색인 (만든 뒤에는 바꾸지 않음)"""
+
+    def __init__(self, version, users):
+        self.version = version
+        self.users = users
+        self.by_uuid = {u['uuid']: u for u in users}
+        # (검색 키, 목록 위치) - 이름 초성 키 / 아이디 키를 한 정렬 목록에서 접두어 범위 검색
+        self.keys = sorted(
+            (key, i) for i, u in enumerate(users)
+            for key in {chosung(u['name'] or ''), (u['username'] or '').lower()} if key
+        )
+        self._body = None
+
+    @property
+    def etag(self):
+        return f'users-{self.version}'
+
+    def body(self):
+        """전체 목록 JSON (처음 요청 시 한 번만 직렬화)"""
+        if self._body is None:
+            self._body = current_app.json.dumps(self.users)
+        return self._body
+
+    def search(self, query, limit=20):
+        query = query.strip().lower()
+        if not query:
+            return []
+        key = chosung(query)
+        matched = set()
+        for stored, i in self.keys[bisect_left(self.keys, (key,)):]:
+            if not stored.startswith(key):
+                break
+            if i in matched:
+                continue
+            u = self.users[i]
+            if _prefix_match(query, u['name'] or '') or (u['username'] or '').lower().startswith(query):
+                matched.add(i)
+        results = sorted((self.users[i] for i in matched), key=lambda u: (u['name'] or '', u['username'] or ''))
+        return results[:limit]
+
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+def current_version():
+    return db.session.query(func.max(DirectoryChange.version)).scalar() or 0
+
+
+def _load(version):
+    users = (
+        db.session.query(User.id, User.user_uuid, User.name, User.username,
+                         User.position, User.department, User.is_admin)
+        .filter(User.is_approved == True, User.is_rejected == False)
+        .all()
+    )
+    return Snapshot(version, [serialize(u) for u in users])
+
+
+def snapshot():
+    """현재 버전의 스냅샷 (버전이 바뀌었으면 다시 만듦)"""
+    global _snapshot
+    version = current_version()
+    snap = _snapshot
+    if snap is not None and snap.version == version:
+        return snap
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = _load(version)
+            logger.debug("📇 사용자 목록 스냅샷 갱신", extra={'version': version, 'users': len(_snapshot.users)})
+        return _snapshot
+
+
+def record_change(user_uuid=None):
+    """사용자 목록이 바뀌는 변경과 같은 트랜잭션에서 호출 (commit 은 호출한 쪽) → 새 버전
+
+    user_uuid=None 이면 전체 변경 (이전 버전의 클라이언트는 전체 다시 받음)
+    """
+    return record_changes([user_uuid])
+
+
+def record_changes(user_uuids):
+    """여러 사용자 변경을 한 번에 기록 (잠금 1번, 연속된 버전) → 마지막 버전"""
+    head = (
+        db.session.query(DirectoryChange.version)
+        .order_by(DirectoryChange.version.desc())
+        .limit(1)
+        .with_for_update()
+        .scalar()
+    ) or 0
+    if not user_uuids:
+        return head
+    db.session.add_all([
+        DirectoryChange(version=head + i, user_uuid=user_uuid)
+        for i, user_uuid in enumerate(user_uuids, start=1)
+    ])
+    version = head + len(user_uuids)
+    if version > HISTORY:
+        DirectoryChange.query.filter(DirectoryChange.version <= version - HISTORY).delete(synchronize_session=False)
+    return version
+
+
+def changes_since(snap, since):
+    """since 이후 변경 → (upsert 할 사용자 목록, 제거할 uuid 목록) / 이력이 없으면 None (전체 다시 받기)"""
+    if since >= snap.version:
+        return [], []
+    rows = (
+        db.session.query(DirectoryChange.version, DirectoryChange.user_uuid)
+        .filter(DirectoryChange.version > since, DirectoryChange.version <= snap.version)
+        .all()
+    )
+    if len(rows) != snap.version - since or any(r.user_uuid is None for r in rows):
+        return None
+    uuids = sorted({r.user_uuid for r in rows})
+    return ([snap.by_uuid[u] for u in uuids if u in snap.by_uuid],
+            [u for u in uuids if u not in snap.by_uuid])
@@ -0,0 +1,215 @@
+# export.py
+"""대화 내보내기 (NDJSON / CSV, 선택 gzip)
+
+- 대상: 그룹 채팅방(room_uuid) / 1:1 대화(user_uuid + other_uuid) / 사용자(user_uuid, 보내거나 받은 메시지 전체)
+  + 기간(since ~ until), 최소 하나는 지정
+- server-side cursor(stream_results)로 EXPORT_BATCH_SIZE 행씩 받아 바로 써 나감 → 내보내는 양과 관계없이 메모리 일정
+- 메시지 id 순서로 내보내므로, 중간에 끊기면 마지막으로 받은 id 를 cursor 로 넘겨 이어받기
+
+    GET /api/admin/export?room_uuid=...&format=csv&gzip=1
+    GET /api/admin/export?user_uuid=...&other_uuid=...&since=2026-01-01&cursor=123456
+    flask export-messages --user <uuid> --format ndjson --gzip -o out.ndjson.gz
+"""
+import csv
+import io
+import json
+import logging
+import zlib
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import or_, select
+from sqlalchemy.orm import aliased
+
+from db import db
+from metrics import EXPORT_ROWS
+from models import Message, User
+from conversations import find_direct_conversation
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('ndjson', 'csv')
+COLUMNS = (
+    'id', 'timestamp', 'room_uuid', 'sender_uuid', 'sender_name', 'receiver_uuid', 'receiver_name',
+    'message_text', 'file_name', 'file_type', 'file_size', 'deleted_at',
+)
+MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+FLUSH_BYTES = 64 * 1024  # 이만큼 모이면 한 번에 내보냄 (행마다 yield 하지 않도록)
+
+
+class ExportError(ValueError):
+    """잘못된 내보내기 조건 (400, 없는 사용자는 404)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _parse_time(value, name):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ExportError(f'{name} 는 ISO 형식(예: 2026-01-31 또는 2026-01-31T09:00:00)이어야 합니다.')
+
+
+def parse_filters(args):
+    """요청 인자 → 내보내기 조건 (잘못되면 ExportError)"""
+    filters = {
+        'room_uuid': args.get('room_uuid') or None,
+        'user_uuid': args.get('user_uuid') or None,
+        'other_uuid': args.get('other_uuid') or None,
+        'since': _parse_time(args.get('since'), 'since'),
+        'until': _parse_time(args.get('until'), 'until'),
+        'include_deleted': str(args.get('include_deleted', '0')) in ('1', 'true'),
+    }
+    if filters['other_uuid'] and not filters['user_uuid']:
+        raise ExportError('other_uuid 는 user_uuid 와 함께 지정해야 합니다.')
+    if filters['room_uuid'] and filters['user_uuid']:
+        raise ExportError('room_uuid 와 user_uuid 는 함께 지정할 수 없습니다.')
+    if not any(filters[k] for k in ('room_uuid', 'user_uuid', 'since', 'until')):
+        raise ExportError('room_uuid, user_uuid, since/until 중 하나 이상 지정해야 합니다.')
+
+    # 없는 사용자를 조건에서 빼고 전체를 내보내지 않도록 스트리밍 시작 전에 확인
+    uuids = [filters[k] for k in ('user_uuid', 'other_uuid') if filters[k]]
+    if uuids:
+        ids = dict(db.session.query(User.user_uuid, User.id).filter(User.user_uuid.in_(uuids)).all())
+        missing = [u for u in uuids if u not in ids]
+        if missing:
+            raise ExportError(f"존재하지 않는 사용자입니다: {', '.join(missing)}", status=404)
+        filters['user_id'] = ids[filters['user_uuid']]
+    return filters
+
+
+def build_query(filters, cursor=None):
+    """내보낼 메시지 select (id 순서) - 대상 사용자 / 대화는 인덱스가 있는 컬럼으로 좁힘"""
+    sender = aliased(User)
+    receiver = aliased(User)
+    stmt = (
+        select(
+            Message.id, Message.timestamp, Message.room_uuid,
+            Message.sender_uuid, sender.name.label('sender_name'),
+            Message.receiver_uuid, receiver.name.label('receiver_name'),
+            Message.message_text, Message.file_name, Message.file_type, Message.file_size,
+            Message.deleted_at,
+        )
+        .outerjoin(sender, sender.id == Message.sender_id)
+        .outerjoin(receiver, receiver.id == Message.receiver_id)
+    )
+
+    if filters['room_uuid']:
+        stmt = stmt.where(Message.room_uuid == filters['room_uuid'])
+    elif filters['other_uuid']:
+        conversation = find_direct_conversation(filters['user_uuid'], filters['other_uuid'])
+        stmt = stmt.where(Message.conversation_id == (conversation.id if conversation else -1))
+    elif filters['user_uuid']:
+        user_id = filters['user_id']
+        stmt = stmt.where(or_(Message.sender_id == user_id, Message.receiver_id == user_id))
+
+    if filters['since']:
+        stmt = stmt.where(Message.timestamp >= filters['since'])
+    if filters['until']:
+        stmt = stmt.where(Message.timestamp < filters['until'])
+    if not filters['include_deleted']:
+        stmt = stmt.where(Message.deleted_at.is_(None))
+    if cursor:
+        stmt = stmt.where(Message.id > cursor)
+    return stmt.order_by(Message.id)
+
+
+def iter_rows(filters, cursor=None, batch_size=1000):
+    """server-side cursor 로 batch_size 행씩 가져오며 한 행씩 반환"""
+    result = db.session.execute(
+        build_query(filters, cursor),
+        execution_options={'stream_results': True, 'yield_per': batch_size},
+    )
+    try:
+        for row in result:
+            yield row
+    finally:
+        result.close()
+
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def render(rows, fmt):
+    """행 → 텍스트 조각 (FLUSH_BYTES 단위로 모아서)"""
+    buffer = io.StringIO()
+    writer = None
+    if fmt == 'csv':
+        writer = csv.writer(buffer)
+        writer.writerow(COLUMNS)
+    count = 0
+    try:
+        for row in rows:
+            values = [_value(getattr(row, c)) for c in COLUMNS]
+            if writer is not None:
+                writer.writerow(values)
+            else:
+                buffer.write(json.dumps(dict(zip(COLUMNS, values)), ensure_ascii=False))
+                buffer.write('\n')
+            count += 1
+            if buffer.tell() >= FLUSH_BYTES:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        EXPORT_ROWS.inc(count, format=fmt)
+
+
+def encode(chunks, gzip=False):
+    """텍스트 조각 → bytes (gzip 이면 스트림 압축)"""
+    if not gzip:
+        for chunk in chunks:
+            yield chunk.encode('utf-8')
+        return
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip 헤더
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream(filters, fmt='ndjson', gzip=False, cursor=None, batch_size=None):
+    """내보내기 본문 (bytes 조각 generator)"""
+    batch_size = batch_size or current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    return encode(render(iter_rows(filters, cursor, batch_size), fmt), gzip)
+
+
+def filename(filters, fmt, gzip=False):
+    target = filters['room_uuid'] or filters['user_uuid'] or 'messages'
+    suffix = f".{fmt}.gz" if gzip else f".{fmt}"
+    return f"export-{target[:36]}-{datetime.utcnow():%Y%m%d%H%M%S}{suffix}"
+
+
+@click.command('export-messages')
+@click.option('--room', 'room_uuid', help='그룹 채팅방 room_uuid')
+@click.option('--user', 'user_uuid', help='사용자 user_uuid (보내거나 받은 메시지)')
+@click.option('--other', 'other_uuid', help='--user 와 함께: 두 사람의 1:1 대화만')
+@click.option('--since', help='시작 시각 (ISO, 포함)')
+@click.option('--until', help='끝 시각 (ISO, 제외)')
+@click.option('--include-deleted', is_flag=True, help='삭제 표시된 메시지 포함')
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), default='ndjson', show_default=True)
+@click.option('--gzip', is_flag=True, help='gzip 압축')
+@click.option('--cursor', type=int, default=None, help='이 메시지 id 이후부터 (이어받기)')
+@click.option('-o', '--output', type=click.File('wb'), default='-', help='출력 파일 (기본: 표준 출력)')
+@with_appcontext
+def export_command(room_uuid, user_uuid, other_uuid, since, until, include_deleted, fmt, gzip, cursor, output):
+    """대화 내보내기 (NDJSON / CSV)"""
+    try:
+        filters = parse_filters({
+            'room_uuid': room_uuid, 'user_uuid': user_uuid, 'other_uuid': other_uuid,
+            'since': since, 'until': until, 'include_deleted': '1' if include_deleted else '0',
+        })
+    except ExportError as e:
+        raise click.UsageError(str(e))
+    for chunk in stream(filters, fmt, gzip, cursor):
+        output.write(chunk)
@@ -0,0 +1,235 @@
+# fanout.py
+"""소켓 fan-out: 여러 사용자에게 보내는 이벤트 전송
+
+- 한 사용자에게 보낼 이벤트가 여러 개면 'bundle' 하나로 묶어 전송 ([[event, data], ...])
+  → 클라이언트(socket.js)가 풀어서 각 이벤트 핸들러에 전달
+- 사용자가 여러 탭 / 기기로 접속 중이면 사용자 방('user:<uuid>')으로 emit 한 번 (직렬화도 한 번)
+- 접속 중인 대상이 FANOUT_CHUNK_SIZE 이하면 바로 전송, 넘으면 청크로 나눠 백그라운드 greenlet 에서 전송
+  (전사 공지방 메시지 한 건이 이벤트 핸들러 greenlet 을 오래 잡고 있지 않도록)
+- 동시에 전송 중인 청크는 FANOUT_MAX_CONCURRENT_CHUNKS 개까지 (나머지는 대기)
+- 전송 시작 ~ 마지막 청크 완료 시간을 socket_fanout_seconds 로 기록
+- 압축 전송을 협상한 연결(payloads)은 bundle 대신 짧은 시간 모아서 'frame' 하나로 (MessagePack)
+
+느린 수신자 (outbound backpressure)
+    연결의 송신 대기열(engine.io 큐)이 SOCKET_OUTBOUND_MAX_QUEUE 이상이면 바로 보내지 않고 정책에 따라 처리
+    - coalesce: 최신 상태 하나만 보관 (user_list 는 마지막 목록, room_list_update 는 전체 재조회 요청으로 합침)
+    - drop:     버리고 개수만 기록 → 대기열이 절반 이하로 줄면 보관한 이벤트와 함께 'resync' 를 보내 클라이언트가 재조회
+"""
+import logging
+import threading
+import time
+
+from connections import user_room
+from metrics import SOCKET_FANOUT, SOCKET_FANOUT_CHUNKS, SOCKET_FANOUT_LATENCY, SOCKET_OUTBOUND, registry
+import payloads
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_EVENT = 'bundle'
+
+RESYNC_EVENT = 'resync'
+FLUSH_INTERVAL = 0.2
+
+# 대기열이 찼을 때 이벤트별 처리 (없는 이벤트는 drop)
+COALESCE = {
+    'user_list': lambda old, new: new,
+    'room_list_update': lambda old, new: {'upsert': [], 'remove': [], 'refresh': True},
+    'rate_limited': lambda old, new: new,
+}
+
+_socketio = None
+_chunk_size = 200
+_chunk_slots = threading.BoundedSemaphore(4)
+_max_queue = 256
+_pending = {}          # sid -> {'events': {event: data}, 'dropped': n}
+_pending_lock = threading.Lock()
+_flusher_running = False
+
+
+def init_fanout(app, socketio):
+    """FANOUT_CHUNK_SIZE / FANOUT_MAX_CONCURRENT_CHUNKS / SOCKET_OUTBOUND_MAX_QUEUE 설정"""
+    global _socketio, _chunk_size, _chunk_slots, _max_queue
+    _socketio = socketio
+    _chunk_size = max(1, app.config.get('FANOUT_CHUNK_SIZE', 200))
+    _chunk_slots = threading.BoundedSemaphore(max(1, app.config.get('FANOUT_MAX_CONCURRENT_CHUNKS', 4)))
+    _max_queue = app.config.get('SOCKET_OUTBOUND_MAX_QUEUE', 256)
+    registry.gauge('socket_outbound_backlogged', '송신 대기열이 가득 차 이벤트를 보류 중인 연결 수',
+                   func=lambda: len(_pending))
+
+
+def _eio_socket(sid):
+    server = _socketio.server
+    eio_sid = server.manager.eio_sid_from_sid(sid, '/')
+    return server.eio.sockets.get(eio_sid) if eio_sid else None
+
+
+def backlog(sid):
+    """연결의 송신 대기 패킷 수 (확인할 수 없으면 0)"""
+    try:
+        sock = _eio_socket(sid)
+        return sock.queue.qsize() if sock is not None else 0
+    except Exception:
+        return 0
+
+
+def _emit(sid, events, callback=None):
+    if payloads.is_compact(sid):
+        payloads.queue(sid, events, callback)
+    elif len(events) == 1:
+        event, data = events[0]
+        _socketio.emit(event, data, to=sid, callback=callback)
+    elif events:
+        _socketio.emit(BUNDLE_EVENT, [[event, data] for event, data in events], to=sid, callback=callback)
+
+
+def send(sid, events, callback=None):
+    """한 연결에 이벤트 전송 (2개 이상이면 bundle 로 한 번에) - 대기열이 찬 연결은 정책에 따라 보류 / 버림
+
+    callback: 클라이언트 ack 시 호출 (보류 / 버린 이벤트는 호출되지 않음 → delivery 가 재전송)
+    """
+    if not events:
+        return
+    if _backlogged(sid):
+        _hold(sid, events)
+        return
+    _emit(sid, events, callback)
+
+
+def _backlogged(sid):
+    return bool(_max_queue) and (sid in _pending or backlog(sid) >= _max_queue)
+
+
+def send_user(user_uuid, sids, events):
+    """한 사용자의 모든 연결(sids)에 전송 - 대기열이 찬 연결 / 압축 연결이 없으면 사용자 방으로 emit 한 번"""
+    if not events or not sids:
+        return
+    if len(sids) > 1 and not any(_backlogged(sid) or payloads.is_compact(sid) for sid in sids):
+        _emit(user_room(user_uuid), events)
+        return
+    for sid in sids:
+        send(sid, events)
+
+
+def _hold(sid, events):
+    global _flusher_running
+    with _pending_lock:
+        state = _pending.setdefault(sid, {'events': {}, 'dropped': 0})
+        for event, data in events:
+            merge = COALESCE.get(event)
+            if merge is None:
+                state['dropped'] += 1
+                SOCKET_OUTBOUND.inc(event=event, action='dropped')
+                continue
+            held = state['events']
+            held[event] = merge(held[event], data) if event in held else data
+            SOCKET_OUTBOUND.inc(event=event, action='coalesced')
+        start = not _flusher_running
+        _flusher_running = True
+    if start:
+        _socketio.start_background_task(_flush_loop)
+
+
+def _flush_loop():
+    """보류 중인 연결의 대기열이 절반 이하로 줄면 보관한 이벤트 + resync 전송
+
+    연결 하나의 예외로 멈추지 않고, 어떤 이유로든 끝나면 _flusher_running 을 풀어 다음 _hold 가 다시 시작
+    """
+    global _flusher_running
+    stopped = False
+    try:
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            with _pending_lock:
+                sids = list(_pending)
+            for sid in sids:
+                try:
+                    _flush_one(sid)
+                except Exception:
+                    logger.exception("❌ 보류 이벤트 전송 실패", extra={'sid': sid})
+            with _pending_lock:
+                if not _pending:
+                    _flusher_running = False
+                    stopped = True
+                    return
+    finally:
+        if not stopped:
+            with _pending_lock:
+                _flusher_running = False
+
+
+def _flush_one(sid):
+    if not _socketio.server.manager.is_connected(sid, '/'):
+        forget(sid)  # 연결 종료
+        return
+    if backlog(sid) > _max_queue // 2:
+        return
+    with _pending_lock:
+        state = _pending.pop(sid, None)
+    if state is None:
+        return
+    events = list(state['events'].items())
+    if state['dropped']:
+        events.append((RESYNC_EVENT, {'dropped': state['dropped']}))
+    _emit(sid, events)
+
+
+def forget(sid):
+    """연결 종료 → 보류 중인 이벤트 제거"""
+    with _pending_lock:
+        _pending.pop(sid, None)
+    payloads.forget(sid)
+
+
+def _send_chunk(targets, events_for, kind, send_fn=send_user):
+    for user_uuid, sids in targets:
+        try:
+            send_fn(user_uuid, sids, events_for(user_uuid))
+        except Exception:
+            logger.exception("❌ 소켓 전송 실패", extra={'kind': kind, 'user_uuid': user_uuid})
+
+
+def deliver(kind, user_uuids, connections, events_for, send_fn=send_user):
+    """user_uuids 중 접속 중인 사용자의 모든 연결에 events_for(user_uuid) → [(event, data), ...] 전송
+    (send_fn(user_uuid, sids, events) 로 전송 방식 교체 - 예: delivery.send 는 ack 대기 + 재전송)
+
+    반환: 전송 대상(접속 중인 사용자) 수 - 큰 방은 백그라운드 청크로 넘기고 바로 반환
+    """
+    targets = [(u, sids) for u in user_uuids for sids in (connections.sids(u),) if sids]
+    return _dispatch(kind, targets, events_for, send_fn)
+
+
+def _dispatch(kind, targets, events_for, send_fn):
+    started = time.perf_counter()
+    SOCKET_FANOUT.observe(len(targets), kind=kind)
+
+    if len(targets) <= _chunk_size:
+        _send_chunk(targets, events_for, kind, send_fn)
+        SOCKET_FANOUT_LATENCY.observe(time.perf_counter() - started, kind=kind)
+        return len(targets)
+
+    chunks = [targets[i:i + _chunk_size] for i in range(0, len(targets), _chunk_size)]
+    remaining = [len(chunks)]
+    lock = threading.Lock()
+
+    def _run(chunk):
+        with _chunk_slots:
+            SOCKET_FANOUT_CHUNKS.inc(kind=kind)
+            _send_chunk(chunk, events_for, kind, send_fn)
+        with lock:
+            remaining[0] -= 1
+            done = remaining[0] == 0
+        if done:
+            elapsed = time.perf_counter() - started
+            SOCKET_FANOUT_LATENCY.observe(elapsed, kind=kind)
+            logger.debug("📣 대규모 fan-out 완료", extra={
+                'kind': kind, 'recipients': len(targets), 'chunks': len(chunks), 'seconds': round(elapsed, 3),
+            })
+
+    for chunk in chunks:
+        _socketio.start_background_task(_run, chunk)
+    return len(targets)
+
+
+def broadcast(kind, sids, events):
+    """접속한 모든 연결(sid 목록)에 같은 이벤트 전송 (접속자 목록 등)"""
+    return _dispatch(kind, [(sid, (sid,)) for sid in sids], lambda _: events, send_user)
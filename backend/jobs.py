@@ -0,0 +1,465 @@
+# jobs.py
+"""프로세스 내 백그라운드 작업 실행기
+
+API 요청은 핵심 쓰기만 commit 하고 응답하고, 로그 백업 / 소켓 알림 / 캐시 갱신 같은 후속 작업은
+enqueue() 로 등록해 worker greenlet 이 처리한다.
+
+    @job('archive_user_logs', max_attempts=5, concurrency=1)
+    def archive_user_logs(...): ...
+
+    enqueue('archive_user_logs', user_id=..., user_uuid=...)  # commit 전에 호출
+    db.session.commit()                                        # commit 되어야 실행
+
+- 등록한 세션이 commit 될 때 큐에 들어간다 (rollback 되면 버려짐, 대기 중인 변경이 없으면 즉시 등록)
+- 우선순위 높은 작업부터, 같은 우선순위는 실행 예정 시각 순
+- 실패 시 지수 백오프로 재시도 (max_attempts 초과 → failed)
+- 작업별 동시 실행 수 제한 (concurrency, 프로세스 단위)
+
+환경 변수
+    JOBS_BACKEND=memory     memory: 프로세스 메모리 큐 (재시작 시 대기 작업 유실)
+                            db:     jobs 테이블 (요청의 쓰기와 같은 트랜잭션으로 등록, 여러 워커 프로세스가 나눠 처리)
+    JOBS_WORKERS=4          worker greenlet 수
+    JOBS_POLL_INTERVAL=1    db 큐 조회 주기(초) - 같은 프로세스에서 등록한 작업은 commit 직후 바로 깨움
+    JOBS_LEASE_SECONDS=600  db 큐에서 running 상태로 이 시간이 지난 작업은 (프로세스 종료 등) 다시 queued
+    JOBS_RETENTION_HOURS=24 완료(done) 작업 보관 시간 / memory 는 최근 JOBS_HISTORY 건
+    JOBS_HISTORY=1000
+"""
+import heapq
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from itertools import count
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from db import db
+from metrics import JOB_DURATION, JOB_QUEUE, JOB_RUNS, registry
+from models import Job
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ('queued', 'running', 'done', 'failed')
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 300.0
+MAX_ERROR_LENGTH = 1000
+
+
+class JobSpec:
+    def __init__(self, name, fn, max_attempts, concurrency, priority):
+        self.name = name
+        self.fn = fn
+        self.max_attempts = max_attempts
+        self.concurrency = concurrency
+        self.priority = priority
+
+
+_specs = {}
+
+
+def job(name, max_attempts=5, concurrency=None, priority=0):
+    """작업 핸들러 등록 (payload 는 JSON 으로 저장 가능한 키워드 인자)"""
+    def decorator(fn):
+        _specs[name] = JobSpec(name, fn, max_attempts, concurrency, priority)
+        return fn
+    return decorator
+
+
+def backoff_delay(attempts):
+    """재시도 대기(초): 2, 4, 8 ... 최대 300 (±20% jitter)"""
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+
+
+# ---------------------------------------------------------------------------
+# 큐 백엔드 (memory / db) - 작업은 dict 로 주고받음
+# ---------------------------------------------------------------------------
+
+class MemoryQueue:
+    """프로세스 메모리 큐 (완료 / 실패 작업은 최근 history 건만 보관)"""
+
+    name = 'memory'
+
+    def __init__(self, history=1000):
+        self.jobs = {}
+        self.delayed = []         # heap (run_at, id) - 실행 예정 시각이 되면 ready 로
+        self.ready = {}           # 작업 이름 -> heap (-priority, run_at, id)
+        self.finished = deque()
+        self.history = history
+        self.ids = count(1)
+        self.lock = threading.Lock()
+
+    def add(self, name, payload, priority, run_at, max_attempts):
+        job_id = next(self.ids)
+        record = {
+            'id': job_id, 'name': name, 'payload': payload, 'priority': priority,
+            'status': 'queued', 'attempts': 0, 'max_attempts': max_attempts, 'run_at': run_at,
+            'created_at': datetime.utcnow(), 'started_at': None, 'finished_at': None,
+            'last_error': None, 'locked_by': None,
+        }
+        with self.lock:
+            self.jobs[job_id] = record
+            self._enqueue(record)
+        return job_id
+
+    def _enqueue(self, record):
+        heapq.heappush(self.delayed, (record['run_at'], record['id']))
+
+    def _promote(self, now):
+        """실행 예정 시각이 지난 작업을 이름별 ready heap 으로"""
+        while self.delayed and self.delayed[0][0] <= now:
+            _, job_id = heapq.heappop(self.delayed)
+            record = self.jobs[job_id]
+            heapq.heappush(self.ready.setdefault(record['name'], []),
+                           (-record['priority'], record['run_at'], job_id))
+
+    def claim(self, worker, skip_names):
+        """우선순위 → 실행 예정 시각 → id 순으로 첫 작업 (이름별 heap 의 맨 앞만 비교, 대기 작업 수와 무관)"""
+        now = datetime.utcnow()
+        with self.lock:
+            self._promote(now)
+            heads = [heap[0] for name, heap in self.ready.items() if heap and name not in skip_names]
+            if not heads:
+                return None
+            job_id = min(heads)[2]
+            record = self.jobs[job_id]
+            heapq.heappop(self.ready[record['name']])
+            record.update(status='running', attempts=record['attempts'] + 1,
+                          started_at=now, locked_by=worker)
+            return dict(record)
+
+    def finish(self, job_id, status, error=None, retry_at=None):
+        with self.lock:
+            record = self.jobs[job_id]
+            record['last_error'] = error
+            if retry_at is not None:
+                record.update(status='queued', run_at=retry_at, locked_by=None)
+                self._enqueue(record)
+                return
+            record.update(status=status, finished_at=datetime.utcnow(), locked_by=None)
+            self.finished.append(job_id)
+            while len(self.finished) > self.history:
+                self.jobs.pop(self.finished.popleft(), None)
+
+    def retry(self, job_id):
+        with self.lock:
+            record = self.jobs.get(job_id)
+            if record is None or record['status'] != 'failed':
+                return False
+            record.update(status='queued', attempts=0, run_at=datetime.utcnow(), finished_at=None)
+            self._enqueue(record)
+            return True
+
+    def get(self, job_id):
+        with self.lock:
+            record = self.jobs.get(job_id)
+            return dict(record) if record else None
+
+    def list(self, status=None, name=None, limit=50):
+        with self.lock:
+            records = [
+                dict(r) for r in self.jobs.values()
+                if (status is None or r['status'] == status) and (name is None or r['name'] == name)
+            ]
+        return sorted(records, key=lambda r: r['id'], reverse=True)[:limit]
+
+    def counts(self):
+        with self.lock:
+            result = dict.fromkeys(STATUSES, 0)
+            for r in self.jobs.values():
+                result[r['status']] += 1
+            return result
+
+    def maintain(self, lease_seconds, retention_hours):
+        pass
+
+
+def _row_to_dict(row):
+    return {
+        'id': row.id, 'name': row.name, 'payload': json.loads(row.payload), 'priority': row.priority,
+        'status': row.status, 'attempts': row.attempts, 'max_attempts': row.max_attempts,
+        'run_at': row.run_at, 'created_at': row.created_at, 'started_at': row.started_at,
+        'finished_at': row.finished_at, 'last_error': row.last_error, 'locked_by': row.locked_by,
+    }
+
+
+class DbQueue:
+    """jobs 테이블 큐 - 조건부 UPDATE 로 한 작업을 한 worker 만 가져감 (여러 프로세스 가능)"""
+
+    name = 'db'
+
+    def add(self, name, payload, priority, run_at, max_attempts):
+        row = Job(name=name, payload=json.dumps(payload, ensure_ascii=False, default=str),
+                  priority=priority, run_at=run_at, max_attempts=max_attempts)
+        db.session.add(row)
+        db.session.info['jobs_added'] = True
+        return row
+
+    def claim(self, worker, skip_names):
+        now = datetime.utcnow()
+        query = Job.query.filter(Job.status == 'queued', Job.run_at <= now)
+        if skip_names:
+            query = query.filter(Job.name.notin_(skip_names))
+        candidates = query.order_by(Job.priority.desc(), Job.run_at, Job.id).limit(10).all()
+        for candidate in candidates:
+            claimed = Job.query.filter_by(id=candidate.id, status='queued').update({
+                'status': 'running', 'attempts': Job.attempts + 1, 'started_at': now, 'locked_by': worker,
+            }, synchronize_session=False)
+            db.session.commit()
+            if claimed:
+                return _row_to_dict(db.session.get(Job, candidate.id))
+        db.session.commit()
+        return None
+
+    def finish(self, job_id, status, error=None, retry_at=None):
+        values = {'last_error': error, 'locked_by': None}
+        if retry_at is not None:
+            values.update(status='queued', run_at=retry_at)
+        else:
+            values.update(status=status, finished_at=datetime.utcnow())
+        Job.query.filter_by(id=job_id).update(values, synchronize_session=False)
+        db.session.commit()
+
+    def retry(self, job_id):
+        retried = Job.query.filter_by(id=job_id, status='failed').update(
+            {'status': 'queued', 'attempts': 0, 'run_at': datetime.utcnow(), 'finished_at': None},
+            synchronize_session=False)
+        db.session.commit()
+        return bool(retried)
+
+    def get(self, job_id):
+        row = db.session.get(Job, job_id)
+        return _row_to_dict(row) if row else None
+
+    def list(self, status=None, name=None, limit=50):
+        query = Job.query
+        if status:
+            query = query.filter(Job.status == status)
+        if name:
+            query = query.filter(Job.name == name)
+        return [_row_to_dict(r) for r in query.order_by(Job.id.desc()).limit(limit)]
+
+    def counts(self):
+        result = dict.fromkeys(STATUSES, 0)
+        for status, n in db.session.query(Job.status, func.count(Job.id)).group_by(Job.status):
+            result[status] = n
+        return result
+
+    def maintain(self, lease_seconds, retention_hours):
+        """만료된 running 작업 재등록 + 오래된 done 작업 삭제"""
+        now = datetime.utcnow()
+        expired = Job.query.filter(
+            Job.status == 'running', Job.started_at < now - timedelta(seconds=lease_seconds)
+        ).update({'status': 'queued', 'run_at': now, 'locked_by': None}, synchronize_session=False)
+        Job.query.filter(
+            Job.status == 'done', Job.finished_at < now - timedelta(hours=retention_hours)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        if expired:
+            logger.warning("⚠️ 실행 시간이 만료된 작업 재등록", extra={'jobs': expired})
+
+
+_queue = MemoryQueue()
+_runner = None
+
+
+# ---------------------------------------------------------------------------
+# 등록: 요청 세션의 commit 과 함께
+# ---------------------------------------------------------------------------
+
+def _has_pending_writes(session):
+    return bool(session.new or session.dirty or session.deleted or session.info.get('wrote'))
+
+
+def enqueue(name, priority=None, delay=0, **payload):
+    """작업 등록 - 세션에 대기 중인 쓰기가 있으면 그 commit 이후 실행, 없으면 바로 등록"""
+    spec = _specs[name]
+    priority = spec.priority if priority is None else priority
+    run_at = datetime.utcnow() + timedelta(seconds=delay)
+    args = (name, payload, priority, run_at, spec.max_attempts)
+    pending = _has_pending_writes(db.session)
+
+    if isinstance(_queue, DbQueue):
+        _queue.add(*args)
+        if not pending:
+            db.session.commit()
+    elif pending:
+        db.session.info.setdefault('pending_jobs', []).append(args)
+    else:
+        _queue.add(*args)
+        if _runner:
+            _runner.wake()
+
+
+@event.listens_for(Session, 'after_commit')
+def _after_commit(session):
+    pending = session.info.pop('pending_jobs', None)
+    added = session.info.pop('jobs_added', False)
+    for args in pending or ():
+        _queue.add(*args)
+    if (pending or added) and _runner:
+        _runner.wake()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _after_rollback(session):
+    session.info.pop('pending_jobs', None)
+    session.info.pop('jobs_added', None)
+
+
+# ---------------------------------------------------------------------------
+# 실행
+# ---------------------------------------------------------------------------
+
+class JobRunner:
+    def __init__(self, app, queue, workers=4, poll_interval=1.0, lease_seconds=600, retention_hours=24):
+        self.app = app
+        self.queue = queue
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.retention_hours = retention_hours
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.running = {}          # 작업 이름 -> 실행 중인 수 (이 프로세스)
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.last_maintain = 0.0
+
+    def start(self):
+        for i in range(self.workers):
+            threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True).start()
+
+    def wake(self):
+        self.wakeup.set()
+
+    def _claim(self):
+        """동시 실행 제한에 걸린 작업은 건너뛰고 가져옴"""
+        with self.lock:
+            skip = [
+                name for name, n in self.running.items()
+                if _specs.get(name) and _specs[name].concurrency and n >= _specs[name].concurrency
+            ]
+            record = self.queue.claim(self.worker_id, skip)
+            if record is not None:
+                self.running[record['name']] = self.running.get(record['name'], 0) + 1
+            return record
+
+    def _work(self):
+        while True:
+            with self.app.app_context():
+                try:
+                    if time.monotonic() - self.last_maintain > 60:
+                        self.last_maintain = time.monotonic()
+                        self.queue.maintain(self.lease_seconds, self.retention_hours)
+                    record = self._claim()
+                except Exception:
+                    logger.exception("❌ 작업 큐 조회 실패")
+                    db.session.rollback()
+                    record = None
+
+                if record is None:
+                    self.wakeup.wait(self.poll_interval)
+                    self.wakeup.clear()
+                    continue
+                self._run(record)
+
+    def _run(self, record):
+        name = record['name']
+        spec = _specs.get(name)
+        started = time.perf_counter()
+        result = 'done'
+        try:
+            if spec is None:
+                raise LookupError(f"등록되지 않은 작업: {name}")
+            spec.fn(**record['payload'])
+            db.session.commit()
+            self.queue.finish(record['id'], 'done')
+        except Exception as e:
+            db.session.rollback()
+            error = f'{type(e).__name__}: {e}'[:MAX_ERROR_LENGTH]
+            if record['attempts'] < record['max_attempts']:
+                result = 'retry'
+                delay = backoff_delay(record['attempts'])
+                logger.warning("⚠️ 작업 실패 - 재시도 예정", extra={
+                    'job': name, 'job_id': record['id'], 'attempts': record['attempts'],
+                    'retry_in': round(delay, 1), 'error': error,
+                })
+                self.queue.finish(record['id'], 'queued', error,
+                                  retry_at=datetime.utcnow() + timedelta(seconds=delay))
+            else:
+                result = 'failed'
+                logger.exception("❌ 작업 실패", extra={'job': name, 'job_id': record['id']})
+                self.queue.finish(record['id'], 'failed', error)
+        finally:
+            with self.lock:
+                self.running[name] -= 1
+            JOB_RUNS.inc(job=name, result=result)
+            JOB_DURATION.observe(time.perf_counter() - started, job=name)
+
+
+def init_jobs(app):
+    """JOBS_BACKEND 로 큐 선택 후 worker 시작 (create_app 에서 db.init_app 이후 호출)"""
+    global _queue, _runner
+    import tasks  # noqa: F401  (작업 핸들러 등록)
+
+    backend = app.config.get('JOBS_BACKEND', 'memory')
+    if backend == 'db':
+        _queue = DbQueue()
+    elif backend == 'memory':
+        _queue = MemoryQueue(history=app.config.get('JOBS_HISTORY', 1000))
+    else:
+        raise ValueError(f"❌ 지원하지 않는 JOBS_BACKEND: {backend} (memory, db)")
+
+    _runner = JobRunner(
+        app, _queue,
+        workers=max(1, app.config.get('JOBS_WORKERS', 4)),
+        poll_interval=app.config.get('JOBS_POLL_INTERVAL', 1.0),
+        lease_seconds=app.config.get('JOBS_LEASE_SECONDS', 600),
+        retention_hours=app.config.get('JOBS_RETENTION_HOURS', 24),
+    )
+    _runner.start()
+
+    @registry.add_collector
+    def _collect_jobs():
+        try:
+            with app.app_context():
+                for status, n in _queue.counts().items():
+                    JOB_QUEUE.set(n, status=status)
+        except Exception:
+            logger.warning("⚠️ 작업 큐 상태 조회 실패")
+
+    logger.info("✅ 백그라운드 작업 실행기", extra={'backend': backend, 'workers': _runner.workers})
+    return _runner
+
+
+def get_job(job_id):
+    return _queue.get(job_id)
+
+
+def list_jobs(status=None, name=None, limit=50):
+    return _queue.list(status, name, limit)
+
+
+def job_counts():
+    return _queue.counts()
+
+
+def retry_job(job_id):
+    """실패한 작업을 다시 대기열로"""
+    retried = _queue.retry(job_id)
+    if retried and _runner:
+        _runner.wake()
+    return retried
+
+
+def serialize(record):
+    return {
+        **record,
+        **{k: record[k].isoformat() if record[k] else None
+           for k in ('run_at', 'created_at', 'started_at', 'finished_at')},
+    }
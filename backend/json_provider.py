@@ -0,0 +1,71 @@
+# json_provider.py
+from datetime import date, datetime
+import logging
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson  # 선택 의존성: 설치되어 있으면 빠른 직렬화 사용
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _default(o):
+    # ✅ datetime은 HTTP 날짜 형식이 아니라 ISO 8601 문자열로 (orjson 출력과 동일)
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class StdJSONProvider(DefaultJSONProvider):
+    """표준 json 모듈 기반 provider (orjson이 없을 때의 대체용)"""
+
+    default = staticmethod(_default)
+    ensure_ascii = False
+    sort_keys = False
+
+
+class OrjsonProvider(StdJSONProvider):
+    """orjson 기반 provider - datetime/UUID를 네이티브로 직렬화한다."""
+
+    option = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps_bytes(self, obj):
+        return orjson.dumps(obj, default=_default, option=self.option)
+
+    def dumps(self, obj, **kwargs):
+        # indent 등 orjson이 지원하지 않는 옵션이 들어오면 표준 json으로 처리
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # ✅ bytes를 그대로 응답 본문으로 사용 (str 변환/인코딩 왕복 제거)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
+
+
+JSON_PROVIDERS = {
+    'orjson': OrjsonProvider,
+    'json': StdJSONProvider,
+}
+
+
+def init_json_provider(app):
+    """JSON_PROVIDER 설정(orjson | json)에 따라 app.json 을 교체한다."""
+    name = app.config.get('JSON_PROVIDER', 'orjson')
+    if name == 'orjson' and orjson is None:
+        logger.warning("⚠️ orjson 미설치 → 표준 json provider 사용")
+        name = 'json'
+    provider_class = JSON_PROVIDERS.get(name)
+    if provider_class is None:
+        raise ValueError(f"❌ 알 수 없는 JSON_PROVIDER: {name}")
+    app.json = provider_class(app)
+    return app.json
@@ -0,0 +1,161 @@
+# logging_setup.py
+"""구조화(JSON) 로그 + 큐 기반 비동기 기록
+
+요청/소켓 핸들러는 QueueHandler 로 레코드를 큐에 넣기만 하고,
+실제 stdout 쓰기는 백그라운드 OS 스레드가 처리한다.
+
+환경 변수
+    LOG_LEVEL=INFO                         루트 레벨
+    LOG_LEVELS=sockets=WARNING,routes=DEBUG 모듈별 레벨
+    LOG_FORMAT=json | text
+    LOG_SAMPLE_EVERY=100                   extra={'sample': key} 레코드는 key 별 N건 중 1건만 기록
+    LOG_SAMPLING=socket.chat=1000,...      key 별 N 재정의
+"""
+import _thread
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+
+try:
+    from gevent import monkey
+    # ✅ gevent 패치 이전의 원본 큐/스레드 → 로그 쓰기가 gevent 허브를 막지 않음
+    _SimpleQueue = monkey.get_original('queue', 'SimpleQueue')
+    _start_new_thread = monkey.get_original('_thread', 'start_new_thread')
+    _allocate_lock = monkey.get_original('_thread', 'allocate_lock')
+except ImportError:
+    _SimpleQueue = queue.SimpleQueue
+    _start_new_thread = _thread.start_new_thread
+    _allocate_lock = _thread.allocate_lock
+
+# LogRecord 기본 속성 (나머지는 extra 로 넘어온 구조화 필드)
+_RESERVED = set(logging.LogRecord('', 0, '', 0, '', (), None).__dict__) | {'message', 'asctime', 'sample'}
+
+_listener = None
+
+
+def _parse_pairs(text):
+    pairs = {}
+    for part in (text or '').split(','):
+        if '=' in part:
+            key, value = part.split('=', 1)
+            pairs[key.strip()] = value.strip()
+    return pairs
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s [%(name)s] %(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        fields = ' '.join(f'{k}={v}' for k, v in record.__dict__.items() if k not in _RESERVED)
+        return f'{line} {fields}' if fields else line
+
+
+class SamplingFilter(logging.Filter):
+    """extra={'sample': key} 가 붙은 고빈도 레코드는 key 별로 N건 중 1건만 통과"""
+
+    def __init__(self, default_every, overrides):
+        super().__init__()
+        self.default_every = max(1, default_every)
+        self.overrides = {k: max(1, int(v)) for k, v in overrides.items()}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        key = getattr(record, 'sample', None)
+        if key is None or record.levelno >= logging.WARNING:
+            return True
+        every = self.overrides.get(key, self.default_every)
+        with self.lock:
+            n = self.counters.get(key, 0)
+            self.counters[key] = n + 1
+        if n % every:
+            return False
+        record.sampled_every = every
+        return True
+
+
+class BackgroundLogWriter:
+    """QueueListener 와 같은 역할이지만 gevent 패치와 무관한 실제 OS 스레드에서 동작"""
+
+    _sentinel = None
+
+    def __init__(self, log_queue, *handlers):
+        self.queue = log_queue
+        self.handlers = handlers
+        self._done = _allocate_lock()
+
+    def start(self):
+        self._done.acquire()
+        _start_new_thread(self._run, ())
+
+    def _run(self):
+        try:
+            while True:
+                record = self.queue.get()
+                if record is self._sentinel:
+                    break
+                for handler in self.handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+        finally:
+            for handler in self.handlers:
+                handler.flush()
+            self._done.release()
+
+    def stop(self, timeout=5):
+        self.queue.put(self._sentinel)
+        if self._done.acquire(timeout=timeout):
+            self._done.release()
+
+
+def setup_logging():
+    """루트 로거를 큐 핸들러 + 백그라운드 writer 로 구성 (여러 번 호출해도 한 번만 적용)"""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    formatter = JSONFormatter() if os.environ.get('LOG_FORMAT', 'json') == 'json' else TextFormatter()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    log_queue = _SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(
+        int(os.environ.get('LOG_SAMPLE_EVERY', 100)),
+        _parse_pairs(os.environ.get('LOG_SAMPLING')),
+    ))
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+    for name, level in _parse_pairs(os.environ.get('LOG_LEVELS')).items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    _listener = BackgroundLogWriter(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
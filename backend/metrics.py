@@ -0,0 +1,342 @@
+# metrics.py
+import hmac
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, current_app, g, request
+from sqlalchemy import event
+
+# ✅ Prometheus text 포맷(0.0.4) 으로 노출하는 간단한 메트릭 레지스트리
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    body = ','.join(
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in pairs
+    )
+    return '{' + body + '}'
+
+
+def _format_value(v):
+    if v == float('inf'):
+        return '+Inf'
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return repr(v) if isinstance(v, float) else str(v)
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"❌ {self.name}: 라벨 불일치 {sorted(labels)} != {sorted(self.labelnames)}")
+        return tuple(labels[n] for n in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self.values.get(self._key(labels), 0)
+
+    def render(self):
+        with self.lock:
+            items = list(self.values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), func=None):
+        super().__init__(name, documentation, labelnames)
+        self.values = {}
+        # func 가 주어지면 렌더링 시점에 값을 읽어옴 (라벨 없는 gauge 전용)
+        self.func = func
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self):
+        if self.func is not None:
+            return [f"{self.name} {_format_value(self.func())}"]
+        with self.lock:
+            items = list(self.values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.values = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        idx = bisect_left(self.buckets, value)
+        with self.lock:
+            slot = self.values.get(key)
+            if slot is None:
+                slot = self.values[key] = [0] * (len(self.buckets) + 2)
+            if idx < len(self.buckets):
+                slot[idx] += 1
+            slot[-2] += value
+            slot[-1] += 1
+
+    def render(self):
+        with self.lock:
+            items = [(k, list(v)) for k, v in self.values.items()]
+        lines = []
+        for key, slot in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, slot):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', _format_value(float(bound))))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', '+Inf'))} {slot[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(slot[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {slot[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), func=None):
+        return self.register(Gauge(name, documentation, labelnames, func))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, func):
+        """렌더링 직전에 호출되어 gauge 값을 갱신하는 콜백 등록"""
+        self.collectors.append(func)
+        return func
+
+    def render(self):
+        for collect in self.collectors:
+            collect()
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+# ✅ HTTP
+HTTP_REQUESTS = registry.counter(
+    'http_requests_total', 'HTTP 요청 수', ('method', 'route', 'status'))
+HTTP_LATENCY = registry.histogram(
+    'http_request_duration_seconds', 'HTTP 요청 처리 시간', ('method', 'route'))
+
+# ✅ SQL
+SQL_STATEMENTS = registry.counter(
+    'sql_statements_total', '실행된 SQL 문 수', ('route',))
+SQL_TIME = registry.counter(
+    'sql_statement_seconds_total', 'SQL 실행 누적 시간', ('route',))
+SQL_PER_REQUEST = registry.histogram(
+    'sql_statements_per_request', '요청당 SQL 문 수', ('route',), buckets=COUNT_BUCKETS)
+SQL_TIME_PER_REQUEST = registry.histogram(
+    'sql_seconds_per_request', '요청당 SQL 실행 시간', ('route',))
+
+# ✅ Socket.IO
+SOCKET_EVENTS = registry.counter(
+    'socket_events_total', '수신한 소켓 이벤트 수', ('event',))
+SOCKET_FANOUT = registry.histogram(
+    'socket_fanout_recipients', '메시지 1건당 전송 대상 수', ('kind',), buckets=COUNT_BUCKETS)
+SOCKET_FANOUT_LATENCY = registry.histogram(
+    'socket_fanout_seconds', '메시지 1건 fan-out 시작 ~ 마지막 대상 전송 완료 시간', ('kind',))
+SOCKET_FANOUT_CHUNKS = registry.counter(
+    'socket_fanout_chunks_total', '백그라운드로 나눠 보낸 fan-out 청크 수', ('kind',))
+SOCKET_DELIVERY = registry.counter(
+    'socket_delivery_total', 'ack 를 기다리는 소켓 전송 결과 (acked / acked_retry / retried / lost / offline / overflow)',
+    ('kind', 'result'))
+SOCKET_DELIVERY_LATENCY = registry.histogram(
+    'socket_delivery_ack_seconds', '소켓 전송 ~ 클라이언트 ack 시간 (재전송 포함)', ('kind',))
+SOCKET_OUTBOUND = registry.counter(
+    'socket_outbound_held_total', '송신 대기열이 가득 찬 연결에 보내지 못한 이벤트 (coalesced / dropped)',
+    ('event', 'action'))
+SOCKET_COMPACT_FRAMES = registry.histogram(
+    'socket_compact_frame_events', '압축 연결 frame 1개에 묶은 이벤트 수', buckets=COUNT_BUCKETS)
+SOCKET_COMPACT_BYTES = registry.counter(
+    'socket_compact_bytes_total', '압축 연결에 보낸 frame 크기 합 (MessagePack bytes)')
+
+# ✅ 그룹 채팅방 읽음 표시 (written: 바로 기록 / debounced: 메모리 보관 / flushed: 모아서 기록)
+READ_STATUS_WRITES = registry.counter('read_status_writes_total', '읽음 표시 처리 수', ('result',))
+
+# ✅ 요청 제한 (rate_limit)
+RATE_LIMITED = registry.counter('rate_limited_total', '요청 제한으로 거절한 요청 / 소켓 이벤트 수', ('limit',))
+
+# ✅ JWT 검증 캐시 (hit / miss / expired / revoked)
+JWT_CACHE = registry.counter('jwt_cache_total', 'JWT 검증 캐시 조회 결과', ('result',))
+
+# ✅ 대화 내보내기
+EXPORT_ROWS = registry.counter('export_rows_total', '내보낸 메시지 행 수', ('format',))
+
+# ✅ 메시지 통계 집계
+ANALYTICS_ROLLUP = registry.counter('analytics_rollup_messages_total', '통계 집계에 반영한 메시지 수')
+
+# ✅ DB 커넥션 풀 (db_pool.get_pool_metrics 값으로 렌더링 시 갱신)
+DB_POOL = registry.gauge('db_pool', 'DB 커넥션 풀 상태', ('stat',))
+
+# ✅ 읽기 전용 요청의 DB 라우팅 (db_routing)
+DB_READ_ROUTE = registry.counter(
+    'db_read_route_total', '읽기 전용 요청 세션의 대상 DB', ('target', 'reason'))
+DB_REPLICA_HEALTHY = registry.gauge('db_replica_healthy', 'replica 사용 가능 여부 (1/0)', ('bind',))
+DB_REPLICA_LAG = registry.gauge('db_replica_lag_seconds', 'replica 복제 지연', ('bind',))
+
+
+def _route_label():
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+def _sql_label():
+    # 요청 밖(소켓 핸들러, 백그라운드 작업)에서 실행된 SQL 은 'background' 로 집계
+    try:
+        return _route_label()
+    except RuntimeError:
+        return 'background'
+
+
+def init_sql_metrics(engine):
+    """SQLAlchemy 이벤트 훅으로 SQL 문 수 / 시간 측정"""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('query_start')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        route = _sql_label()
+        SQL_STATEMENTS.inc(route=route)
+        SQL_TIME.inc(elapsed, route=route)
+        try:
+            g.sql_count = g.get('sql_count', 0) + 1
+            g.sql_time = g.get('sql_time', 0.0) + elapsed
+        except RuntimeError:
+            pass
+
+
+def init_metrics(app, engine, connections):
+    """요청 지연 히스토그램 / SQL 카운터 / 소켓 접속 수를 /metrics 로 노출"""
+    from db_pool import get_pool_metrics
+
+    init_sql_metrics(engine)
+
+    registry.gauge('socket_connected_sids', '현재 접속 중인 소켓 수',
+                   func=connections.connection_count)
+    registry.gauge('socket_connected_users', '현재 접속 중인 사용자 수',
+                   func=connections.user_count)
+    registry.gauge('socket_registry_bytes', '소켓 연결 목록이 차지하는 메모리 (대략)',
+                   func=connections.memory_bytes)
+
+    @registry.add_collector
+    def _collect_pool():
+        for stat, value in get_pool_metrics(engine).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                DB_POOL.set(value, stat=stat)
+
+    @app.before_request
+    def _start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop('request_start', None)
+        if start is None or request.endpoint == 'metrics':
+            return response
+        route = _route_label()
+        HTTP_LATENCY.observe(time.perf_counter() - start, method=request.method, route=route)
+        HTTP_REQUESTS.inc(method=request.method, route=route, status=str(response.status_code))
+        SQL_PER_REQUEST.observe(g.get('sql_count', 0), route=route)
+        SQL_TIME_PER_REQUEST.observe(g.get('sql_time', 0.0), route=route)
+        return response
+
+    @app.route('/metrics', endpoint='metrics')
+    def metrics():
+        denied = _metrics_access_denied()
+        if denied is not None:
+            return denied
+        return Response(registry.render(), content_type=CONTENT_TYPE)
+
+
+def _metrics_access_denied():
+    """METRICS_TOKEN 이 있으면 Bearer 토큰, 없으면 METRICS_ALLOW_IPS 의 접속 IP 만 허용 → 거절 응답 / None"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        scheme, _, given = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() == 'bearer' and hmac.compare_digest(given.strip().encode(), token.encode()):
+            return None
+        return Response('unauthorized\n', status=401, content_type='text/plain',
+                        headers={'WWW-Authenticate': 'Bearer realm="metrics"'})
+    if request.remote_addr in current_app.config.get('METRICS_ALLOW_IPS', ('127.0.0.1', '::1')):
+        return None
+    return Response('forbidden\n', status=403, content_type='text/plain')
+
+# ✅ 첨부파일 GC (attachments)
+ATTACHMENT_GC_FILES = registry.counter(
+    'attachment_gc_files_total', '첨부파일 GC 처리 건수 (deleted: 고아 파일 삭제, missing: 파일 없는 메시지)', ('result',))
+ATTACHMENT_GC_BYTES = registry.counter(
+    'attachment_gc_bytes_total', '첨부파일 GC 로 확보한 용량(byte)')
+
+# ✅ 백그라운드 작업 (jobs)
+JOB_RUNS = registry.counter(
+    'job_runs_total', '작업 실행 결과 (done / retry / failed)', ('job', 'result'))
+JOB_DURATION = registry.histogram(
+    'job_duration_seconds', '작업 실행 시간', ('job',))
+JOB_QUEUE = registry.gauge('job_queue', '상태별 작업 수', ('status',))
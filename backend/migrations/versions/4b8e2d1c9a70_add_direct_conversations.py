@@ -0,0 +1,87 @@
+"""add direct conversations
+
+Revision ID: 4b8e2d1c9a70
+Revises: 207c043985d0
+Create Date: 2026-10-19 10:12:31.402118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b8e2d1c9a70'
+down_revision = '207c043985d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('direct_conversations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_low_uuid', sa.String(length=36), nullable=False),
+    sa.Column('user_high_uuid', sa.String(length=36), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_message_id', sa.Integer(), nullable=True),
+    sa.Column('last_message_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_high_uuid'], ['users.user_uuid'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_low_uuid'], ['users.user_uuid'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_low_uuid', 'user_high_uuid', name='unique_direct_pair')
+    )
+    with op.batch_alter_table('direct_conversations', schema=None) as batch_op:
+        batch_op.create_index('ix_direct_low_last', ['user_low_uuid', 'last_message_at'], unique=False)
+        batch_op.create_index('ix_direct_high_last', ['user_high_uuid', 'last_message_at'], unique=False)
+
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('conversation_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_messages_conversation_id', 'direct_conversations', ['conversation_id'], ['id'])
+        batch_op.create_index('ix_messages_conversation_timestamp', ['conversation_id', 'timestamp'], unique=False)
+
+    # ✅ 기존 1:1 메시지의 사용자 쌍으로 대화 행 생성 (탈퇴 등으로 users 에 없는 uuid 는 제외)
+    op.execute("""
+        INSERT INTO direct_conversations (user_low_uuid, user_high_uuid, created_at, last_message_at)
+        SELECT LEAST(m.sender_uuid, m.receiver_uuid), GREATEST(m.sender_uuid, m.receiver_uuid),
+               MIN(m.timestamp), MAX(m.timestamp)
+        FROM messages m
+        JOIN users s ON s.user_uuid = m.sender_uuid
+        JOIN users r ON r.user_uuid = m.receiver_uuid
+        WHERE m.room_uuid IS NULL AND m.receiver_uuid IS NOT NULL
+        GROUP BY LEAST(m.sender_uuid, m.receiver_uuid), GREATEST(m.sender_uuid, m.receiver_uuid)
+    """)
+
+    # ✅ 메시지에 conversation_id 연결
+    op.execute("""
+        UPDATE messages m
+        JOIN direct_conversations c
+          ON c.user_low_uuid = LEAST(m.sender_uuid, m.receiver_uuid)
+         AND c.user_high_uuid = GREATEST(m.sender_uuid, m.receiver_uuid)
+        SET m.conversation_id = c.id
+        WHERE m.room_uuid IS NULL AND m.receiver_uuid IS NOT NULL
+    """)
+
+    # ✅ 마지막 메시지 (같은 시각이면 id 가 큰 쪽)
+    op.execute("""
+        UPDATE direct_conversations c
+        JOIN (
+            SELECT m.conversation_id, MAX(m.id) AS last_id
+            FROM messages m
+            JOIN direct_conversations c2
+              ON c2.id = m.conversation_id AND m.timestamp = c2.last_message_at
+            GROUP BY m.conversation_id
+        ) latest ON latest.conversation_id = c.id
+        SET c.last_message_id = latest.last_id
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_messages_conversation_id', type_='foreignkey')
+        batch_op.drop_index('ix_messages_conversation_timestamp')
+        batch_op.drop_column('conversation_id')
+
+    with op.batch_alter_table('direct_conversations', schema=None) as batch_op:
+        batch_op.drop_index('ix_direct_high_last')
+        batch_op.drop_index('ix_direct_low_last')
+
+    op.drop_table('direct_conversations')
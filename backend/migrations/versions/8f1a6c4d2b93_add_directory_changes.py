@@ -0,0 +1,32 @@
+"""add directory changes
+
+Revision ID: 8f1a6c4d2b93
+Revises: 5d9e3b7a2c81
+Create Date: 2026-10-19 22:41:08.517302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f1a6c4d2b93'
+down_revision = '5d9e3b7a2c81'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'directory_changes',
+        sa.Column('version', sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column('user_uuid', sa.String(length=36), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('version'),
+    )
+    # 버전 1 = 기존 사용자 전체 (이전 버전을 가진 클라이언트는 없지만 잠금 기준 행 역할)
+    op.execute("INSERT INTO directory_changes (version, user_uuid, created_at) VALUES (1, NULL, CURRENT_TIMESTAMP)")
+
+
+def downgrade():
+    op.drop_table('directory_changes')
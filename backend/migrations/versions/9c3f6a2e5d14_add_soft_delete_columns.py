@@ -0,0 +1,40 @@
+"""add soft delete columns
+
+Revision ID: 9c3f6a2e5d14
+Revises: 4b8e2d1c9a70
+Create Date: 2026-10-19 14:03:52.118406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c3f6a2e5d14'
+down_revision = '4b8e2d1c9a70'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_messages_deleted_at', ['deleted_at'], unique=False)
+
+    with op.batch_alter_table('chat_room', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table('direct_conversations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cleared_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('direct_conversations', schema=None) as batch_op:
+        batch_op.drop_column('cleared_at')
+
+    with op.batch_alter_table('chat_room', schema=None) as batch_op:
+        batch_op.drop_column('deleted_at')
+
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_messages_deleted_at')
+        batch_op.drop_column('deleted_at')
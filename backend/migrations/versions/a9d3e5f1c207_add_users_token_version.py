@@ -0,0 +1,26 @@
+"""add users.token_version for token revocation
+
+Revision ID: a9d3e5f1c207
+Revises: f3c8e1a7b294
+Create Date: 2026-10-22 09:41:27.604815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d3e5f1c207'
+down_revision = 'f3c8e1a7b294'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('token_version')
@@ -0,0 +1,26 @@
+"""index password reset requests by status
+
+Revision ID: b6d2e8a41f07
+Revises: 8f1a6c4d2b93
+Create Date: 2026-10-19 23:12:44.091835
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6d2e8a41f07'
+down_revision = '8f1a6c4d2b93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('password_reset_requests', schema=None) as batch_op:
+        batch_op.create_index('ix_password_reset_status_id', ['status', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('password_reset_requests', schema=None) as batch_op:
+        batch_op.drop_index('ix_password_reset_status_id')
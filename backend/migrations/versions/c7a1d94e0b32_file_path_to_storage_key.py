@@ -0,0 +1,74 @@
+"""file_path to storage key
+
+Revision ID: c7a1d94e0b32
+Revises: 9c3f6a2e5d14
+Create Date: 2026-10-19 16:41:07.552913
+
+"""
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7a1d94e0b32'
+down_revision = '9c3f6a2e5d14'
+branch_labels = None
+depends_on = None
+
+# 기존 업로드 위치 (backend/chat_files) - downgrade 시 절대 경로 복원용
+LOCAL_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'chat_files'))
+BATCH_SIZE = 1000
+
+messages = sa.table(
+    'messages',
+    sa.column('id', sa.Integer),
+    sa.column('file_path', sa.String),
+)
+
+
+def _to_key(path):
+    """'/srv/app/backend/chat_files/group_x/a.pdf' (또는 윈도우 경로) → 'group_x/a.pdf'"""
+    normalized = path.replace('\\', '/')
+    marker = '/chat_files/'
+    if marker in normalized:
+        return normalized.rsplit(marker, 1)[1]
+    if normalized.startswith('chat_files/'):
+        return normalized[len('chat_files/'):]
+    return None  # 이미 key 이거나 알 수 없는 위치 → 그대로 둠
+
+
+def _rewrite(convert):
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(messages.c.id, messages.c.file_path)
+            .where(messages.c.file_path.isnot(None), messages.c.id > last_id)
+            .order_by(messages.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            new_path = convert(row.file_path)
+            if new_path is not None and new_path != row.file_path:
+                conn.execute(
+                    messages.update().where(messages.c.id == row.id).values(file_path=new_path)
+                )
+        last_id = rows[-1].id
+
+
+def upgrade():
+    # ✅ 절대 경로 → 저장소 key (storage.py)
+    _rewrite(_to_key)
+
+
+def downgrade():
+    def _to_path(key):
+        if os.path.isabs(key) or '/chat_files/' in key.replace('\\', '/'):
+            return None
+        return os.path.join(LOCAL_ROOT, *key.split('/'))
+
+    _rewrite(_to_path)
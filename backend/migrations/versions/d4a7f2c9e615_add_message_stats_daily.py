@@ -0,0 +1,35 @@
+"""add message stats daily rollup
+
+Revision ID: d4a7f2c9e615
+Revises: b6d2e8a41f07
+Create Date: 2026-10-20 09:41:27.530218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a7f2c9e615'
+down_revision = 'b6d2e8a41f07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'message_stats_daily',
+        sa.Column('dimension', sa.String(length=16), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('messages', sa.BigInteger(), nullable=False),
+        sa.Column('files', sa.Integer(), nullable=False),
+        sa.Column('file_bytes', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('dimension', 'day', 'key'),
+    )
+    # 기존 메시지는 analytics 작업이 high-water mark(job_checkpoints 'analytics.messages') 0 부터 배치로 채움
+
+
+def downgrade():
+    op.drop_table('message_stats_daily')
+    op.execute("DELETE FROM job_checkpoints WHERE name = 'analytics.messages'")
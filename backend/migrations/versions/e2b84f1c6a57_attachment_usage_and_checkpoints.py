@@ -0,0 +1,47 @@
+"""attachment usage and checkpoints
+
+Revision ID: e2b84f1c6a57
+Revises: c7a1d94e0b32
+Create Date: 2026-10-19 18:12:44.301927
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b84f1c6a57'
+down_revision = 'c7a1d94e0b32'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('file_size', sa.BigInteger(), nullable=True))
+
+    op.create_table(
+        'attachment_usage',
+        sa.Column('scope', sa.String(length=10), nullable=False),
+        sa.Column('owner', sa.String(length=64), nullable=False),
+        sa.Column('bytes', sa.BigInteger(), nullable=False),
+        sa.Column('files', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('scope', 'owner'),
+    )
+    op.create_table(
+        'job_checkpoints',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('position', sa.String(length=500), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    # 기존 첨부파일의 file_size 는 attachment GC 가 배치로 채운 뒤 사용량을 재계산
+
+
+def downgrade():
+    op.drop_table('job_checkpoints')
+    op.drop_table('attachment_usage')
+
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_column('file_size')
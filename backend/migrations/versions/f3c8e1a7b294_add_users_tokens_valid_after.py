@@ -0,0 +1,26 @@
+"""add users.tokens_valid_after for token revocation
+
+Revision ID: f3c8e1a7b294
+Revises: d4a7f2c9e615
+Create Date: 2026-10-21 10:12:05.318442
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c8e1a7b294'
+down_revision = 'd4a7f2c9e615'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('tokens_valid_after', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('tokens_valid_after')
@@ -1,5 +1,6 @@
 # models.py
 from db import db
+from sqlalchemy.dialects.mysql import LONGTEXT
 from datetime import datetime
 import uuid
 
@@ -21,6 +22,8 @@ class User(db.Model):
     is_admin = db.Column(db.Boolean, default=False)
     is_rejected = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    tokens_valid_after = db.Column(db.DateTime, nullable=True)  # 마지막 토큰 폐기 시각 (tokens)
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # 토큰 'ver' claim 과 비교 (tokens)
 
     sent_messages = db.relationship('Message', foreign_keys='Message.sender_id', backref='sender', lazy=True)
     received_messages = db.relationship('Message', foreign_keys='Message.receiver_id', backref='receiver', lazy=True)
@@ -34,13 +37,43 @@ class Message(db.Model):
     sender_uuid = db.Column(db.String(255), nullable=False)
     receiver_uuid = db.Column(db.String(255), nullable=True)  # ← 수정
     room_uuid = db.Column(db.String(64), db.ForeignKey('chat_room.room_uuid'), nullable=True)
+    conversation_id = db.Column(db.Integer, db.ForeignKey('direct_conversations.id'), nullable=True)  # 1:1 대화
 
     message_text = db.Column(db.Text)
     image_path = db.Column(db.String(500))
-    file_path = db.Column(db.String(500))
+    file_path = db.Column(db.String(500))  # 첨부파일 저장소 key (storage.py)
     file_name = db.Column(db.String(255))  # 원본 파일명
     file_type = db.Column(db.String(20))   # 파일 확장자
+    file_size = db.Column(db.BigInteger, nullable=True)  # 첨부파일 크기(byte) - 사용량 집계용 (기존 행은 GC 가 채움)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    deleted_at = db.Column(db.DateTime, nullable=True)  # soft delete (tombstones.purge 가 실제 삭제)
+
+    # 1:1 대화 내역 조회 (conversation_id, timestamp) 인덱스
+    __table_args__ = (
+        db.Index('ix_messages_conversation_timestamp', 'conversation_id', 'timestamp'),
+        db.Index('ix_messages_deleted_at', 'deleted_at'),
+    )
+
+class DirectConversation(db.Model):
+    __tablename__ = 'direct_conversations'
+
+    # 1:1 대화 (정렬된 사용자 쌍 당 1행) - 첫 메시지 전송 시 생성
+    id = db.Column(db.Integer, primary_key=True)
+    user_low_uuid = db.Column(db.String(36), db.ForeignKey('users.user_uuid', ondelete='CASCADE'), nullable=False)
+    user_high_uuid = db.Column(db.String(36), db.ForeignKey('users.user_uuid', ondelete='CASCADE'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_message_id = db.Column(db.Integer, nullable=True)  # 채팅방 목록용 (FK 없이 비정규화)
+    last_message_at = db.Column(db.DateTime, nullable=True)
+    cleared_at = db.Column(db.DateTime, nullable=True)  # 대화 삭제 시각 - 이 시각까지의 메시지는 숨김/정리 대상
+
+    __table_args__ = (
+        db.UniqueConstraint('user_low_uuid', 'user_high_uuid', name='unique_direct_pair'),
+        db.Index('ix_direct_low_last', 'user_low_uuid', 'last_message_at'),
+        db.Index('ix_direct_high_last', 'user_high_uuid', 'last_message_at'),
+    )
+
+    def other_uuid(self, user_uuid):
+        return self.user_high_uuid if self.user_low_uuid == user_uuid else self.user_low_uuid
     
 class MessageRead(db.Model):
     __tablename__ = 'message_reads'
@@ -66,6 +99,7 @@ class ChatRoom(db.Model):
     is_group = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     name = db.Column(db.String(255))  # ✅ 길이 지정
+    deleted_at = db.Column(db.DateTime, nullable=True)  # soft delete (메시지/멤버는 tombstones.purge 가 정리)
 
     members = db.relationship('ChatRoomMember', backref='chat_room', cascade="all, delete-orphan", lazy=True)
     messages = db.relationship('Message', backref='chat_room', lazy=True, foreign_keys='Message.room_uuid', primaryjoin='ChatRoom.room_uuid==Message.room_uuid')
@@ -92,6 +126,11 @@ class PasswordResetRequest(db.Model):
     
     # 관계 정의
     user = db.relationship('User', backref=db.backref('password_reset_requests', lazy=True))
+
+    # 관리자 대기열 (status='pending' ORDER BY id DESC, id keyset 페이지)
+    __table_args__ = (
+        db.Index('ix_password_reset_status_id', 'status', 'id'),
+    )
     
     def to_dict(self):
         return {
@@ -115,4 +154,75 @@ class GroupChatReadStatus(db.Model):
     last_read_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # 복합 고유 제약 조건 (한 사용자당 한 채팅방에 하나의 읽음 상태)
-    __table_args__ = (db.UniqueConstraint('user_uuid', 'room_uuid', name='unique_user_room_read'),)
\ No newline at end of file
+    __table_args__ = (db.UniqueConstraint('user_uuid', 'room_uuid', name='unique_user_room_read'),)
+
+class AttachmentUsage(db.Model):
+    __tablename__ = 'attachment_usage'
+
+    # 첨부파일 사용량 (업로드 / 정리 시 증감, GC 주기마다 messages 기준으로 재계산)
+    # scope='room'  → owner = 그룹 room_uuid 또는 'direct:<conversation_id>'
+    # scope='user'  → owner = 업로드한 user_uuid
+    scope = db.Column(db.String(10), primary_key=True)
+    owner = db.Column(db.String(64), primary_key=True)
+    bytes = db.Column(db.BigInteger, nullable=False, default=0)
+    files = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class JobCheckpoint(db.Model):
+    __tablename__ = 'job_checkpoints'
+
+    # 백그라운드 작업의 진행 위치 (다음 실행 시 이어서 처리)
+    name = db.Column(db.String(64), primary_key=True)
+    position = db.Column(db.String(500), nullable=False, default='')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class DirectoryChange(db.Model):
+    __tablename__ = 'directory_changes'
+
+    # 사용자 목록(승인된 사용자) 변경 이력 - version 이 곧 목록 버전 (directory.py)
+    # user_uuid 가 NULL 이면 전체 변경 (seed 등) → 이전 버전에서는 전체 다시 받기
+    version = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    user_uuid = db.Column(db.String(36), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class MessageStat(db.Model):
+    __tablename__ = 'message_stats_daily'
+
+    # 메시지 일별 집계 (analytics.py - 마지막으로 반영한 메시지 id 이후만 증분 반영)
+    # dimension='all'        → key = ''
+    # dimension='department' → key = 보낸 사람 부서 (없으면 '')
+    # dimension='room'       → key = 그룹 room_uuid 또는 'direct:<conversation_id>'
+    # dimension='user'       → key = 보낸 user_uuid (그날의 행 수 = 활성 사용자 수)
+    dimension = db.Column(db.String(16), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    key = db.Column(db.String(64), primary_key=True)
+    messages = db.Column(db.BigInteger, nullable=False, default=0)
+    files = db.Column(db.Integer, nullable=False, default=0)
+    file_bytes = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+
+    # 백그라운드 작업 큐 (JOBS_BACKEND=db, jobs.py)
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.Text().with_variant(LONGTEXT(), 'mysql'), nullable=False)  # JSON
+    priority = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(db.String(16), nullable=False, default='queued')  # queued / running / done / failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    locked_by = db.Column(db.String(128), nullable=True)
+
+    # 대기 작업 조회 (status='queued' AND run_at <= now ORDER BY priority DESC)
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_at', 'status', 'run_at'),
+    )
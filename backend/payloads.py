@@ -0,0 +1,211 @@
+# payloads.py
+"""소켓 이벤트 압축 전송 (선택: authenticate 에서 협상)
+
+클라이언트가 authenticate 에 {'encoding': 'msgpack', 'encoding_version': 1} 을 보내면 그 연결에는
+- 이벤트를 바로 보내지 않고 BATCH_INTERVAL 동안 모아서 'frame' 이벤트 하나로 (MessagePack bytes)
+- 이벤트 이름은 번호, 필드 이름은 짧은 key, 시각(timestamp)은 epoch 밀리초 정수
+  (서버 시각과 같은 UTC naive 값만 변환 → 클라이언트가 naive ISO 문자열(밀리초까지)로 되돌림, 시간대가 붙은 값은 그대로)
+- 같은 frame 안에서 앞 이벤트 데이터에 모두 포함되는 데이터(chat 뒤의 new_message / group_message 등)는
+  참조([code, None, 앞 이벤트 위치, [짧은 key, ...]])로 대신 (클라이언트가 앞 이벤트 데이터에서 그 key 만 골라 복원)
+- 같은 데이터 / 같은 frame 은 한 번만 변환·직렬화 (큰 방 fan-out 에서 수신자마다 다시 인코딩하지 않음)
+
+frame = [[code, data], [code, None, ref, keys], ...]
+delivery 데이터 = {'id': ..., 'e': [frame 과 같은 형식]}  (frame 의 ack 는 안에 든 delivery 모두의 ack)
+
+협상하지 않은 클라이언트(이전 버전)와 msgpack 이 설치되지 않은 서버는 기존 JSON 이벤트 그대로.
+EVENT_CODES / KEYS 는 frontend/src/compact.js 의 표와 같아야 한다 (바꾸면 PROTOCOL_VERSION 증가).
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from metrics import SOCKET_COMPACT_BYTES, SOCKET_COMPACT_FRAMES
+
+try:
+    import msgpack  # 선택 의존성: 없으면 모든 연결에 JSON
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = 1
+FRAME_EVENT = 'frame'
+
+EVENT_CODES = {
+    'chat': 1, 'new_message': 2, 'group_message': 3, 'delivery': 4, 'room_list_update': 5,
+    'user_list': 6, 'resync': 7, 'rate_limited': 8, 'message_deleted': 9, 'room_deleted': 10,
+}
+KEYS = {
+    'message_id': 'i', 'sender_uuid': 's', 'receiver_uuid': 'r', 'room_uuid': 'g', 'text': 't',
+    'message': 'm', 'timestamp': 'ts', 'file_name': 'fn', 'file_type': 'ft',
+    'uuid': 'u', 'name': 'n', 'department': 'd', 'last_message': 'lm', 'is_group': 'ig',
+    'unread_count': 'uc', 'upsert': 'up', 'remove': 'rm', 'refresh': 'rf', 'dropped': 'dr',
+    'event': 'ev', 'retry_after': 'ra',
+}
+TIMESTAMP_KEYS = frozenset({'timestamp'})
+
+_socketio = None
+_connections = None
+_enabled = True
+_interval = 0.01
+_frames = {}         # sid -> ([(event, data), ...], [ack callback, ...])
+_lock = threading.Lock()
+_flusher_running = False
+
+
+def init_payloads(app, socketio, connections):
+    """SOCKET_COMPACT_ENABLED / SOCKET_BATCH_INTERVAL_MS 설정"""
+    global _socketio, _connections, _enabled, _interval
+    _socketio = socketio
+    _connections = connections
+    _enabled = app.config.get('SOCKET_COMPACT_ENABLED', True)
+    _interval = max(0, app.config.get('SOCKET_BATCH_INTERVAL_MS', 10)) / 1000.0
+    if _enabled and msgpack is None:
+        logger.warning("⚠️ msgpack 패키지가 없어 소켓 압축 전송 비활성화 (모든 연결 JSON)")
+
+
+def negotiate(data):
+    """authenticate 데이터 → 이 연결의 인코딩 ('msgpack' / 'json')"""
+    if (
+        _enabled and msgpack is not None
+        and data.get('encoding') == 'msgpack'
+        and data.get('encoding_version') == PROTOCOL_VERSION
+    ):
+        return 'msgpack'
+    return 'json'
+
+
+def is_compact(sid):
+    return _connections is not None and _connections.encoding(sid) == 'msgpack'
+
+
+# ---------------------------------------------------------------------------
+# 변환
+# ---------------------------------------------------------------------------
+
+def _epoch_ms(value):
+    """UTC naive 시각(datetime / ISO 문자열) → epoch 밀리초 (시간대가 붙었거나 시각이 아니면 그대로)"""
+    parsed = value
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    if not isinstance(parsed, datetime) or parsed.tzinfo is not None:
+        return value
+    return int(parsed.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _compact(value):
+    if isinstance(value, dict):
+        return {
+            KEYS.get(k, k): _epoch_ms(v) if k in TIMESTAMP_KEYS else _compact(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [_compact(v) for v in value]
+    return value
+
+
+def _contained(data, other):
+    """data 의 모든 필드가 other 에 같은 값으로 있는지 (참조로 대신할 수 있는지)"""
+    return (
+        isinstance(data, dict) and isinstance(other, dict) and data is not other
+        and all(k in other and other[k] == v for k, v in data.items())
+    )
+
+
+def encode_events(events, memo):
+    """[(event, data), ...] → frame 목록 (memo: id(data) → 변환 결과, 한 번의 flush 동안 재사용)"""
+    out = []
+    for i, (event, data) in enumerate(events):
+        code = EVENT_CODES.get(event, event)
+        ref = next((j for j in range(i) if _contained(data, events[j][1])), None)
+        if ref is not None:
+            out.append([code, None, ref, [KEYS.get(k, k) for k in data]])
+            continue
+        key = id(data)
+        compacted = memo.get(key)
+        if compacted is None:
+            if event == 'delivery':
+                compacted = {'id': data['id'], 'e': encode_events(data['events'], memo)}
+            else:
+                compacted = _compact(data)
+            memo[key] = compacted
+        out.append([code, compacted])
+    return out
+
+
+# ---------------------------------------------------------------------------
+# 묶음 전송
+# ---------------------------------------------------------------------------
+
+def queue(sid, events, callback=None):
+    """압축 연결에 보낼 이벤트를 모음 → BATCH_INTERVAL 뒤 frame 하나로 전송"""
+    global _flusher_running
+    with _lock:
+        buffered, callbacks = _frames.setdefault(sid, ([], []))
+        buffered.extend(events)
+        if callback is not None:
+            callbacks.append(callback)
+        start = not _flusher_running
+        _flusher_running = True
+    if start:
+        _socketio.start_background_task(_flush_loop)
+
+
+def _ack_all(callbacks):
+    def _callback(*args):
+        for callback in callbacks:
+            callback(*args)
+    return _callback
+
+
+def flush():
+    """모인 이벤트를 연결마다 frame 하나로 전송 → 보낸 frame 수"""
+    with _lock:
+        frames = dict(_frames)
+        _frames.clear()
+    memo = {}
+    packed = {}  # 같은 이벤트 묶음(같은 데이터 객체) → 직렬화 한 번
+    for sid, (events, callbacks) in frames.items():
+        try:
+            key = tuple((event, id(data)) for event, data in events)
+            body = packed.get(key)
+            if body is None:
+                body = packed[key] = msgpack.packb(encode_events(events, memo), use_bin_type=True)
+            _socketio.emit(FRAME_EVENT, body, to=sid, callback=_ack_all(callbacks) if callbacks else None)
+        except Exception:
+            logger.exception("❌ 소켓 frame 전송 실패", extra={'sid': sid})
+            continue
+        SOCKET_COMPACT_FRAMES.observe(len(events))
+        SOCKET_COMPACT_BYTES.inc(len(body))
+    return len(frames)
+
+
+def _flush_loop():
+    """모인 이벤트가 없을 때까지 BATCH_INTERVAL 마다 전송 (예외가 나도 멈추지 않고, 끝나면 다음 queue 가 다시 시작)"""
+    global _flusher_running
+    stopped = False
+    try:
+        while True:
+            time.sleep(_interval)
+            try:
+                flush()
+            except Exception:
+                logger.exception("❌ 소켓 frame 묶음 전송 실패")
+            with _lock:
+                if not _frames:
+                    _flusher_running = False
+                    stopped = True
+                    return
+    finally:
+        if not stopped:
+            with _lock:
+                _flusher_running = False
+
+
+def forget(sid):
+    with _lock:
+        _frames.pop(sid, None)
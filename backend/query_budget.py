@@ -0,0 +1,124 @@
+# query_budget.py
+import logging
+import os
+import re
+import traceback
+from collections import defaultdict
+from functools import wraps
+
+from flask import current_app, g, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+_SKIP_FILES = {os.path.abspath(__file__), os.path.join(BACKEND_DIR, 'metrics.py')}
+
+_IN_LIST = re.compile(r'\(\s*(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))*\s*\)')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+\b')
+_SPACES = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(Exception):
+    """요청당 SQL 예산 초과 / N+1 패턴 감지 (strict 모드에서 발생)"""
+
+
+def statement_shape(statement):
+    """파라미터 값과 IN 목록 길이를 제거한 SQL 형태 (같은 형태 = 같은 쿼리)"""
+    shape = _STRING.sub('?', statement)
+    shape = _NUMBER.sub('?', shape)
+    shape = _IN_LIST.sub('(?)', shape)
+    return _SPACES.sub(' ', shape).strip()
+
+
+def _call_site():
+    """SQL 을 발생시킨 backend 코드 위치 (가장 안쪽 프레임)"""
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(BACKEND_DIR) and filename not in _SKIP_FILES:
+            return f"{os.path.relpath(filename, BACKEND_DIR)}:{frame.lineno} ({frame.name})"
+    return 'unknown'
+
+
+def query_budget(max_queries):
+    """라우트의 요청당 최대 SQL 문 수 선언
+
+        @app.route('/api/...')
+        @query_budget(5)
+        @jwt_required()
+        def view(): ...
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            g.query_budget = max_queries
+            return fn(*args, **kwargs)
+        wrapper.query_budget = max_queries
+        return wrapper
+    return decorator
+
+
+def analyze(query_log, threshold):
+    """같은 형태의 SQL 이 threshold 번 이상 반복되면 N+1 의심으로 보고"""
+    by_shape = defaultdict(list)
+    for shape, site in query_log:
+        by_shape[shape].append(site)
+
+    repeated = []
+    for shape, sites in by_shape.items():
+        if len(sites) >= threshold:
+            repeated.append({
+                'statement': shape,
+                'count': len(sites),
+                'call_sites': sorted(set(sites)),
+            })
+    repeated.sort(key=lambda r: r['count'], reverse=True)
+    return repeated
+
+
+def _strict():
+    """위반 시 예외 발생 여부 (요청마다 읽음: QUERY_BUDGET_STRICT, 지정하지 않으면 app.testing)"""
+    strict = current_app.config.get('QUERY_BUDGET_STRICT')
+    return current_app.testing if strict is None else strict
+
+
+def init_query_inspector(app, engines):
+    """QUERY_DEBUG 모드에서 요청별 SQL 기록 + N+1 / 예산 초과 검사 (primary + replica 엔진 모두)"""
+    if not app.config.get('QUERY_DEBUG'):
+        return
+
+    threshold = app.config.get('N_PLUS_ONE_THRESHOLD', 5)
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        try:
+            log = g.setdefault('query_log', [])
+        except RuntimeError:
+            return  # 요청 밖 (소켓/백그라운드)
+        log.append((statement_shape(statement), _call_site()))
+
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', _record)
+
+    @app.after_request
+    def _check_queries(response):
+        query_log = g.pop('query_log', [])
+        count = len(query_log)
+        response.headers['X-Query-Count'] = str(count)
+
+        problems = []
+        budget = g.get('query_budget')
+        if budget is not None and count > budget:
+            problems.append(f"쿼리 예산 초과: {count} > {budget}")
+
+        for r in analyze(query_log, threshold):
+            problems.append(
+                f"N+1 의심: {r['count']}회 반복 `{r['statement'][:200]}` @ {', '.join(r['call_sites'])}"
+            )
+
+        if problems:
+            report = f"{request.method} {request.path}\n  " + '\n  '.join(problems)
+            logger.warning(f"⚠️ [쿼리 검사] {report}")
+            if _strict():
+                raise QueryBudgetExceeded(report)
+        return response
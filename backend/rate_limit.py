@@ -0,0 +1,151 @@
+# rate_limit.py
+"""토큰 버킷 요청 제한 (소켓 이벤트 / 쓰기 API)
+
+버킷마다 초당 rate 개씩 토큰이 차고 최대 burst 개까지 쌓인다. 요청 1건 = 토큰 1개.
+chat 이벤트는 연결(sid)과 인증된 사용자 양쪽 버킷을 모두 확인 → 재연결을 반복해도 사용자 단위로 제한.
+소켓 인증(handshake / authenticate)은 재연결해도 바뀌지 않는 key 로: 접속 IP(토큰 검증 전) + 토큰의 사용자(검증 후).
+연결이 끊겨도 이 버킷은 지우지 않는다 (재연결 반복으로 버킷을 새로 받지 못하도록).
+
+    RATE_LIMIT_ENABLED=1
+    RATE_LIMIT_SOCKET_CHAT=5,20     chat 이벤트 (초당 5개, 최대 연속 20개)
+    RATE_LIMIT_SOCKET_AUTH=0.5,5    소켓 인증 (사용자)
+    RATE_LIMIT_SOCKET_AUTH_IP=5,50  소켓 인증 (접속 IP - NAT 뒤 여러 사용자가 함께 쓰므로 넉넉히)
+    RATE_LIMIT_API_WRITE=5,30       메시지 전송 / 업로드 / 삭제 등 쓰기 API (사용자)
+    RATE_LIMIT_API_AUTH=0.2,10      로그인 / 회원가입 / 비밀번호 재설정 요청 (접속 IP + 요청한 username)
+
+사내망은 여러 사용자가 같은 IP(NAT)로 접속하므로 IP 만으로 묶지 않는다.
+
+프로세스 단위 제한 (워커가 여러 개면 워커 수만큼 허용량이 늘어남)
+"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import jsonify, request
+from flask_jwt_extended import get_jwt_identity
+
+from metrics import RATE_LIMITED
+
+logger = logging.getLogger(__name__)
+
+MAX_KEYS = 100_000  # 버킷 수 상한 (오래 안 쓴 것부터 제거)
+
+DEFAULT_LIMITS = {
+    'socket_chat': '5,20',
+    'socket_auth': '0.5,5',
+    'socket_auth_ip': '5,50',
+    'api_write': '5,30',
+    'api_auth': '0.2,10',
+}
+
+
+class TokenBucket:
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, burst):
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+
+class RateLimiter:
+    def __init__(self, name, rate, burst):
+        self.name = name
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def take(self, key):
+        """토큰 1개 사용 → 0 (허용) 또는 다음 토큰까지 남은 초"""
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = TokenBucket(self.burst)
+                if len(self.buckets) > MAX_KEYS:
+                    self.buckets.popitem(last=False)
+            else:
+                self.buckets.move_to_end(key)
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+                bucket.updated = now
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                return 0.0
+            return (1 - bucket.tokens) / self.rate if self.rate > 0 else math.inf
+
+    def forget(self, key):
+        with self.lock:
+            self.buckets.pop(key, None)
+
+
+def _parse(spec):
+    rate, burst = (float(v) for v in spec.split(',', 1))
+    return rate, burst
+
+
+_limiters = {}
+_enabled = True
+
+
+def init_rate_limit(app):
+    """RATE_LIMIT_* 설정으로 제한기 생성"""
+    global _enabled
+    _enabled = app.config.get('RATE_LIMIT_ENABLED', True)
+    for name, default in DEFAULT_LIMITS.items():
+        rate, burst = _parse(app.config.get(f'RATE_LIMIT_{name.upper()}') or default)
+        _limiters[name] = RateLimiter(name, rate, burst)
+
+
+def check(name, *keys):
+    """keys 의 버킷을 모두 확인 → 0 (허용) 또는 재시도까지 남은 초 (제한됨)"""
+    if not _enabled or name not in _limiters:
+        return 0.0
+    limiter = _limiters[name]
+    for key in keys:
+        if key is None:
+            continue
+        retry_after = limiter.take(key)
+        if retry_after:
+            RATE_LIMITED.inc(limit=name)
+            return retry_after
+    return 0.0
+
+
+def forget(name, key):
+    if name in _limiters:
+        _limiters[name].forget(key)
+
+
+def _default_key():
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        identity = None
+    if identity:
+        return f'user:{identity}'
+    data = request.get_json(silent=True)
+    username = data.get('username') if isinstance(data, dict) else None
+    return f'ip:{request.remote_addr}:{username}' if username else f'ip:{request.remote_addr}'
+
+
+def rate_limit(name):
+    """라우트 제한 (@jwt_required 아래에 두면 사용자 기준, 아니면 접속 IP + username 기준) → 429 + Retry-After"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if request.method == 'OPTIONS':
+                return fn(*args, **kwargs)
+            retry_after = check(name, _default_key())
+            if retry_after:
+                logger.info("🚦 요청 제한", extra={'limit': name, 'path': request.path, 'retry_after': round(retry_after, 2)})
+                response = jsonify({'error': '요청이 너무 많습니다. 잠시 후 다시 시도해 주세요.'})
+                response.status_code = 429
+                response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+                return response
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
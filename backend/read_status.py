@@ -0,0 +1,179 @@
+# read_status.py
+"""그룹 채팅방 읽음 표시 (group_chat_read_status) 쓰기
+
+채팅방을 열어 두는 동안 클라이언트가 입장 / mark-read 를 반복 호출하므로
+- 한 번의 upsert 문으로 기록 (SELECT 후 UPDATE/INSERT 하다 unique_user_room_read 충돌하던 문제 제거)
+- 같은 (사용자, 방)을 READ_STATUS_DEBOUNCE_SECONDS 안에 다시 표시하면 DB 에 쓰지 않고 메모리에 최신 시각만 보관
+  → 백그라운드 flusher 가 주기마다 모아서 한 번에 upsert
+- 보관 중인 시각은 watermark() 로 조회 시 반영 (채팅방 목록의 안 읽음 수가 flush 전에도 맞도록)
+
+프로세스 단위 보관 (종료 시 남은 것은 atexit 에서 flush)
+"""
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import case, insert
+
+from db import db
+from metrics import READ_STATUS_WRITES
+from models import ChatRoomMember, GroupChatReadStatus
+
+logger = logging.getLogger(__name__)
+
+_debounce = 5.0
+_pending = {}      # (user_uuid, room_uuid) -> 아직 쓰지 않은 last_read_at
+_last_write = {}   # (user_uuid, room_uuid) -> 마지막 DB 기록 시각 (monotonic)
+_lock = threading.Lock()
+
+
+def _insert(dialect):
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        return mysql_insert
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert
+    return None
+
+
+def upsert(rows):
+    """[(user_uuid, room_uuid, read_at), ...] 한 문장으로 기록 - 기존 값보다 이후 시각일 때만 덮어씀 (commit 은 호출한 쪽)"""
+    if not rows:
+        return
+    table = GroupChatReadStatus.__table__
+    # 여러 워커가 같은 행을 동시에 갱신할 때 잠금 순서를 맞춤 (deadlock 방지)
+    values = [{'user_uuid': u, 'room_uuid': r, 'last_read_at': t} for u, r, t in sorted(rows)]
+    make_insert = _insert(db.engine.dialect.name)
+
+    if make_insert is None:
+        # 알 수 없는 DB → 행 단위 UPDATE, 없으면 INSERT
+        for row in values:
+            updated = db.session.execute(
+                table.update()
+                .where(table.c.user_uuid == row['user_uuid'], table.c.room_uuid == row['room_uuid'])
+                .values(last_read_at=row['last_read_at'])
+            ).rowcount
+            if not updated:
+                db.session.execute(insert(table).values(**row))
+        return
+
+    stmt = make_insert(table).values(values)
+    if hasattr(stmt, 'on_duplicate_key_update'):
+        new = stmt.inserted.last_read_at
+        latest = case((table.c.last_read_at > new, table.c.last_read_at), else_=new)
+        stmt = stmt.on_duplicate_key_update(last_read_at=latest)
+    else:
+        new = stmt.excluded.last_read_at
+        latest = case((table.c.last_read_at > new, table.c.last_read_at), else_=new)
+        stmt = stmt.on_conflict_do_update(index_elements=['user_uuid', 'room_uuid'], set_={'last_read_at': latest})
+    db.session.execute(stmt)
+
+
+def mark_read(user_uuid, room_uuid, read_at=None):
+    """읽음 표시 → True (DB 에 기록, 호출한 쪽이 commit) / False (debounce - 메모리에 보관)"""
+    read_at = read_at or datetime.utcnow()
+    key = (user_uuid, room_uuid)
+    now = time.monotonic()
+    with _lock:
+        last = _last_write.get(key)
+        if _debounce and last is not None and now - last < _debounce:
+            previous = _pending.get(key)
+            _pending[key] = read_at if previous is None or read_at > previous else previous
+            READ_STATUS_WRITES.inc(result='debounced')
+            return False
+        if _debounce:
+            _last_write[key] = now
+        _pending.pop(key, None)
+    upsert([(user_uuid, room_uuid, read_at)])
+    READ_STATUS_WRITES.inc(result='written')
+    return True
+
+
+def watermark(user_uuid, room_uuid, stored=None):
+    """DB 값(stored)과 아직 쓰지 않은 값 중 최신 읽음 시각"""
+    pending = _pending.get((user_uuid, room_uuid))
+    if pending is None or (stored is not None and stored >= pending):
+        return stored
+    return pending
+
+
+def room_watermarks(room_uuid):
+    """방의 사용자별 최신 읽음 시각 {user_uuid: last_read_at} (DB 값 + 아직 쓰지 않은 값)"""
+    latest = dict(
+        db.session.query(GroupChatReadStatus.user_uuid, GroupChatReadStatus.last_read_at)
+        .filter(GroupChatReadStatus.room_uuid == room_uuid)
+        .all()
+    )
+    with _lock:
+        pending = [(u, t) for (u, r), t in _pending.items() if r == room_uuid]
+    for user_uuid, read_at in pending:
+        if latest.get(user_uuid) is None or read_at > latest[user_uuid]:
+            latest[user_uuid] = read_at
+    return latest
+
+
+def flush():
+    """보관 중인 읽음 표시를 한 번에 기록 → 기록한 행 수"""
+    now = time.monotonic()
+    with _lock:
+        rows = [(u, r, t) for (u, r), t in _pending.items()]
+        _pending.clear()
+        # debounce 구간이 지난 키는 정리 (다음 표시는 바로 기록)
+        for key in [k for k, t in _last_write.items() if now - t >= _debounce]:
+            del _last_write[key]
+        for u, r, _ in rows:
+            _last_write[(u, r)] = now
+    if not rows:
+        return 0
+    try:
+        # 그 사이 나갔거나 삭제된 방 / 사용자는 제외 (FK 오류로 배치 전체가 실패하지 않도록)
+        members = set(
+            db.session.query(ChatRoomMember.user_uuid, ChatRoomMember.room_uuid)
+            .filter(ChatRoomMember.room_uuid.in_({r for _, r, _ in rows}))
+            .all()
+        )
+        rows = [(u, r, t) for u, r, t in rows if (u, r) in members]
+        upsert(rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        with _lock:
+            # 실패분은 다시 보관 (그 사이 들어온 더 최신 값 우선)
+            for u, r, t in rows:
+                previous = _pending.get((u, r))
+                if previous is None or t > previous:
+                    _pending[(u, r)] = t
+        raise
+    READ_STATUS_WRITES.inc(len(rows), result='flushed')
+    return len(rows)
+
+
+def init_read_status(app):
+    """READ_STATUS_DEBOUNCE_SECONDS 설정 + 백그라운드 flusher 시작 (0 이면 debounce 없이 매번 기록)"""
+    global _debounce
+    _debounce = float(app.config.get('READ_STATUS_DEBOUNCE_SECONDS', 5))
+    if not _debounce:
+        return None
+
+    def _flush():
+        with app.app_context():
+            try:
+                flush()
+            except Exception:
+                logger.exception("❌ 읽음 표시 flush 실패")
+
+    def _loop():
+        while True:
+            time.sleep(_debounce)
+            _flush()
+
+    atexit.register(_flush)
+    thread = threading.Thread(target=_loop, name='read-status-flusher', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,301 @@
+# room_cache.py
+"""사용자별 채팅방 목록(/api/chat-rooms) 캐시
+
+- 캐시가 없을 때만 DB 에서 전체 목록을 만들고, 이후에는 메시지 전송 / 읽음 표시 / 방 삭제 시점에
+  바뀐 항목만 갱신한 뒤 소켓 'room_list_update' 로 클라이언트에 전달
+- 기본은 프로세스 메모리, ROOM_CACHE_URL=redis://... 이면 여러 워커가 공유
+- ROOM_CACHE_TTL 초가 지나면 다시 만든다 (갱신 누락에 대한 안전장치)
+
+갱신은 DB commit 이후에 호출해야 한다 (rollback 된 변경이 캐시에 남지 않도록).
+"""
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+
+import fanout
+
+try:
+    import redis
+except ImportError:  # 선택 의존성 (공유 캐시를 쓸 때만 필요)
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+def _encode(rooms):
+    return json.dumps({
+        key: {**entry, 'timestamp': entry['timestamp'].isoformat()} for key, entry in rooms.items()
+    }, ensure_ascii=False)
+
+
+def _decode(raw):
+    rooms = json.loads(raw)
+    for entry in rooms.values():
+        entry['timestamp'] = datetime.fromisoformat(entry['timestamp'])
+    return rooms
+
+
+class LocalRoomCache:
+    """프로세스 메모리 캐시: {user_uuid: (만든 시각, {room key: 항목})}"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.rooms = {}
+        self.generations = {}
+        self.lock = threading.Lock()
+
+    def get(self, user_uuid):
+        with self.lock:
+            cached = self.rooms.get(user_uuid)
+            if cached is None:
+                return None
+            built_at, rooms = cached
+            if time.monotonic() - built_at > self.ttl:
+                del self.rooms[user_uuid]
+                return None
+            return {key: dict(entry) for key, entry in rooms.items()}
+
+    def generation(self, user_uuid):
+        with self.lock:
+            return self.generations.get(user_uuid, 0)
+
+    def fill(self, user_uuid, rooms, generation):
+        """목록을 만드는 동안 갱신이 없었을 때만 저장 (있었다면 다음 조회에서 다시 생성)"""
+        with self.lock:
+            if self.generations.get(user_uuid, 0) != generation:
+                return False
+            self.rooms[user_uuid] = (time.monotonic(), rooms)
+            return True
+
+    def update(self, user_uuid, fn):
+        """캐시된 목록에 fn(rooms) 적용 → fn 이 돌려준 변경 내역 (캐시가 없으면 None)"""
+        with self.lock:
+            self.generations[user_uuid] = self.generations.get(user_uuid, 0) + 1
+            cached = self.rooms.get(user_uuid)
+            if cached is None:
+                return None
+            return fn(cached[1])
+
+    def invalidate(self, user_uuid):
+        with self.lock:
+            self.generations[user_uuid] = self.generations.get(user_uuid, 0) + 1
+            self.rooms.pop(user_uuid, None)
+
+
+class RedisRoomCache:
+    """여러 프로세스가 공유하는 캐시 (WATCH/MULTI 로 갱신 충돌 시 재시도)"""
+
+    def __init__(self, url, ttl):
+        self.client = redis.Redis.from_url(url)
+        self.ttl = int(ttl)
+
+    @staticmethod
+    def _key(user_uuid):
+        return f'room_list:{user_uuid}'
+
+    @staticmethod
+    def _gen_key(user_uuid):
+        return f'room_list_gen:{user_uuid}'
+
+    def get(self, user_uuid):
+        raw = self.client.get(self._key(user_uuid))
+        return _decode(raw) if raw is not None else None
+
+    def generation(self, user_uuid):
+        return int(self.client.get(self._gen_key(user_uuid)) or 0)
+
+    def fill(self, user_uuid, rooms, generation):
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(self._gen_key(user_uuid))
+                if int(pipe.get(self._gen_key(user_uuid)) or 0) != generation:
+                    return False
+                pipe.multi()
+                pipe.set(self._key(user_uuid), _encode(rooms), ex=self.ttl)
+                pipe.execute()
+                return True
+            except redis.WatchError:
+                return False
+
+    def update(self, user_uuid, fn):
+        key = self._key(user_uuid)
+        while True:
+            with self.client.pipeline() as pipe:
+                try:
+                    pipe.watch(key)
+                    raw = pipe.get(key)
+                    pipe.multi()
+                    pipe.incr(self._gen_key(user_uuid))
+                    pipe.expire(self._gen_key(user_uuid), self.ttl)
+                    if raw is None:
+                        pipe.execute()
+                        return None
+                    rooms = _decode(raw)
+                    changes = fn(rooms)
+                    pipe.set(key, _encode(rooms), keepttl=True)
+                    pipe.execute()
+                    return changes
+                except redis.WatchError:
+                    continue
+
+    def invalidate(self, user_uuid):
+        with self.client.pipeline() as pipe:
+            pipe.incr(self._gen_key(user_uuid))
+            pipe.expire(self._gen_key(user_uuid), self.ttl)
+            pipe.delete(self._key(user_uuid))
+            pipe.execute()
+
+
+_backend = LocalRoomCache(ttl=300)
+_socketio = None
+_connections = None
+
+
+def init_room_cache(app, socketio, connections):
+    """ROOM_CACHE_URL / ROOM_CACHE_TTL 설정으로 캐시 백엔드 선택"""
+    global _backend, _socketio, _connections
+    ttl = app.config.get('ROOM_CACHE_TTL', 300)
+    url = app.config.get('ROOM_CACHE_URL')
+    if url and redis is None:
+        logger.warning("⚠️ redis 패키지가 없어 프로세스 메모리 채팅방 캐시 사용")
+        url = None
+    _backend = RedisRoomCache(url, ttl) if url else LocalRoomCache(ttl)
+    _socketio = socketio
+    _connections = connections
+
+
+def _sorted(rooms):
+    return sorted(rooms.values(), key=lambda x: x['timestamp'], reverse=True)
+
+
+def get_room_list(user_uuid, build):
+    """캐시된 목록, 없으면 build() 결과를 저장 후 반환"""
+    rooms = _backend.get(user_uuid)
+    if rooms is None:
+        generation = _backend.generation(user_uuid)
+        rooms = {entry['uuid']: entry for entry in build()}
+        _backend.fill(user_uuid, rooms, generation)
+    return _sorted(rooms)
+
+
+def _push(user_uuid, upsert=(), remove=(), refresh=False):
+    sids = _connections.sids(user_uuid) if _connections is not None else ()
+    if _socketio is None or not sids:
+        return
+    payload = {
+        'upsert': [{**entry, 'timestamp': entry['timestamp'].isoformat()} for entry in upsert],
+        'remove': list(remove),
+    }
+    if refresh:
+        payload['refresh'] = True
+    fanout.send_user(user_uuid, sids, [('room_list_update', payload)])
+
+
+def _apply(user_uuid, fn):
+    """fn(rooms) → (upsert 항목 목록, 제거한 key 목록)"""
+    changes = _backend.update(user_uuid, fn)
+    if changes is None:
+        # 캐시가 없는 사용자 (TTL 만료 등) → 클라이언트가 다시 조회하면서 캐시 생성
+        _push(user_uuid, refresh=True)
+        return
+    upsert, remove = changes
+    if upsert or remove:
+        _push(user_uuid, upsert, remove)
+
+
+def _direct_entry(other, message):
+    return {
+        'uuid': other.user_uuid,
+        'name': other.name,
+        'department': other.department,
+        'last_message': message.message_text,
+        'timestamp': message.timestamp,
+        'is_group': False,
+    }
+
+
+def direct_message_sent(sender, receiver, message):
+    """1:1 메시지 저장 후: 보낸 사람 / 받는 사람 목록의 상대 항목 갱신"""
+    if sender.user_uuid == receiver.user_uuid:
+        return  # 자기 자신과의 대화는 목록에 나오지 않음
+
+    for owner, other in ((sender, receiver), (receiver, sender)):
+        entry = _direct_entry(other, message)
+
+        def _update(rooms, entry=entry):
+            # 백그라운드 작업 순서가 바뀌어 더 최신 메시지가 이미 반영된 경우
+            current = rooms.get(entry['uuid'])
+            if current is not None and current['timestamp'] and current['timestamp'] > entry['timestamp']:
+                return [], []
+            # 목록 조회와 같은 규칙: 마지막 메시지가 비어 있으면 목록에서 제외
+            if not entry['last_message'] or not entry['last_message'].strip():
+                return [], ([entry['uuid']] if rooms.pop(entry['uuid'], None) else [])
+            rooms[entry['uuid']] = entry
+            return [entry], []
+
+        _apply(owner.user_uuid, _update)
+
+
+def group_message_sent(room, message, members, read_at=None):
+    """그룹 메시지 저장 후: 멤버별 마지막 메시지 / 안 읽음 수 갱신
+
+    members: [(user_uuid, name), ...] (처음 목록에 나타나는 방의 이름 조합용)
+    read_at: {user_uuid: 마지막 읽음 시각} - 이 갱신은 백그라운드 작업이라 읽음 표시(요청 안에서 바로 반영)보다
+             늦게 올 수 있으므로, 이미 읽은 시각 이전 메시지는 안 읽음 수에 더하지 않는다
+    """
+    read_at = read_at or {}
+    for member_uuid, _ in members:
+        def _update(rooms, member_uuid=member_uuid):
+            entry = rooms.get(room.room_uuid)
+            if entry is None:
+                name = room.name if room.name and room.name.strip() else \
+                    ', '.join(name for uuid_, name in members if uuid_ != member_uuid and name)
+                entry = {
+                    'uuid': room.room_uuid,
+                    'name': name,
+                    'department': '그룹채팅',
+                    'last_message': None,
+                    'timestamp': None,
+                    'is_group': True,
+                    'unread_count': 0,
+                }
+                rooms[room.room_uuid] = entry
+            if entry['timestamp'] is None or entry['timestamp'] <= message.timestamp:
+                entry['last_message'] = message.message_text
+                entry['timestamp'] = message.timestamp
+            last_read = read_at.get(member_uuid)
+            if member_uuid != message.sender_uuid and (last_read is None or message.timestamp > last_read):
+                entry['unread_count'] = entry.get('unread_count', 0) + 1
+            return [entry], []
+
+        _apply(member_uuid, _update)
+
+
+def group_read(user_uuid, room_uuid):
+    """읽음 표시 후: 해당 방의 안 읽음 수 0"""
+    def _update(rooms):
+        entry = rooms.get(room_uuid)
+        if entry is None or entry.get('unread_count', 0) == 0:
+            return [], []
+        entry['unread_count'] = 0
+        return [entry], []
+
+    _apply(user_uuid, _update)
+
+
+def room_removed(user_uuids, key):
+    """방 / 1:1 대화 삭제 후: 각 사용자 목록에서 항목 제거"""
+    def _update(rooms):
+        return [], ([key] if rooms.pop(key, None) is not None else [])
+
+    for user_uuid in user_uuids:
+        _apply(user_uuid, _update)
+
+
+def invalidate(user_uuids):
+    """증분 갱신이 어려운 변경 (메시지 삭제 등): 캐시를 버리고 클라이언트에 재조회 요청"""
+    for user_uuid in user_uuids:
+        _backend.invalidate(user_uuid)
+        _push(user_uuid, refresh=True)
@@ -1,50 +1,99 @@
-from flask import request, jsonify, Blueprint, send_file
+from flask import request, jsonify, Blueprint, send_file, current_app, Response, stream_with_context
 from flask_cors import cross_origin
 from db import db
 from flask_jwt_extended import create_access_token, get_jwt_identity, jwt_required
-from datetime import datetime, timedelta
+from datetime import datetime
 import hashlib
 import uuid
-import sys
 import os
+import logging
 from dotenv import load_dotenv
-from sqlalchemy import or_, desc, func
+from sqlalchemy import or_, desc, func, case, select
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import User, Message, MessageRead, ChatRoom, ChatRoomMember, PasswordResetRequest, GroupChatReadStatus
+from models import User, Message, MessageRead, ChatRoom, ChatRoomMember, PasswordResetRequest, GroupChatReadStatus, DirectConversation
 import hashlib
 from werkzeug.utils import secure_filename
+from db_pool import get_pool_metrics
+from query_budget import query_budget
+from db_routing import read_only
+from rate_limit import rate_limit
+import read_status
+import directory
+import approvals
+import export
+import tokens
+import analytics
+from conversations import find_direct_conversation, get_or_create_direct_conversation, record_last_message
+import room_cache
+from storage import get_storage, make_key, StorageError
+import attachments
+from tombstones import (
+    visible_messages, is_message_visible, tombstone_message, tombstone_room, clear_direct_conversation,
+)
+import jobs
+import tasks
+from jobs import enqueue
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '../.env'))
 base_url = os.environ.get('REACT_APP_REA_BASE')
 if not base_url:
     raise ValueError("❌ REACT_APP_REA_BASE 환경 변수가 설정되지 않았습니다.")
 
+logger = logging.getLogger(__name__)
+
 # ✅ Blueprint 선언
 user_bp = Blueprint('user_bp', __name__)
 
 # ✅ Blueprint 라우트 정의
 
 @user_bp.route('/api/users', methods=['GET'])
+@query_budget(2)
+@read_only
 @jwt_required()
 def get_users():
-    current_user_uuid = get_jwt_identity()
-    users = User.query.filter_by(is_approved=True, is_rejected=False).all()
-    user_list = [
-        {
-            "id": u.id,
-            "uuid": u.user_uuid,
-            "name": u.name,
-            "username": u.username,
-            "position": u.position,
-            "department": getattr(u, 'department', None),
-            "is_admin": u.is_admin
-        } for u in users
-    ]
-    return jsonify(user_list)  # 직접 배열 반환
-    
+    """승인된 사용자 목록 (메모리 스냅샷)
+
+    - 기본: 전체 배열 + ETag → 버전이 같으면 304
+    - ?since=<버전>: {'version', 'upsert', 'remove'} 변경분 (이력이 없으면 {'version', 'full': true, 'users'})
+    - ?uuids=a,b: 해당 사용자만
+    """
+    snap = directory.snapshot()
+
+    uuids = request.args.get('uuids')
+    if uuids:
+        return jsonify([snap.by_uuid[u] for u in uuids.split(',') if u in snap.by_uuid])
+
+    since = request.args.get('since', type=int)
+    if since is not None:
+        changes = directory.changes_since(snap, since)
+        if changes is None:
+            return jsonify({'version': snap.version, 'full': True, 'users': snap.users})
+        upsert, remove = changes
+        return jsonify({'version': snap.version, 'upsert': upsert, 'remove': remove})
+
+    if request.if_none_match.contains_weak(snap.etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(snap.body(), mimetype='application/json')  # 직접 배열 반환
+    response.set_etag(snap.etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'  # 브라우저가 If-None-Match 로 재검증
+    return response
+
+# ✅ 사용자 검색 (이름 / 아이디 접두어, 한글 초성)
+@user_bp.route('/api/users/search', methods=['GET'])
+@query_budget(2)
+@read_only
+@jwt_required()
+def search_users():
+    query = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    return jsonify(directory.snapshot().search(query, limit))
+
 # ✅ 현재 사용자 정보 조회
 @user_bp.route('/api/users/me', methods=['GET'])
+@query_budget(1)
+@read_only
 @jwt_required()
 def get_my_info():
     current_uuid = get_jwt_identity()
@@ -85,8 +134,126 @@ def change_password():
         return jsonify({'error': '현재 비밀번호가 일치하지 않습니다.'}), 401
 
     user.password_hash = hashlib.sha256(new_pw.encode()).hexdigest()
+    # 기존 토큰(다른 기기 포함)은 폐기하고, 이 요청에는 새 토큰 발급
+    tokens.mark_revoked(user)
     db.session.commit()
-    return jsonify({'message': '비밀번호가 변경되었습니다.'}), 200
+    tokens.revoke(user)
+    return jsonify({'message': '비밀번호가 변경되었습니다.', 'token': create_access_token(identity=current_uuid)}), 200
+
+
+def _build_room_list(current_uuid):
+    """채팅방 목록 전체 계산 (room_cache 에 없을 때만 호출)
+
+    그룹 방 수와 관계없이 그룹 방 / 마지막 메시지 / 안 읽은 수 / 멤버를 방 전체에 대해 한 번씩 조회
+    """
+    # 🔹 1. 그룹 채팅방 목록 + 내 읽음 시각 (방마다 1행)
+    group_rooms = (
+        db.session.query(ChatRoom, GroupChatReadStatus.last_read_at)
+        .join(ChatRoomMember, ChatRoom.room_uuid == ChatRoomMember.room_uuid)
+        .outerjoin(GroupChatReadStatus, (GroupChatReadStatus.room_uuid == ChatRoom.room_uuid)
+                   & (GroupChatReadStatus.user_uuid == current_uuid))
+        .filter(ChatRoomMember.user_uuid == current_uuid, ChatRoom.is_group == True, ChatRoom.deleted_at.is_(None))
+        .all()
+    )
+    rooms = {}
+    last_read = {}
+    for room, last_read_at in group_rooms:
+        rooms.setdefault(room.room_uuid, room)
+        last_read[room.room_uuid] = read_status.watermark(current_uuid, room.room_uuid, last_read_at)
+
+    group_room_data = []
+    if rooms:
+        # 방별 마지막 메시지 (window 함수로 방마다 최신 1건)
+        ranked = (
+            db.session.query(
+                Message.room_uuid, Message.message_text, Message.timestamp,
+                func.row_number().over(partition_by=Message.room_uuid,
+                                       order_by=(Message.timestamp.desc(), Message.id.desc())).label('rn'))
+            .filter(Message.room_uuid.in_(rooms), visible_messages())
+            .subquery()
+        )
+        last_messages = {
+            row.room_uuid: row for row in
+            db.session.query(ranked.c.room_uuid, ranked.c.message_text, ranked.c.timestamp).filter(ranked.c.rn == 1)
+        }
+
+        # 🔹 안 읽은 메시지 수 - 방마다 다른 읽음 시각 이후, 본인이 보낸 메시지 제외 (읽은 적 없으면 전체)
+        read_at = {room_uuid: at for room_uuid, at in last_read.items() if at}
+        unread_filter = Message.room_uuid.in_(rooms)
+        if read_at:
+            cutoff = case(read_at, value=Message.room_uuid, else_=None)
+            unread_filter = unread_filter & or_(cutoff.is_(None), Message.timestamp > cutoff)
+        unread_counts = dict(
+            db.session.query(Message.room_uuid, func.count(Message.id))
+            .filter(unread_filter, visible_messages(), Message.sender_uuid != current_uuid)
+            .group_by(Message.room_uuid)
+            .all()
+        )
+
+        # 이름 없는 방은 멤버 이름 조합으로 표시
+        unnamed = [room_uuid for room_uuid, room in rooms.items() if not (room.name and room.name.strip())]
+        member_names = {}
+        if unnamed:
+            for room_uuid, user_uuid, name in (
+                db.session.query(ChatRoomMember.room_uuid, User.user_uuid, User.name)
+                .join(User, User.user_uuid == ChatRoomMember.user_uuid)
+                .filter(ChatRoomMember.room_uuid.in_(unnamed))
+            ):
+                if user_uuid != current_uuid:
+                    member_names.setdefault(room_uuid, []).append(name)
+
+        for room_uuid, room in rooms.items():
+            last_msg = last_messages.get(room_uuid)
+            # 메시지가 없는 그룹 채팅방은 제외
+            if last_msg is None:
+                continue
+            group_room_data.append({
+                "uuid": room_uuid,
+                "name": room.name if room.name and room.name.strip() else ', '.join(member_names.get(room_uuid, [])),
+                "department": '그룹채팅',
+                "last_message": last_msg.message_text,
+                "timestamp": last_msg.timestamp,
+                "is_group": True,
+                "unread_count": unread_counts.get(room_uuid, 0)
+            })
+
+    # 🔹 2. 1:1 채팅방 - direct_conversations 에서 (사용자, last_message_at) 인덱스로 조회
+    other_uuid = case(
+        (DirectConversation.user_low_uuid == current_uuid, DirectConversation.user_high_uuid),
+        else_=DirectConversation.user_low_uuid
+    )
+    results = (
+        db.session.query(User.user_uuid, User.name, User.department,
+                         Message.message_text, Message.timestamp)
+        .select_from(DirectConversation)
+        .join(Message, Message.id == DirectConversation.last_message_id)
+        .join(User, User.user_uuid == other_uuid)
+        .filter(or_(
+            DirectConversation.user_low_uuid == current_uuid,
+            DirectConversation.user_high_uuid == current_uuid
+        ))
+        .filter(DirectConversation.user_low_uuid != DirectConversation.user_high_uuid)
+        .order_by(desc(DirectConversation.last_message_at))
+        .all()
+    )
+
+    one_on_one_rooms = []
+    for row in results:
+        # 빈 메시지는 제외
+        if not row.message_text or row.message_text.strip() == "":
+            continue
+
+        one_on_one_rooms.append({
+            'uuid': row.user_uuid,
+            'name': row.name,
+            'department': row.department,
+            'last_message': row.message_text,
+            'timestamp': row.timestamp,
+            "is_group": False
+        })
+
+    logger.debug("📊 채팅방 목록", extra={'group_rooms': len(group_room_data), 'direct_rooms': len(one_on_one_rooms)})
+    return group_room_data + one_on_one_rooms
 
 
 # ✅ register_routes 함수
@@ -95,6 +262,7 @@ def register_routes(app):
 
     @app.route('/api/register', methods=['POST', 'OPTIONS'])
     @cross_origin(origins=base_url, methods=['POST', 'OPTIONS'])
+    @rate_limit('api_auth')
     def register_user():
         try:
             data = request.get_json()
@@ -124,73 +292,79 @@ def register_routes(app):
 
             return jsonify({'message': '가입 요청이 완료되었습니다. 관리자 승인을 기다려주세요.'}), 201
 
-        except Exception as e:
-            print("❌ 에러 발생:", str(e), file=sys.stderr)
+        except Exception:
+            logger.exception("❌ 회원가입 처리 에러")
             return jsonify({'error': '서버 오류 발생'}), 500
         
     @app.route('/api/delete-user/<int:user_id>', methods=['DELETE'])
     @jwt_required()
     def delete_user(user_id):
-        current_user = User.query.filter_by(user_uuid=get_jwt_identity()).first()
-        if not current_user or not current_user.is_admin:
-            return jsonify({'error': '관리자만 삭제할 수 있습니다.'}), 403
+        archive_key = None
+        try:
+            current_user = User.query.filter_by(user_uuid=get_jwt_identity()).first()
+            if not current_user or not current_user.is_admin:
+                return jsonify({'error': '관리자만 삭제할 수 있습니다.'}), 403
 
-        user = User.query.get(user_id)
-        if not user:
-            return jsonify({'error': '사용자를 찾을 수 없습니다.'}), 404
+            user = db.session.get(User, user_id)
+            if not user:
+                return jsonify({'error': '사용자를 찾을 수 없습니다.'}), 404
 
-        # ✅ 사용자 이름/사번 기반 폴더 생성
-        user_folder = f"{user.name}_{user.employee_id}"
-        base_path = os.path.join("deleted_user_logs", user_folder)
-        os.makedirs(base_path, exist_ok=True)
-
-        # ✅ 사용자가 참여한 모든 메시지 가져오기
-        messages = Message.query.filter(
-            (Message.sender_id == user.id) | (Message.receiver_id == user.id)
-        ).order_by(Message.timestamp.asc()).all()
-
-        # ✅ 메시지를 채팅 상대방별로 분류
-        logs = {}
-        for msg in messages:
-            if msg.sender_id == user.id:
-                other_id = msg.receiver_id
-                direction = '→'
-            else:
-                other_id = msg.sender_id
-                direction = '←'
+            user_uuid = user.user_uuid
+            sent_or_received = or_(Message.sender_id == user.id, Message.receiver_id == user.id)
 
-            if other_id not in logs:
-                other_user = User.query.get(other_id)
-                if not other_user:
-                    continue
-                logs[other_id] = {
-                    "filename": f"{user.name}-{other_user.name}.txt",
-                    "lines": []
-                }
-
-            logs[other_id]["lines"].append(
-                f"[{msg.timestamp}] {direction} {msg.message_text}"
-            )
+            # ✅ 대화 로그는 삭제 전에 저장소 파일로 스트리밍 (삭제가 취소되면 아래 except 에서 파일도 제거)
+            archive_key = tasks.write_user_archive(user)
 
-        # ✅ 파일 저장
-        for other_id, log in logs.items():
-            log_path = os.path.join(base_path, log["filename"])
-            with open(log_path, 'w', encoding='utf-8') as f:
-                for line in log["lines"]:
-                    f.write(line + "\n")
+            # ✅ 첨부파일 사용량 감소 (첨부가 있는 메시지만 읽음, 파일은 참조가 없어지므로 attachment GC 가 정리)
+            attachments.release(Message.query.filter(sent_or_received, Message.file_path.isnot(None)).all())
 
-        # ✅ 메시지 먼저 삭제
-        for msg in messages:
-            db.session.delete(msg)
+            # ✅ 채팅방 목록 캐시: 1:1 상대방 목록에서 제거, 보낸 그룹 메시지가 있던 방 멤버는 재계산
+            room_uuids = select(Message.room_uuid).where(sent_or_received, Message.room_uuid.isnot(None))
+            group_member_uuids = {
+                m.user_uuid for m in ChatRoomMember.query.filter(ChatRoomMember.room_uuid.in_(room_uuids))
+            }
 
-        # ✅ 사용자 삭제
-        db.session.delete(user)
-        db.session.commit()
+            # ✅ 메시지 삭제 (읽음 기록 → 메시지, 각각 DELETE 한 번)
+            MessageRead.query.filter(or_(
+                MessageRead.message_id.in_(select(Message.id).where(sent_or_received)),
+                MessageRead.reader_uuid == user_uuid,
+            )).delete(synchronize_session=False)
+            Message.query.filter(sent_or_received).delete(synchronize_session=False)
+
+            partner_uuids = [
+                c.other_uuid(user.user_uuid) for c in DirectConversation.query.filter(
+                    or_(DirectConversation.user_low_uuid == user.user_uuid,
+                        DirectConversation.user_high_uuid == user.user_uuid)
+                )
+            ]
+            DirectConversation.query.filter(
+                or_(DirectConversation.user_low_uuid == user.user_uuid,
+                    DirectConversation.user_high_uuid == user.user_uuid)
+            ).delete(synchronize_session=False)
+
+            # ✅ 사용자 삭제 - 작업은 commit 이후 실행 (백업 작업: 상대방별 파일 deleted_user_logs/<이름>_<사번>/, payload 는 id 만)
+            db.session.delete(user)
+            directory.record_change(user_uuid)
+            enqueue('archive_user_logs', user_id=user.id, user_uuid=user_uuid)
+            enqueue('room_removed', user_uuids=partner_uuids, key=user_uuid)
+            enqueue('room_lists_invalidated', user_uuids=sorted(group_member_uuids | {user_uuid}))
+            db.session.commit()
+
+            return jsonify({'message': '사용자 삭제 완료 (대화 로그 백업은 잠시 후 완료됩니다)'}), 200
 
-        return jsonify({'message': '사용자 삭제 및 모든 기록 백업 완료'}), 200
+        except Exception:
+            db.session.rollback()
+            logger.exception("❌ 사용자 삭제 에러", extra={'user_id': user_id})
+            if archive_key:
+                try:
+                    get_storage().delete(archive_key)
+                except Exception:
+                    logger.exception("❌ 삭제 취소된 사용자의 대화 로그 파일 제거 실패", extra={'key': archive_key})
+            return jsonify({'error': '사용자 삭제 중 오류가 발생했습니다.'}), 500
 
     @app.route('/api/login', methods=['POST'])
     @cross_origin(origins=base_url, methods=['POST', 'OPTIONS'])
+    @rate_limit('api_auth')
     def login_user():
         try:
             data = request.get_json()
@@ -213,21 +387,34 @@ def register_routes(app):
             if not user.is_approved:
                 return jsonify({'error': '관리자 승인 대기 중입니다.'}), 403
 
-            access_token = create_access_token(identity=user.user_uuid, expires_delta=timedelta(hours=1))
+            access_token = create_access_token(identity=user.user_uuid)
             return jsonify({'message': '로그인 성공','token': access_token,'is_admin': user.is_admin}), 200
 
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/messages/<other_uuid>', methods=['GET'])
+    @query_budget(2)
+    @read_only
     @jwt_required()
     def get_messages(other_uuid):
         current_uuid = get_jwt_identity()
-        messages = Message.query.filter(
-            ((Message.sender_uuid == current_uuid) & (Message.receiver_uuid == other_uuid)) |
-            ((Message.sender_uuid == other_uuid) & (Message.receiver_uuid == current_uuid))
-        ).order_by(Message.timestamp.asc()).all()
+        conversation = find_direct_conversation(current_uuid, other_uuid)
+        if not conversation:
+            return jsonify([])
+
+        # ✅ (conversation_id, timestamp) 인덱스로 바로 조회
+        query = (
+            db.session.query(Message.id, Message.sender_uuid, Message.receiver_uuid, Message.message_text,
+                             Message.timestamp, Message.file_name, Message.file_type)
+            .filter(Message.conversation_id == conversation.id, visible_messages())
+        )
+        if conversation.cleared_at:
+            # 대화 삭제 이전 메시지 숨김 (purger 정리 전)
+            query = query.filter(Message.timestamp > conversation.cleared_at)
+        messages = query.order_by(Message.timestamp.asc()).all()
 
+        # timestamp는 JSON provider가 ISO 8601로 직렬화
         return jsonify([
             {
                 'sender': m.sender_uuid,             # ✅ sender_uuid로 명확히 반환
@@ -235,7 +422,7 @@ def register_routes(app):
                 'sender_uuid': m.sender_uuid,        # ✅ 명시적으로 포함
                 'receiver_uuid': m.receiver_uuid,    # ✅ 명시적으로 포함
                 'text': m.message_text,
-                'timestamp': m.timestamp.isoformat(),
+                'timestamp': m.timestamp,
                 'file_name': m.file_name,           # 파일명 추가
                 'file_type': m.file_type,           # 파일 타입 추가
                 'message_id': m.id                  # 메시지 ID 추가 (다운로드용)
@@ -244,9 +431,8 @@ def register_routes(app):
 
     @app.route('/api/messages', methods=['POST'])
     @jwt_required()
+    @rate_limit('api_write')
     def send_message():
-        from app import socketio  # socketio 인스턴스 가져오기
-        
         data = request.get_json()
         current_uuid = get_jwt_identity()
 
@@ -256,6 +442,10 @@ def register_routes(app):
 
         # 👉 그룹 채팅 여부 판별
         if 'room_uuid' in data:
+            room = ChatRoom.query.filter_by(room_uuid=data['room_uuid']).first()
+            if not room or room.deleted_at is not None:
+                return jsonify({'error': '채팅방을 찾을 수 없습니다.'}), 404
+
             msg = Message(
                 sender_id=sender.id,
                 sender_uuid=sender.user_uuid,
@@ -264,48 +454,34 @@ def register_routes(app):
                 room_uuid=data['room_uuid']
             )
             db.session.add(msg)
+            db.session.flush()
+            # 그룹 멤버 실시간 알림 / 채팅방 목록 갱신은 commit 이후 백그라운드 작업에서
+            enqueue('message_fanout', message_id=msg.id)
             db.session.commit()
-            
-            # Socket.IO로 그룹 채팅 메시지 알림 전송
-            print(f"📨 그룹 채팅 메시지 전송: room_uuid={data['room_uuid']}, sender={sender.user_uuid}")
-            
-            # 그룹 멤버들에게 실시간 알림 전송
-            members = ChatRoomMember.query.filter_by(room_uuid=data['room_uuid']).all()
-            for member in members:
-                socketio.emit('new_message', {
-                    'sender_uuid': sender.user_uuid,
-                    'room_uuid': data['room_uuid'],
-                    'message': data['text']
-                })
-                socketio.emit('group_message', {
-                    'room_uuid': data['room_uuid'],
-                    'sender_uuid': sender.user_uuid,
-                    'message': data['text']
-                })
+            logger.debug("📨 그룹 채팅 메시지 전송", extra={'room_uuid': data['room_uuid'], 'sender_uuid': sender.user_uuid})
             
         elif 'receiver_uuid' in data:
             receiver = User.query.filter_by(user_uuid=data['receiver_uuid']).first()
             if not receiver:
                 return jsonify({'error': '받는 사람을 찾을 수 없습니다.'}), 400
 
+            conversation = get_or_create_direct_conversation(sender.user_uuid, receiver.user_uuid)
             msg = Message(
                 sender_id=sender.id,
                 receiver_id=receiver.id,
                 sender_uuid=sender.user_uuid,
                 receiver_uuid=receiver.user_uuid,
+                conversation_id=conversation.id,
                 message_text=data['text'],
                 timestamp=datetime.utcnow()
             )
             db.session.add(msg)
+            db.session.flush()
+            record_last_message(conversation, msg)
+            # 받는 사람 알림 / 채팅방 목록 갱신은 commit 이후 백그라운드 작업에서
+            enqueue('message_fanout', message_id=msg.id)
             db.session.commit()
             
-            # Socket.IO로 1:1 채팅 메시지 알림 전송
-            socketio.emit('new_message', {
-                'sender_uuid': sender.user_uuid,
-                'receiver_uuid': receiver.user_uuid,
-                'message': data['text']
-            })
-            
         else:
             return jsonify({'error': 'room_uuid 또는 receiver_uuid가 필요합니다.'}), 400
         
@@ -316,243 +492,62 @@ def register_routes(app):
         }), 201
 
     @app.route('/api/chat-rooms', methods=['GET'])
+    @query_budget(5)
     @jwt_required()
     def get_chat_rooms():
         current_uuid = get_jwt_identity()
-
-        # 🔹 1. 그룹 채팅방 목록 가져오기 - DISTINCT로 중복 제거
-        group_rooms = (
-            db.session.query(ChatRoom)
-            .join(ChatRoomMember, ChatRoom.room_uuid == ChatRoomMember.room_uuid)
-            .filter(ChatRoomMember.user_uuid == current_uuid, ChatRoom.is_group == True)
-            .distinct(ChatRoom.room_uuid)  # 중복 제거
-            .all()
-        )
-
-        group_room_data = []
-        seen_room_uuids = set()  # 처리된 room_uuid 추적
-        
-        for room in group_rooms:
-            # 이미 처리된 room_uuid는 스킵
-            if room.room_uuid in seen_room_uuids:
-                print(f"⚠️ [스킵] 이미 처리된 room: {room.room_uuid}")
-                continue
-            
-            seen_room_uuids.add(room.room_uuid)
-            print(f"🔍 [그룹 채팅방] room_uuid: {room.room_uuid}, name: {room.name}")
-            
-            last_msg = (
-                db.session.query(Message)
-                .filter(Message.room_uuid == room.room_uuid)
-                .order_by(Message.timestamp.desc())
-                .first()
-            )
-            
-            print(f"📝 [마지막 메시지] room_uuid: {room.room_uuid}, last_msg: {last_msg.message_text if last_msg else 'None'}")
-
-            # 메시지가 없는 그룹 채팅방은 제외
-            if not last_msg:
-                print(f"❌ [제외] {room.room_uuid}: 메시지가 없음")
-                continue
-
-            # 🔹 현재 사용자의 안 읽은 메시지 수 계산
-            # 현재 사용자가 마지막으로 읽은 메시지 찾기
-            last_read = (
-                db.session.query(GroupChatReadStatus)
-                .filter(GroupChatReadStatus.user_uuid == current_uuid, GroupChatReadStatus.room_uuid == room.room_uuid)
-                .first()
-            )
-            
-            print(f"🔍 [읽음 기록] room: {room.room_uuid}, user: {current_uuid}, last_read: {last_read}")
-            
-            if last_read:
-                print(f"📅 [마지막 읽음 시간] {last_read.last_read_at}")
-                # 마지막으로 읽은 메시지 이후의 메시지 수
-                unread_messages = (
-                    db.session.query(Message)
-                    .filter(
-                        Message.room_uuid == room.room_uuid,
-                        Message.timestamp > last_read.last_read_at,
-                        Message.sender_uuid != current_uuid  # 본인이 보낸 메시지 제외
-                    )
-                    .all()
-                )
-                unread_count = len(unread_messages)
-                print(f"📊 [안 읽은 메시지들] {unread_count}개:")
-                for msg in unread_messages:
-                    print(f"   - {msg.timestamp}: {msg.message_text} (from: {msg.sender_uuid})")
-            else:
-                print(f"❌ [읽음 기록 없음] 모든 메시지를 안 읽음으로 계산 (본인 메시지 제외)")
-                # 한 번도 읽지 않은 경우 - 모든 메시지 (본인 메시지 제외)
-                unread_messages = (
-                    db.session.query(Message)
-                    .filter(
-                        Message.room_uuid == room.room_uuid,
-                        Message.sender_uuid != current_uuid  # 본인이 보낸 메시지 제외
-                    )
-                    .all()
-                )
-                unread_count = len(unread_messages)
-                print(f"📊 [전체 안 읽은 메시지들] {unread_count}개:")
-                for msg in unread_messages:
-                    print(f"   - {msg.timestamp}: {msg.message_text} (from: {msg.sender_uuid})")
-
-            members = (
-                db.session.query(User)
-                .join(ChatRoomMember, User.user_uuid == ChatRoomMember.user_uuid)
-                .filter(ChatRoomMember.room_uuid == room.room_uuid)
-                .all()
-            )
-
-            # 그룹 채팅방 이름 설정 - 실제 room.name이 있으면 사용, 없으면 멤버 이름 조합
-            group_name = room.name if room.name and room.name.strip() else ', '.join([m.name for m in members if m.user_uuid != current_uuid])
-            
-            print(f"✅ [추가] 그룹방: {group_name}, 마지막 메시지: {last_msg.message_text}, 안 읽음: {unread_count}개")
-            
-            group_room_data.append({
-                "uuid": room.room_uuid,
-                "name": group_name,
-                "department": '그룹채팅',
-                "last_message": last_msg.message_text,
-                "timestamp": last_msg.timestamp.isoformat(),
-                "is_group": True,
-                "unread_count": unread_count  # 실제 안 읽음 메시지 수 추가
-            })
-
-        # 🔹 2. 기존 1:1 채팅방 로직 유지
-        subquery = (
-            db.session.query(
-                func.max(Message.timestamp).label("latest"),
-                func.least(Message.sender_uuid, Message.receiver_uuid).label("user1"),
-                func.greatest(Message.sender_uuid, Message.receiver_uuid).label("user2")
-            )
-            .filter(or_(
-                Message.sender_uuid == current_uuid,
-                Message.receiver_uuid == current_uuid
-            ))
-            .filter(Message.room_uuid == None)  # 그룹 채팅 메시지 제외
-            .group_by("user1", "user2")
-            .subquery()
-        )
-
-        results = (
-            db.session.query(Message, User)
-            .join(subquery, Message.timestamp == subquery.c.latest)
-            .join(User, or_(
-                User.user_uuid == Message.sender_uuid,
-                User.user_uuid == Message.receiver_uuid
-            ))
-            .filter(User.user_uuid != current_uuid)
-            .order_by(desc(Message.timestamp))
-            .all()
-        )
-
-        one_on_one_rooms = []
-        seen_users = set()  # 중복 방지
-        for msg, user in results:
-            # 빈 메시지는 제외
-            if not msg.message_text or msg.message_text.strip() == "":
-                continue
-                
-            if user.user_uuid not in seen_users:
-                one_on_one_rooms.append({
-                    'uuid': user.user_uuid,
-                    'name': user.name,
-                    'department': user.department,
-                    'last_message': msg.message_text,
-                    'timestamp': msg.timestamp.isoformat(),
-                    "is_group": False
-                })
-                seen_users.add(user.user_uuid)
-
-        # 전체 목록을 최신 메시지 순으로 정렬
-        all_rooms = group_room_data + one_on_one_rooms
-        all_rooms.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-        
-        print(f"📊 [최종 결과] 그룹방: {len(group_room_data)}개, 1:1방: {len(one_on_one_rooms)}개")
-        
+        # ✅ 사용자별 캐시 (메시지 / 읽음 / 삭제 시 증분 갱신) → 최신 메시지 순
+        all_rooms = room_cache.get_room_list(current_uuid, lambda: _build_room_list(current_uuid))
         return jsonify(all_rooms), 200
     
     @app.route('/api/delete-chat-room/<room_id>', methods=['DELETE'])
     @jwt_required()
+    @rate_limit('api_write')
     def delete_chat_room(room_id):
         try:
             current_uuid = get_jwt_identity()
-            print(f"\n📌 [삭제 요청] room_id={room_id}, current_user={current_uuid}")
+            logger.info("📌 채팅방 삭제 요청", extra={'room_id': room_id, 'user_uuid': current_uuid})
 
-            # 🔍 그룹 채팅방 존재 확인
+            # 🔍 그룹 채팅방 존재 확인 (이미 삭제 표시된 방 포함 - 중복 요청은 그대로 성공)
             room = ChatRoom.query.filter_by(room_uuid=room_id).first()
-            print("🔍 ChatRoom 객체:", room)
 
             if room:
                 # 🔐 현재 유저가 이 방의 멤버인지 확인
                 member = ChatRoomMember.query.filter_by(room_uuid=room.room_uuid, user_uuid=current_uuid).first()
                 if not member:
-                    print("⛔️ 이 방의 멤버가 아닙니다.")
+                    logger.warning("⛔️ 멤버가 아닌 사용자의 채팅방 삭제 시도", extra={'room_id': room_id, 'user_uuid': current_uuid})
                     return jsonify({'error': '이 방의 멤버가 아닙니다.'}), 403
 
-                # ✅ 채팅 메시지 불러오기
-                messages = Message.query.filter_by(room_uuid=room.room_uuid).order_by(Message.timestamp).all()
-                print(f"💬 메시지 {len(messages)}개 발견")
-
-                # ✅ 로그 파일 저장 (없어도 생성)
-                os.makedirs('chat_logs', exist_ok=True)
-                filename = f"group_{room.room_uuid}_chat.txt"
-                save_path = os.path.join('chat_logs', filename)
-
-                with open(save_path, 'w', encoding='utf-8') as f:
-                    for msg in messages:
-                        f.write(f"[{msg.timestamp}] {msg.sender_uuid}: {msg.message_text}\n")
-                print(f"📝 로그 저장 완료 → {save_path}")
-
-                # ✅ 메시지, 멤버, 방 삭제
-                Message.query.filter_by(room_uuid=room.room_uuid).delete()
-                ChatRoomMember.query.filter_by(room_uuid=room.room_uuid).delete()
-                GroupChatReadStatus.query.filter_by(room_uuid=room.room_uuid).delete()  # 읽음 상태도 삭제
-                db.session.delete(room)
+                member_uuids = [m.user_uuid for m in ChatRoomMember.query.filter_by(room_uuid=room.room_uuid)]
+
+                # ✅ 삭제 표시만 (로그 백업 / 메시지·멤버 삭제는 purger 가 배치로 처리)
+                if room.deleted_at is None:
+                    tombstone_room(room)
+                enqueue('room_removed', user_uuids=member_uuids, key=room_id, is_group=True)
                 db.session.commit()
-                print("✅ 삭제 성공 및 DB 반영 완료")
+                logger.info("✅ 그룹 채팅방 삭제 표시", extra={'room_id': room_id})
 
                 return jsonify({'message': '그룹 채팅방 삭제 완료'}), 200
 
             # 🔍 그룹 채팅방이 아니면 1:1 채팅 삭제 처리
-            print("🔁 그룹방 없음 → 1:1 채팅 삭제 시도")
-            messages = Message.query.filter(
-                ((Message.sender_uuid == current_uuid) & (Message.receiver_uuid == room_id)) |
-                ((Message.sender_uuid == room_id) & (Message.receiver_uuid == current_uuid))
-            ).filter(Message.room_uuid == None).order_by(Message.timestamp.asc()).all()
-
-            sender = User.query.filter_by(user_uuid=current_uuid).first()
-            receiver = User.query.filter_by(user_uuid=room_id).first()
-
-            os.makedirs('chat_logs', exist_ok=True)
-            filename = f"{sender.name if sender else current_uuid}-{receiver.name if receiver else room_id}_chat.txt"
-            save_path = os.path.join('chat_logs', filename)
-
-            with open(save_path, 'w', encoding='utf-8') as f:
-                for msg in messages:
-                    sender_name = (
-                        sender.name if sender and msg.sender_uuid == sender.user_uuid
-                        else receiver.name if receiver else msg.sender_uuid
-                    )
-                    f.write(f"[{msg.timestamp}] {sender_name}: {msg.message_text}\n")
-            print(f"📝 1:1 로그 저장 완료 → {save_path}")
-
-            for msg in messages:
-                db.session.delete(msg)
+            conversation = find_direct_conversation(current_uuid, room_id)
+            if conversation:
+                clear_direct_conversation(conversation)
+            enqueue('room_removed', user_uuids=[current_uuid], key=room_id, is_group=False)
+            enqueue('room_removed', user_uuids=[room_id], key=current_uuid, is_group=False)
             db.session.commit()
-            print("✅ 1:1 채팅 삭제 완료")
+            logger.info("✅ 1:1 채팅 삭제 표시", extra={'room_id': room_id})
 
             return jsonify({'message': '1:1 채팅방 삭제 완료'}), 200
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ 채팅방 삭제 에러")
             return jsonify({'error': f'서버 오류: {str(e)}'}), 500
     
     @app.route('/api/delete-message/<int:message_id>', methods=['DELETE', 'OPTIONS'])
     @cross_origin(origins=base_url, methods=['DELETE', 'OPTIONS'])
     @jwt_required()
+    @rate_limit('api_write')
     def delete_message(message_id):
         try:
             current_uuid = get_jwt_identity()
@@ -563,64 +558,125 @@ def register_routes(app):
             
             # 메시지 조회
             message = Message.query.get(message_id)
-            if not message:
+            if not message or message.deleted_at is not None:
                 return jsonify({'error': '메시지를 찾을 수 없습니다.'}), 404
             
             # 권한 확인 - 본인이 보낸 메시지만 삭제 가능
             if message.sender_uuid != current_uuid:
                 return jsonify({'error': '본인이 보낸 메시지만 삭제할 수 있습니다.'}), 403
             
-            # 파일이 있는 메시지인 경우 파일도 삭제
-            if message.file_path and os.path.exists(message.file_path):
-                try:
-                    os.remove(message.file_path)
-                    print(f"🗑️ 파일 삭제 완료: {message.file_path}")
-                except Exception as file_error:
-                    print(f"⚠️ 파일 삭제 실패: {str(file_error)}")
-                    # 파일 삭제 실패해도 메시지는 삭제 진행
-            
-            # 메시지 삭제
-            db.session.delete(message)
+            # 목록의 마지막 메시지 / 안 읽음 수가 바뀔 수 있는 사용자
+            if message.room_uuid:
+                affected = [m.user_uuid for m in ChatRoomMember.query.filter_by(room_uuid=message.room_uuid)]
+            else:
+                affected = [message.sender_uuid, message.receiver_uuid]
+            affected = [u for u in affected if u]
+
+            # ✅ 삭제 표시만 (행 / 첨부파일은 purger 가 배치로 삭제)
+            tombstone_message(message)
+            enqueue('message_deleted', message_id=message_id, room_uuid=message.room_uuid, user_uuids=affected)
             db.session.commit()
             
-            print(f"✅ 메시지 삭제 완료: ID {message_id}")
+            logger.info("✅ 메시지 삭제", extra={'message_id': message_id})
             return jsonify({'message': '메시지가 삭제되었습니다.'}), 200
             
-        except Exception as e:
-            print(f"❌ 메시지 삭제 에러: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("❌ 메시지 삭제 에러")
             return jsonify({'error': '메시지 삭제 중 오류가 발생했습니다.'}), 500
 
     @app.route('/api/pending-users', methods=['GET'])
+    @query_budget(3)
+    @read_only
     @jwt_required()
     def get_pending_users():
+        """가입 승인 대기 목록 (?limit=50&cursor=<이전 페이지 next_cursor>)"""
         try:
             current_user_uuid = get_jwt_identity()
-            print("🧪 current_user_uuid:", current_user_uuid)
 
             current_user = User.query.filter_by(user_uuid=current_user_uuid).first()
             if not current_user:
-                print("❌ 현재 사용자 정보 없음")
                 return jsonify({'error': '사용자를 찾을 수 없습니다.'}), 404
 
             if not current_user.is_admin:
-                print("❌ 관리자 아님")
                 return jsonify({'error': '관리자만 접근 가능'}), 403
 
-            users = User.query.filter_by(is_approved=False, is_rejected=False).all()
-            print(f"🔎 대기 유저 {len(users)}명")
-            return jsonify([{
-                'id': u.id,
-                'name': u.name,
-                'username': u.username,
-                'email': u.email,
-            } for u in users])
+            return jsonify(approvals.pending_users_page(
+                request.args.get('limit', 50, type=int), request.args.get('cursor', type=int)
+            ))
         
-        except Exception as e:
-            print("❌ 예외 발생:", str(e))
+        except Exception:
+            logger.exception("❌ 가입 대기 목록 조회 에러")
             return jsonify({'error': '서버 오류'}), 500
 
+    @app.route('/api/admin/users/approve', methods=['POST'])
+    @app.route('/api/admin/users/reject', methods=['POST'])
+    @jwt_required()
+    def bulk_set_users_status():
+        """가입 대기 사용자 일괄 승인 / 반려 {'ids': [...]} → 실제로 처리된 수"""
+        current_user = User.query.filter_by(user_uuid=get_jwt_identity()).first()
+        if not current_user or not current_user.is_admin:
+            return jsonify({'error': '관리자만 처리할 수 있습니다.'}), 403
+
+        try:
+            ids = approvals.parse_ids(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        approve = request.path.endswith('/approve')
+        updated = approvals.set_users_status(ids, approve)
+        db.session.commit()
+        logger.info("✅ 가입 일괄 처리", extra={'action': 'approve' if approve else 'reject',
+                                            'requested': len(ids), 'updated': updated})
+        return jsonify({'requested': len(ids), 'updated': updated}), 200
+
+    @app.route('/api/admin/stats', methods=['GET'])
+    @query_budget(10)
+    @read_only
+    @jwt_required()
+    def admin_stats():
+        """메시지 통계 (?from=YYYY-MM-DD&to=YYYY-MM-DD, 기본 최근 30일) - 일별 집계 테이블만 조회"""
+        current_user = User.query.filter_by(user_uuid=get_jwt_identity()).first()
+        if not current_user or not current_user.is_admin:
+            return jsonify({'error': '관리자만 조회할 수 있습니다.'}), 403
+
+        try:
+            since, until = analytics.parse_range(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        top = max(1, min(request.args.get('top', 20, type=int), 100))
+        return jsonify(analytics.stats(since, until, top)), 200
+
+    @app.route('/api/admin/export', methods=['GET'])
+    @read_only
+    @jwt_required()
+    def export_messages():
+        """대화 내보내기 (NDJSON / CSV, gzip=1 이면 .gz) - 끊기면 마지막으로 받은 id 를 cursor 로 이어받기"""
+        current_user = User.query.filter_by(user_uuid=get_jwt_identity()).first()
+        if not current_user or not current_user.is_admin:
+            return jsonify({'error': '관리자만 내보낼 수 있습니다.'}), 403
+
+        fmt = request.args.get('format', 'ndjson')
+        if fmt not in export.FORMATS:
+            return jsonify({'error': f"format 은 {', '.join(export.FORMATS)} 중 하나여야 합니다."}), 400
+        gzip = request.args.get('gzip', '0') in ('1', 'true')
+        cursor = request.args.get('cursor', type=int)
+        try:
+            filters = export.parse_filters(request.args)
+        except export.ExportError as e:
+            return jsonify({'error': str(e)}), e.status
+
+        logger.info("📤 대화 내보내기", extra={'admin': current_user.user_uuid, 'format': fmt, 'gzip': gzip,
+                                          'cursor': cursor, **{k: v for k, v in filters.items() if v}})
+        # 압축된 파일 자체를 내려받는 것이므로 Content-Encoding 없이 application/gzip
+        response = Response(
+            stream_with_context(export.stream(filters, fmt, gzip, cursor)),
+            mimetype='application/gzip' if gzip else export.MIMETYPES[fmt],
+        )
+        response.headers['Content-Disposition'] = f'attachment; filename="{export.filename(filters, fmt, gzip)}"'
+        response.headers['Cache-Control'] = 'no-store'
+        response.headers['X-Accel-Buffering'] = 'no'  # nginx 가 끝까지 모았다 보내지 않도록
+        return response
+
     @app.route('/api/approve-user/<int:user_id>', methods=['PUT'])
     @jwt_required()
     def approve_user(user_id):
@@ -633,6 +689,7 @@ def register_routes(app):
             return jsonify({'error': '사용자를 찾을 수 없습니다.'}), 404
 
         user.is_approved = True
+        directory.record_change(user.user_uuid)
         db.session.commit()
 
         return jsonify({'message': '사용자 승인 완료'}), 200
@@ -649,12 +706,14 @@ def register_routes(app):
             return jsonify({'error': '사용자를 찾을 수 없습니다.'}), 404
 
         user.is_rejected = True
+        directory.record_change(user.user_uuid)
         db.session.commit()
 
         return jsonify({'message': '사용자 반려 완료'}), 200
     
     @app.route('/api/create-chat-room', methods=['POST'])
     @jwt_required()
+    @rate_limit('api_write')
     def create_chat_room():
         data = request.get_json()
         member_uuids = data.get('members')
@@ -674,11 +733,19 @@ def register_routes(app):
         return jsonify({'room_uuid': room_uuid}), 201
     
     @app.route('/api/chat-rooms/<room_uuid>', methods=['GET'])
+    @query_budget(4)
     @jwt_required()
     def get_group_chat(room_uuid):
         current_uuid = get_jwt_identity()
         
-        messages = Message.query.filter_by(room_uuid=room_uuid).order_by(Message.timestamp).all()
+        messages = (
+            db.session.query(Message.id, Message.sender_uuid, Message.message_text,
+                             Message.timestamp, Message.file_name, Message.file_type)
+            .join(ChatRoom, ChatRoom.room_uuid == Message.room_uuid)
+            .filter(Message.room_uuid == room_uuid, visible_messages(), ChatRoom.deleted_at.is_(None))
+            .order_by(Message.timestamp)
+            .all()
+        )
         members = (
             db.session.query(User.name, User.user_uuid)
             .join(ChatRoomMember, ChatRoomMember.user_uuid == User.user_uuid)
@@ -686,25 +753,11 @@ def register_routes(app):
             .all()
         )
         
-        # 그룹 채팅방 입장 시 자동으로 읽음 표시
-        now = datetime.utcnow()
-        existing_read = GroupChatReadStatus.query.filter_by(
-            user_uuid=current_uuid,
-            room_uuid=room_uuid
-        ).first()
-        
-        if existing_read:
-            existing_read.last_read_at = now
-        else:
-            new_read = GroupChatReadStatus(
-                user_uuid=current_uuid,
-                room_uuid=room_uuid,
-                last_read_at=now
-            )
-            db.session.add(new_read)
-        
-        db.session.commit()
-        print(f"✅ 그룹 채팅방 입장 시 읽음 표시: user={current_uuid}, room={room_uuid}")
+        # 그룹 채팅방 입장 시 자동으로 읽음 표시 (짧은 간격으로 반복되면 모아서 기록)
+        if read_status.mark_read(current_uuid, room_uuid):
+            db.session.commit()
+        room_cache.group_read(current_uuid, room_uuid)
+        logger.debug("✅ 그룹 채팅방 입장 시 읽음 표시", extra={'user_uuid': current_uuid, 'room_uuid': room_uuid})
 
         return jsonify({
             'members': [{'name': m.name, 'uuid': m.user_uuid} for m in members],
@@ -712,7 +765,7 @@ def register_routes(app):
                 {
                     'sender_uuid': msg.sender_uuid,
                     'text': msg.message_text,
-                    'timestamp': msg.timestamp.isoformat(),
+                    'timestamp': msg.timestamp,
                     'file_name': msg.file_name,        # 파일명 추가
                     'file_type': msg.file_type,        # 파일 타입 추가
                     'message_id': msg.id               # 메시지 ID 추가 (다운로드용)
@@ -721,7 +774,9 @@ def register_routes(app):
         })
 
     @app.route('/api/chat-rooms/<room_uuid>/mark-read', methods=['POST'])
+    @query_budget(3)
     @jwt_required()
+    @rate_limit('api_write')
     def mark_group_messages_read(room_uuid):
         try:
             current_uuid = get_jwt_identity()
@@ -735,39 +790,22 @@ def register_routes(app):
             if not member:
                 return jsonify({'error': '이 채팅방의 멤버가 아닙니다.'}), 403
             
-            # 현재 시간을 읽은 시간으로 기록
-            now = datetime.utcnow()
-            
-            # 기존 읽음 기록이 있는지 확인
-            existing_read = GroupChatReadStatus.query.filter_by(
-                user_uuid=current_uuid,
-                room_uuid=room_uuid
-            ).first()
-            
-            if existing_read:
-                # 기존 기록 업데이트
-                existing_read.last_read_at = now
-            else:
-                # 새 읽음 기록 생성
-                new_read = GroupChatReadStatus(
-                    user_uuid=current_uuid,
-                    room_uuid=room_uuid,
-                    last_read_at=now
-                )
-                db.session.add(new_read)
-            
-            db.session.commit()
+            # 현재 시간을 읽은 시간으로 기록 (upsert, 짧은 간격으로 반복되면 모아서 기록)
+            if read_status.mark_read(current_uuid, room_uuid):
+                db.session.commit()
+            room_cache.group_read(current_uuid, room_uuid)
             
-            print(f"✅ 그룹 채팅방 읽음 표시: user={current_uuid}, room={room_uuid}, time={now}")
+            logger.debug("✅ 그룹 채팅방 읽음 표시", extra={'user_uuid': current_uuid, 'room_uuid': room_uuid})
             
             return jsonify({'message': '읽음 표시 완료'}), 200
             
-        except Exception as e:
-            print(f"❌ 읽음 표시 에러: {str(e)}")
+        except Exception:
+            logger.exception("❌ 읽음 표시 에러")
             return jsonify({'error': '읽음 표시 중 오류가 발생했습니다.'}), 500
 
     @app.route('/api/upload-file', methods=['POST'])
     @jwt_required()
+    @rate_limit('api_write')
     def upload_file():
         try:
             current_uuid = get_jwt_identity()
@@ -787,8 +825,6 @@ def register_routes(app):
             target_uuid = request.form.get('target_uuid')
             room_uuid = request.form.get('room_uuid')
             
-            print(f"📤 파일 업로드 시작: {file.filename}, 크기: {file.content_length} bytes")
-            
             # 파일 크기 제한 (10MB)
             file.seek(0, 2)  # 파일 끝으로 이동
             file_size = file.tell()
@@ -804,11 +840,12 @@ def register_routes(app):
             if file_extension not in allowed_extensions:
                 return jsonify({'error': f'허용되지 않는 파일 형식입니다. 허용 형식: {", ".join(allowed_extensions)}'}), 400
             
-            # 디렉토리 생성 (채팅방별)
-            base_upload_dir = os.path.join(os.path.dirname(__file__), 'chat_files')
-            
+            # 저장소 폴더 (채팅방별)
             if room_uuid:
                 # 그룹 채팅방
+                room = ChatRoom.query.filter_by(room_uuid=room_uuid).first()
+                if not room or room.deleted_at is not None:
+                    return jsonify({'error': '채팅방을 찾을 수 없습니다.'}), 404
                 folder_name = f"group_{room_uuid}"
             else:
                 # 1:1 채팅방
@@ -820,29 +857,29 @@ def register_routes(app):
                 names = sorted([current_user.name, other_user.name])
                 folder_name = f"{names[0]}_{names[1]}"
             
-            upload_dir = os.path.join(base_upload_dir, folder_name)
-            
-            # 디렉토리 생성 확인
-            try:
-                os.makedirs(upload_dir, exist_ok=True)
-                print(f"📁 업로드 디렉토리 생성/확인: {upload_dir}")
-            except Exception as dir_error:
-                print(f"❌ 디렉토리 생성 실패: {str(dir_error)}")
-                return jsonify({'error': '파일 저장 디렉토리 생성에 실패했습니다.'}), 500
+            # 사용량 한도 확인 (attachment_usage 테이블만 조회)
+            if room_uuid:
+                usage_owner = attachments.room_owner(room_uuid=room_uuid)
+            else:
+                existing = find_direct_conversation(current_user.user_uuid, other_user.user_uuid)
+                usage_owner = attachments.room_owner(conversation_id=existing.id) if existing else None
+            quota_error = attachments.check_quota(current_user.user_uuid, usage_owner, file_size)
+            if quota_error:
+                return jsonify({'error': quota_error}), 413
             
             # 파일명 생성: 날짜_보낸사람_원본파일명
             now = datetime.now().strftime("%Y%m%d_%H%M%S")
             safe_filename = secure_filename(file.filename)
             new_filename = f"{now}_{current_user.name}_{safe_filename}"
             
-            # 파일 저장
-            file_path = os.path.join(upload_dir, new_filename)
+            # 파일 저장 (Message.file_path 에는 저장소 key 기록)
+            storage = get_storage()
+            file_path = make_key(folder_name, new_filename)
             
             try:
-                file.save(file_path)
-                print(f"💾 파일 저장 완료: {file_path}")
-            except Exception as save_error:
-                print(f"❌ 파일 저장 실패: {str(save_error)}")
+                file_size = storage.save(file_path, file.stream, content_type=file.mimetype)
+            except Exception:
+                logger.exception("❌ 파일 저장 실패")
                 return jsonify({'error': '파일 저장에 실패했습니다.'}), 500
             
             # 메시지로 파일 정보 저장
@@ -859,26 +896,35 @@ def register_routes(app):
                         room_uuid=room_uuid,
                         file_path=file_path,
                         file_name=file.filename,
-                        file_type=file_extension
+                        file_type=file_extension,
+                        file_size=file_size
                     )
                 else:
                     # 1:1 채팅
-                    receiver = User.query.filter_by(user_uuid=target_uuid).first()
+                    receiver = other_user
+                    conversation = get_or_create_direct_conversation(current_user.user_uuid, receiver.user_uuid)
                     msg = Message(
                         sender_id=current_user.id,
                         receiver_id=receiver.id,
                         sender_uuid=current_user.user_uuid,
                         receiver_uuid=receiver.user_uuid,
+                        conversation_id=conversation.id,
                         message_text=file_message,
                         timestamp=datetime.utcnow(),
                         file_path=file_path,
                         file_name=file.filename,
-                        file_type=file_extension
+                        file_type=file_extension,
+                        file_size=file_size
                     )
                 
                 db.session.add(msg)
+                db.session.flush()
+                if not room_uuid:
+                    record_last_message(conversation, msg)
+                attachments.record_upload(msg)
+                enqueue('message_fanout', message_id=msg.id, notify=False)
                 db.session.commit()
-                print(f"✅ 파일 메시지 DB 저장 완료: ID {msg.id}")
+                logger.info("💾 파일 업로드", extra={'message_id': msg.id, 'size': file_size, 'file_type': file_extension})
                 
                 return jsonify({
                     'message': '파일 업로드 성공',
@@ -888,32 +934,29 @@ def register_routes(app):
                     'file_size': file_size
                 }), 200
                 
-            except Exception as db_error:
-                print(f"❌ DB 저장 실패: {str(db_error)}")
+            except Exception:
+                logger.exception("❌ 파일 메시지 DB 저장 실패")
                 # 파일이 저장되었지만 DB 저장 실패 시 파일 삭제
                 try:
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
-                        print(f"🗑️ 실패한 파일 삭제: {file_path}")
-                except:
-                    pass
+                    storage.delete(file_path)
+                except Exception:
+                    logger.warning("⚠️ 실패한 업로드 파일 삭제 실패", extra={'path': file_path})
                 return jsonify({'error': '파일 정보 저장에 실패했습니다.'}), 500
             
         except Exception as e:
-            print(f"❌ 파일 업로드 전체 에러: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ 파일 업로드 에러")
             return jsonify({'error': f'파일 업로드 중 오류가 발생했습니다: {str(e)}'}), 500
 
     @app.route('/api/download-file/<int:message_id>', methods=['GET', 'OPTIONS'])
     @cross_origin(origins=base_url, methods=['GET', 'OPTIONS'])
+    @read_only
     @jwt_required()
     def download_file(message_id):
         try:
             current_uuid = get_jwt_identity()
             msg = Message.query.get(message_id)
             
-            if not msg or not msg.file_path:
+            if not msg or not msg.file_path or not is_message_visible(msg):
                 return jsonify({'error': '파일을 찾을 수 없습니다.'}), 404
             
             # 권한 확인 (보낸 사람이거나 받은 사람이어야 함)
@@ -930,8 +973,10 @@ def register_routes(app):
                 if msg.sender_uuid != current_uuid and msg.receiver_uuid != current_uuid:
                     return jsonify({'error': '파일 다운로드 권한이 없습니다.'}), 403
             
-            # 파일 존재 확인
-            if not os.path.exists(msg.file_path):
+            # 파일 열기 (저장소에서 청크 단위로 스트리밍)
+            try:
+                stream = get_storage().open(msg.file_path)
+            except StorageError:
                 return jsonify({'error': '파일이 존재하지 않습니다.'}), 404
             
             # 이미지 파일인 경우 직접 반환 (브라우저에서 표시하기 위해)
@@ -941,7 +986,7 @@ def register_routes(app):
             if file_extension in image_extensions:
                 # 이미지 파일은 인라인으로 표시
                 return send_file(
-                    msg.file_path,
+                    stream,
                     as_attachment=False,
                     download_name=msg.file_name,
                     mimetype=f'image/{file_extension}'
@@ -949,17 +994,18 @@ def register_routes(app):
             else:
                 # 일반 파일은 다운로드
                 return send_file(
-                    msg.file_path,
+                    stream,
                     as_attachment=True,
                     download_name=msg.file_name
                 )
             
-        except Exception as e:
-            print(f"파일 다운로드 에러: {str(e)}")
+        except Exception:
+            logger.exception("❌ 파일 다운로드 에러")
             return jsonify({'error': '파일 다운로드 중 오류가 발생했습니다.'}), 500
 
     @app.route('/api/password-reset/request', methods=['POST', 'OPTIONS'])
     @cross_origin(origins=base_url, methods=['POST', 'OPTIONS'])
+    @rate_limit('api_auth')
     def request_password_reset():
         try:
             data = request.get_json()
@@ -1010,12 +1056,13 @@ def register_routes(app):
                 'request_id': new_request.id
             }), 201
             
-        except Exception as e:
-            print(f"❌ 비밀번호 재설정 요청 에러: {str(e)}")
+        except Exception:
+            logger.exception("❌ 비밀번호 재설정 요청 에러")
             return jsonify({'error': '서버 오류가 발생했습니다.'}), 500
 
     @app.route('/api/password-reset/status', methods=['POST', 'OPTIONS'])
     @cross_origin(origins=base_url, methods=['POST', 'OPTIONS'])
+    @rate_limit('api_auth')
     def check_password_reset_status():
         try:
             data = request.get_json()
@@ -1049,8 +1096,8 @@ def register_routes(app):
                 'user_name': user.name
             }), 200
             
-        except Exception as e:
-            print(f"❌ 비밀번호 재설정 상태 확인 에러: {str(e)}")
+        except Exception:
+            logger.exception("❌ 비밀번호 재설정 상태 확인 에러")
             return jsonify({'error': '서버 오류가 발생했습니다.'}), 500
 
     @app.route('/api/password-reset/approve/<int:request_id>', methods=['PUT', 'OPTIONS'])
@@ -1080,8 +1127,8 @@ def register_routes(app):
             
             return jsonify({'message': '비밀번호 재설정 요청이 승인되었습니다.'}), 200
             
-        except Exception as e:
-            print(f"❌ 비밀번호 재설정 승인 에러: {str(e)}")
+        except Exception:
+            logger.exception("❌ 비밀번호 재설정 승인 에러")
             return jsonify({'error': '서버 오류가 발생했습니다.'}), 500
 
     @app.route('/api/password-reset/reject/<int:request_id>', methods=['PUT', 'OPTIONS'])
@@ -1111,12 +1158,13 @@ def register_routes(app):
             
             return jsonify({'message': '비밀번호 재설정 요청이 거부되었습니다.'}), 200
             
-        except Exception as e:
-            print(f"❌ 비밀번호 재설정 거부 에러: {str(e)}")
+        except Exception:
+            logger.exception("❌ 비밀번호 재설정 거부 에러")
             return jsonify({'error': '서버 오류가 발생했습니다.'}), 500
 
     @app.route('/api/password-reset/reset', methods=['POST', 'OPTIONS'])
     @cross_origin(origins=base_url, methods=['POST', 'OPTIONS'])
+    @rate_limit('api_auth')
     def reset_password():
         try:
             data = request.get_json()
@@ -1152,18 +1200,24 @@ def register_routes(app):
             
             # 요청 상태를 완료로 변경
             approved_request.status = 'completed'
+            # 재설정 전에 발급된 토큰 폐기
+            tokens.mark_revoked(user)
             
             db.session.commit()
+            tokens.revoke(user)
             
             return jsonify({'message': '비밀번호가 성공적으로 변경되었습니다.'}), 200
             
-        except Exception as e:
-            print(f"❌ 비밀번호 재설정 에러: {str(e)}")
+        except Exception:
+            logger.exception("❌ 비밀번호 재설정 에러")
             return jsonify({'error': '서버 오류가 발생했습니다.'}), 500
 
     @app.route('/api/admin/password-reset-requests', methods=['GET'])
+    @query_budget(3)
+    @read_only
     @jwt_required()
     def get_password_reset_requests():
+        """비밀번호 재설정 요청 목록 (?status=pending&limit=50&cursor=<이전 페이지 next_cursor>)"""
         try:
             current_uuid = get_jwt_identity()
             current_user = User.query.filter_by(user_uuid=current_uuid).first()
@@ -1171,20 +1225,105 @@ def register_routes(app):
             if not current_user or not current_user.is_admin:
                 return jsonify({'error': '관리자만 접근할 수 있습니다.'}), 403
             
-            # 대기 중인 요청들 가져오기
-            pending_requests = PasswordResetRequest.query.filter_by(status='pending').order_by(PasswordResetRequest.requested_at.desc()).all()
-            
-            requests_data = []
-            for req in pending_requests:
-                user = User.query.filter_by(user_uuid=req.user_uuid).first()
-                requests_data.append({
-                    **req.to_dict(),
-                    'user_name': user.name if user else 'Unknown'
-                })
-            
-            return jsonify(requests_data), 200
+            status = request.args.get('status', 'pending')
+            if status not in approvals.RESET_STATUSES:
+                return jsonify({'error': f"status 는 {', '.join(approvals.RESET_STATUSES)} 중 하나여야 합니다."}), 400
+
+            return jsonify(approvals.reset_requests_page(
+                status, request.args.get('limit', 50, type=int), request.args.get('cursor', type=int)
+            )), 200
             
-        except Exception as e:
-            print(f"❌ 비밀번호 재설정 요청 목록 조회 에러: {str(e)}")
+        except Exception:
+            logger.exception("❌ 비밀번호 재설정 요청 목록 조회 에러")
             return jsonify({'error': '서버 오류가 발생했습니다.'}), 500
 
+    @app.route('/api/admin/password-reset/approve', methods=['POST'])
+    @app.route('/api/admin/password-reset/reject', methods=['POST'])
+    @jwt_required()
+    def bulk_set_password_reset_status():
+        """대기 중인 비밀번호 재설정 요청 일괄 승인 / 거부 {'ids': [...]} → 실제로 처리된 수"""
+        current_uuid = get_jwt_identity()
+        current_user = User.query.filter_by(user_uuid=current_uuid).first()
+        if not current_user or not current_user.is_admin:
+            return jsonify({'error': '관리자만 접근할 수 있습니다.'}), 403
+
+        try:
+            ids = approvals.parse_ids(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        status = 'approved' if request.path.endswith('/approve') else 'rejected'
+        updated = approvals.set_reset_requests_status(ids, status, current_uuid)
+        db.session.commit()
+        logger.info("✅ 비밀번호 재설정 요청 일괄 처리", extra={'status': status, 'requested': len(ids), 'updated': updated})
+        return jsonify({'requested': len(ids), 'updated': updated}), 200
+
+    @app.route('/api/admin/db-pool', methods=['GET'])
+    @jwt_required()
+    def get_db_pool_metrics():
+        current_user = User.query.filter_by(user_uuid=get_jwt_identity()).first()
+        if not current_user or not current_user.is_admin:
+            return jsonify({'error': '관리자만 접근할 수 있습니다.'}), 403
+
+        return jsonify(get_pool_metrics(db.engine)), 200
+
+    @app.route('/api/admin/jobs', methods=['GET'])
+    @jwt_required()
+    def get_jobs():
+        current_user = User.query.filter_by(user_uuid=get_jwt_identity()).first()
+        if not current_user or not current_user.is_admin:
+            return jsonify({'error': '관리자만 접근할 수 있습니다.'}), 403
+
+        status = request.args.get('status')
+        if status and status not in jobs.STATUSES:
+            return jsonify({'error': f"status 는 {', '.join(jobs.STATUSES)} 중 하나여야 합니다."}), 400
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        return jsonify({
+            'backend': app.config.get('JOBS_BACKEND', 'memory'),
+            'counts': jobs.job_counts(),
+            'jobs': [jobs.serialize(j) for j in jobs.list_jobs(status, request.args.get('name'), limit)],
+        }), 200
+
+    @app.route('/api/admin/jobs/<int:job_id>', methods=['GET'])
+    @jwt_required()
+    def get_job(job_id):
+        current_user = User.query.filter_by(user_uuid=get_jwt_identity()).first()
+        if not current_user or not current_user.is_admin:
+            return jsonify({'error': '관리자만 접근할 수 있습니다.'}), 403
+
+        record = jobs.get_job(job_id)
+        if record is None:
+            return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+        return jsonify(jobs.serialize(record)), 200
+
+    @app.route('/api/admin/jobs/<int:job_id>/retry', methods=['POST'])
+    @jwt_required()
+    def retry_job(job_id):
+        current_user = User.query.filter_by(user_uuid=get_jwt_identity()).first()
+        if not current_user or not current_user.is_admin:
+            return jsonify({'error': '관리자만 접근할 수 있습니다.'}), 403
+
+        if not jobs.retry_job(job_id):
+            return jsonify({'error': '실패 상태의 작업만 다시 실행할 수 있습니다.'}), 409
+        return jsonify({'message': '작업을 다시 대기열에 등록했습니다.'}), 200
+
+    @app.route('/api/admin/attachment-usage', methods=['GET'])
+    @read_only
+    @jwt_required()
+    def get_attachment_usage():
+        current_user = User.query.filter_by(user_uuid=get_jwt_identity()).first()
+        if not current_user or not current_user.is_admin:
+            return jsonify({'error': '관리자만 접근할 수 있습니다.'}), 403
+
+        scope = request.args.get('scope', 'user')
+        if scope not in attachments.SCOPES:
+            return jsonify({'error': f"scope 는 {', '.join(attachments.SCOPES)} 중 하나여야 합니다."}), 400
+        limit = min(request.args.get('limit', 50, type=int), 500)
+
+        quota_key = 'ATTACHMENT_QUOTA_USER_BYTES' if scope == 'user' else 'ATTACHMENT_QUOTA_ROOM_BYTES'
+        return jsonify({
+            'scope': scope,
+            'quota_bytes': app.config.get(quota_key, 0),
+            'items': attachments.usage_report(scope, limit),
+            'gc_checkpoint': attachments.get_checkpoint(attachments.GC_CHECKPOINT),
+        }), 200
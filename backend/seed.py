@@ -0,0 +1,241 @@
+# seed.py
+"""벤치마크용 대용량 가짜 데이터 생성 (flask seed)
+
+    flask --app app seed --users 2000 --rooms 300 --messages 10000000 --seed 42
+"""
+import bisect
+import hashlib
+import io
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import insert
+
+from db import db
+from models import User, Message, ChatRoom, ChatRoomMember, GroupChatReadStatus, DirectConversation
+from conversations import backfill_last_messages
+from storage import get_storage, make_key
+from attachments import rebuild_usage
+from directory import record_change
+
+DEPARTMENTS = ['개발팀', '영업팀', '인사팀', '재무팀', '생산팀', '품질팀', '구매팀', '연구소', '경영지원팀', '해외사업팀']
+POSITIONS = ['사원', '주임', '대리', '과장', '차장', '부장']
+LAST_NAMES = '김이박최정강조윤장임한오서신권황안송류홍'
+FIRST_SYLLABLES = '민서지현준우예도하윤수진영태성재은혜동건유나'
+WORDS = ['안녕하세요', '회의', '자료', '확인', '부탁드립니다', '감사합니다', '오늘', '내일', '일정',
+         '공유', '드립니다', '검토', '완료', '했습니다', '보고서', '메일', '참고', '바랍니다', '네', '알겠습니다']
+ATTACHMENT_TYPES = ['pdf', 'png', 'jpg', 'xlsx', 'docx', 'pptx', 'zip', 'txt']
+SEED_PASSWORD = 'seed-pw'
+DEFAULT_END_DATE = datetime(2026, 1, 1)  # 실행한 날짜와 무관하게 같은 --seed 면 같은 시각 분포
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _cumulative(weights):
+    total = 0.0
+    cum = []
+    for w in weights:
+        total += w
+        cum.append(total)
+    return cum
+
+
+def _bulk_insert(table, rows):
+    if rows:
+        db.session.execute(insert(table), rows)
+
+
+def _text(rng):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(1, 12)))
+
+
+@click.command('seed')
+@click.option('--users', default=1000, show_default=True, help='생성할 사용자 수')
+@click.option('--rooms', default=200, show_default=True, help='생성할 그룹 채팅방 수')
+@click.option('--direct-pairs', default=5000, show_default=True, help='1:1 대화 상대 쌍 수')
+@click.option('--messages', default=1_000_000, show_default=True, help='생성할 메시지 수')
+@click.option('--room-size-alpha', default=1.5, show_default=True, help='그룹방 인원 분포 (pareto alpha, 작을수록 큰 방이 많음)')
+@click.option('--message-alpha', default=1.1, show_default=True, help='대화별 메시지 분포 (zipf 지수)')
+@click.option('--group-ratio', default=0.4, show_default=True, help='전체 메시지 중 그룹 메시지 비율')
+@click.option('--attachment-ratio', default=0.001, show_default=True, help='첨부파일 메시지 비율')
+@click.option('--days', default=365, show_default=True, help='메시지 시간 분포 기간(일)')
+@click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']), default=DEFAULT_END_DATE.strftime('%Y-%m-%d'),
+              show_default=True, help='메시지 시간 분포의 끝 날짜 (UTC 0시, 고정값이라 실행마다 비교 가능)')
+@click.option('--batch-size', default=20_000, show_default=True, help='INSERT 배치 크기')
+@click.option('--seed', 'seed_value', default=42, show_default=True, help='난수 시드 (같은 값이면 같은 데이터)')
+@with_appcontext
+def seed_command(users, rooms, direct_pairs, messages, room_size_alpha, message_alpha,
+                 group_ratio, attachment_ratio, days, end_date, batch_size, seed_value):
+    """사용자 / 그룹방 / 메시지 / 첨부파일 / 읽음 상태 대량 생성"""
+    rng = random.Random(seed_value)
+    prefix = f'seed{seed_value}_'
+    if db.session.query(User.id).filter(User.username.like(f'{prefix}%')).first():
+        raise click.ClickException(f'이미 seed={seed_value} 데이터가 있습니다. 다른 --seed 를 사용하세요.')
+
+    started = time.time()
+    end_at = end_date or DEFAULT_END_DATE
+    start_at = end_at - timedelta(days=days)
+    span_seconds = days * 86400
+
+    # ✅ 1. 사용자 (부서별)
+    password_hash = hashlib.sha256(SEED_PASSWORD.encode()).hexdigest()
+    user_rows = []
+    for i in range(users):
+        user_rows.append({
+            'user_uuid': _uuid(rng),
+            'name': rng.choice(LAST_NAMES) + ''.join(rng.choices(FIRST_SYLLABLES, k=2)),
+            'employee_id': f'S{seed_value}-{i:07d}',
+            'position': rng.choice(POSITIONS),
+            'grade': rng.choice(POSITIONS),
+            'department': rng.choice(DEPARTMENTS),
+            'email': f'{prefix}{i}@seed.local',
+            'username': f'{prefix}{i}',
+            'password_hash': password_hash,
+            'is_approved': True,
+            'is_admin': False,
+            'is_rejected': False,
+            'created_at': start_at,
+        })
+    for i in range(0, len(user_rows), batch_size):
+        _bulk_insert(User.__table__, user_rows[i:i + batch_size])
+    record_change()  # 사용자 목록 전체 변경
+    db.session.commit()
+
+    id_by_uuid = dict(
+        db.session.query(User.user_uuid, User.id).filter(User.username.like(f'{prefix}%')).all()
+    )
+    user_uuids = [r['user_uuid'] for r in user_rows]
+    click.echo(f'👤 사용자 {users}명')
+
+    # ✅ 2. 그룹방 (인원 수는 pareto 분포 → 소수의 대형 방)
+    room_rows, member_rows, room_members = [], [], []
+    for i in range(rooms):
+        size = min(users, max(3, int(rng.paretovariate(room_size_alpha) * 3)))
+        members = rng.sample(user_uuids, size)
+        room_uuid = _uuid(rng)
+        room_rows.append({
+            'room_uuid': room_uuid,
+            'is_group': True,
+            'created_at': start_at,
+            'name': f'{rng.choice(DEPARTMENTS)} 채팅방 {i}',
+        })
+        member_rows.extend({'room_uuid': room_uuid, 'user_uuid': u} for u in members)
+        room_members.append((room_uuid, members))
+    _bulk_insert(ChatRoom.__table__, room_rows)
+    for i in range(0, len(member_rows), batch_size):
+        _bulk_insert(ChatRoomMember.__table__, member_rows[i:i + batch_size])
+    db.session.commit()
+    click.echo(f'👥 그룹방 {rooms}개, 멤버십 {len(member_rows)}건')
+
+    # ✅ 3. 1:1 대화 쌍
+    pairs = set()
+    max_pairs = users * (users - 1) // 2
+    while len(pairs) < min(direct_pairs, max_pairs):
+        a, b = rng.sample(user_uuids, 2)
+        pairs.add((a, b) if a < b else (b, a))
+    pairs = sorted(pairs)
+    for i in range(0, len(pairs), batch_size):
+        _bulk_insert(DirectConversation.__table__, [
+            {'user_low_uuid': a, 'user_high_uuid': b, 'created_at': start_at}
+            for a, b in pairs[i:i + batch_size]
+        ])
+    db.session.commit()
+    conversation_ids = {
+        (c.user_low_uuid, c.user_high_uuid): c.id
+        for c in db.session.query(DirectConversation.id, DirectConversation.user_low_uuid,
+                                  DirectConversation.user_high_uuid).all()
+    }
+
+    # ✅ 4. 메시지 (대화별 zipf 분포: 소수의 대화에 메시지가 몰림)
+    direct_cum = _cumulative(1.0 / (i + 1) ** message_alpha for i in range(len(pairs))) if pairs else []
+    group_cum = _cumulative(1.0 / (i + 1) ** message_alpha for i in range(len(room_members))) if room_members else []
+    if not direct_cum:
+        group_ratio = 1.0
+    if not group_cum:
+        group_ratio = 0.0
+
+    storage = get_storage()
+    files_dir = f'seed_{seed_value}'
+    last_message_at = {}  # room_uuid -> 마지막 메시지 시각 (읽음 상태 생성용)
+    attachments = 0
+    inserted = 0
+    while inserted < messages:
+        batch = []
+        for _ in range(min(batch_size, messages - inserted)):
+            ts = start_at + timedelta(seconds=rng.random() * span_seconds)
+            if rng.random() < group_ratio:
+                room_uuid, members = room_members[bisect.bisect_left(group_cum, rng.random() * group_cum[-1])]
+                sender = rng.choice(members)
+                row = {
+                    'sender_id': id_by_uuid[sender], 'receiver_id': None,
+                    'sender_uuid': sender, 'receiver_uuid': None, 'room_uuid': room_uuid,
+                    'conversation_id': None,
+                }
+                if ts > last_message_at.get(room_uuid, start_at):
+                    last_message_at[room_uuid] = ts
+            else:
+                a, b = pairs[bisect.bisect_left(direct_cum, rng.random() * direct_cum[-1])]
+                sender, receiver = (a, b) if rng.random() < 0.5 else (b, a)
+                row = {
+                    'sender_id': id_by_uuid[sender], 'receiver_id': id_by_uuid[receiver],
+                    'sender_uuid': sender, 'receiver_uuid': receiver, 'room_uuid': None,
+                    'conversation_id': conversation_ids[(a, b)],
+                }
+            row.update({
+                'message_text': _text(rng), 'image_path': None, 'timestamp': ts,
+                'file_path': None, 'file_name': None, 'file_type': None, 'file_size': None,
+            })
+
+            if rng.random() < attachment_ratio:
+                file_type = rng.choice(ATTACHMENT_TYPES)
+                file_name = f'seed_{inserted + len(batch)}.{file_type}'
+                file_path = make_key(files_dir, file_name)
+                file_size = storage.save(file_path, io.BytesIO(rng.randbytes(rng.randint(1, 64) * 1024)))
+                row.update({
+                    'message_text': f'📎 파일: {file_name}',
+                    'file_path': file_path, 'file_name': file_name, 'file_type': file_type,
+                    'file_size': file_size,
+                })
+                attachments += 1
+            batch.append(row)
+
+        _bulk_insert(Message.__table__, batch)
+        db.session.commit()
+        inserted += len(batch)
+        elapsed = time.time() - started
+        click.echo(f'💬 메시지 {inserted:,}/{messages:,} ({inserted / elapsed:,.0f}/s)')
+
+    # 1:1 대화별 마지막 메시지 (채팅방 목록용)
+    backfill_last_messages()
+    db.session.commit()
+    # 첨부파일 사용량 (attachment_usage)
+    rebuild_usage()
+
+    # ✅ 5. 그룹 읽음 상태 (멤버 대부분이 어느 시점까지 읽은 상태)
+    read_rows = []
+    for room_uuid, members in room_members:
+        last_at = last_message_at.get(room_uuid)
+        if last_at is None:
+            continue
+        for member in members:
+            if rng.random() < 0.8:
+                lag = timedelta(seconds=rng.expovariate(1 / 3600.0))
+                read_rows.append({
+                    'user_uuid': member, 'room_uuid': room_uuid,
+                    'last_read_at': max(start_at, last_at - lag),
+                })
+    for i in range(0, len(read_rows), batch_size):
+        _bulk_insert(GroupChatReadStatus.__table__, read_rows[i:i + batch_size])
+    db.session.commit()
+
+    click.echo(
+        f'✅ 완료: 사용자 {users}, 그룹방 {rooms}, 1:1 쌍 {len(pairs)}, 메시지 {inserted:,} '
+        f'(첨부 {attachments}), 읽음 상태 {len(read_rows)} - {time.time() - started:.1f}s'
+    )
+    click.echo(f'🔑 모든 사용자 비밀번호: {SEED_PASSWORD} (예: {user_rows[0]["username"]})')
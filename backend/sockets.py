@@ -1,102 +1,160 @@
 # sockets.py
+import logging
 from flask import request
 from flask_jwt_extended import decode_token
-from flask_socketio import SocketIO
+from flask_socketio import SocketIO, join_room, leave_room
 from models import User
 from db import db  # app 대신 db를 직접 import
+from metrics import SOCKET_EVENTS
+from connections import ConnectionRegistry, user_room
+import delivery
+import fanout
+import payloads
+import rate_limit
 
-connected_users = {}  # {sid: uuid}
-uuid_to_sid = {}      # {uuid: sid}
+logger = logging.getLogger(__name__)
+
+connections = ConnectionRegistry()  # sid ↔ user_uuid (사용자당 연결 여러 개)
+
+# 수신자에게 전달하는 chat 필드 (클라이언트가 보낸 나머지 필드는 전달하지 않음)
+CHAT_FIELDS = ('message_id', 'sender_uuid', 'receiver_uuid', 'room_uuid', 'text', 'timestamp', 'file_name', 'file_type')
 
 def register_socket_events(socketio: SocketIO):
     @socketio.on('connect')
-    def handle_connect():
-        print("✅ 클라이언트 연결됨")
+    def handle_connect(auth=None):
+        SOCKET_EVENTS.inc(event='connect')
+        connections.connect(request.sid, request.remote_addr)
+        logger.debug("✅ 클라이언트 연결됨", extra={'sid': request.sid, 'sample': 'socket.connect'})
+        # 연결 handshake 에 토큰이 있으면 바로 인증 (authenticate 이벤트 왕복 없이, 재연결 때도 자동)
+        if isinstance(auth, dict) and auth.get('token'):
+            ok, retry_after = _authenticate(auth)
+            if not ok:
+                connections.disconnect(request.sid)
+                if retry_after:
+                    raise ConnectionRefusedError('rate_limited', {'retry_after': round(retry_after, 2)})
+                raise ConnectionRefusedError('unauthorized')
 
-    @socketio.on('authenticate')
-    def handle_auth(data):
-        token = data.get('token')
+    def _throttled(limit, event, *keys):
+        """요청 제한 확인 → 제한되면 본인에게 rate_limited 알림 후 True"""
+        retry_after = rate_limit.check(limit, *keys)
+        if not retry_after:
+            return False
+        fanout.send(request.sid, [('rate_limited', {'event': event, 'retry_after': round(retry_after, 2)})])
+        return True
+
+    def _user_list_events(session):
+        user_list = session.query(User.name, User.user_uuid, User.department).filter(
+            User.user_uuid.in_(connections.online_users())
+        ).all()
+        return [('user_list', [
+            {'uuid': u.user_uuid, 'name': u.name, 'department': u.department}
+            for u in user_list
+        ])]
+
+    def _broadcast_user_list(session):
+        fanout.broadcast('user_list', connections.authenticated_sids(), _user_list_events(session))
+
+    def _authenticate(data):
+        """요청 제한 확인 + 토큰 검증(tokens 캐시) → 연결을 사용자에 연결 / (성공 여부, 제한 시 재시도까지 남은 초)
+
+        제한 key 는 재연결해도 유지되는 접속 IP(검증 전) + 토큰의 사용자(검증 후 - 위조 토큰으로 남의 버킷을 비우지 못하도록)
+        """
+        retry_after = rate_limit.check('socket_auth_ip', f'ip:{request.remote_addr}')
+        if retry_after:
+            return False, retry_after
         try:
-            decoded = decode_token(token)
+            decoded = decode_token(data.get('token'))
             user_uuid = decoded['sub']
+            retry_after = rate_limit.check('socket_auth', f'user:{user_uuid}')
+            if retry_after:
+                logger.info("🚦 소켓 인증 제한", extra={'user_uuid': user_uuid, 'retry_after': round(retry_after, 2)})
+                return False, retry_after
             sid = request.sid
-            connected_users[sid] = user_uuid
-            uuid_to_sid[user_uuid] = sid
+            previous, came_online = connections.authenticate(sid, user_uuid)
+            # 이벤트 인코딩 협상 (encoding 을 보내지 않은 이전 클라이언트는 JSON)
+            connections.set_encoding(sid, payloads.negotiate(data))
+            if previous is not None and previous != user_uuid:
+                leave_room(user_room(previous))
+            join_room(user_room(user_uuid))
+            # 이전 연결로 보냈지만 ack 를 못 받은 메시지는 새 연결로
+            delivery.resume(user_uuid, sid)
 
-            print(f"🟢 인증된 유저: {user_uuid}")
+            logger.info("🟢 소켓 인증", extra={'user_uuid': user_uuid, 'sample': 'socket.authenticate'})
 
-            # 접속 사용자 목록 전달
+            # 접속 사용자 목록: 새로 접속한 사용자면 전체에, 이미 다른 탭 / 기기로 접속 중이면 이 연결에만
             with db.session() as session:
-                user_list = session.query(User.name, User.user_uuid, User.department).filter(
-                    User.user_uuid.in_(connected_users.values())
-                ).all()
-
-                socketio.emit('user_list', [
-                    {'uuid': u.user_uuid, 'name': u.name, 'department': u.department}
-                    for u in user_list
-                ])
+                if came_online or previous is not None:
+                    _broadcast_user_list(session)
+                else:
+                    fanout.send(sid, _user_list_events(session))
+            return True, 0.0
         except Exception as e:
-            print("❌ 인증 실패:", e)
+            logger.warning("❌ 소켓 인증 실패", extra={'error': str(e), 'sample': 'socket.auth_failed'})
+            return False, 0.0
+
+    @socketio.on('authenticate')
+    def handle_auth(data):
+        """연결 후 인증 (handshake 로 토큰을 보내지 않는 이전 클라이언트)"""
+        SOCKET_EVENTS.inc(event='authenticate')
+        _, retry_after = _authenticate(data)
+        if retry_after:
+            fanout.send(request.sid, [('rate_limited', {'event': 'authenticate', 'retry_after': round(retry_after, 2)})])
 
     @socketio.on('chat')
     def handle_chat(data):
-        print(f"💬 메시지 수신: {data}")
+        SOCKET_EVENTS.inc(event='chat')
+        # 보낸 사람은 인증된 연결 기준 (클라이언트가 보낸 sender_uuid 는 무시)
+        sender_uuid = connections.user_of(request.sid)
+        if sender_uuid is None:
+            return
+        if _throttled('socket_chat', 'chat', f'sid:{request.sid}', f'user:{sender_uuid}'):
+            return
+        data = {k: data[k] for k in CHAT_FIELDS if data.get(k) is not None}
+        data['sender_uuid'] = sender_uuid
         receiver_uuid = data.get('receiver_uuid')
-        sender_uuid = data.get('sender_uuid')
         room_uuid = data.get('room_uuid')  # 그룹 채팅 지원
+        # 메시지 본문은 기록하지 않음 (고빈도 이벤트 → 샘플링)
+        logger.debug("💬 메시지 수신", extra={
+            'sender_uuid': sender_uuid, 'receiver_uuid': receiver_uuid,
+            'room_uuid': room_uuid, 'sample': 'socket.chat',
+        })
         
         if room_uuid:
             # 그룹 채팅 메시지 처리
-            print(f"📨 그룹 채팅 메시지: room_uuid={room_uuid}, sender_uuid={sender_uuid}")
-            
-            # 해당 그룹의 모든 멤버에게 메시지 전송
+            # 해당 그룹의 모든 멤버에게 메시지 전송 (멤버별 이벤트는 bundle 하나로, 큰 방은 청크 단위 백그라운드 전송)
             from models import ChatRoomMember
             with db.session() as session:
-                members = session.query(ChatRoomMember.user_uuid).filter(
+                member_uuids = [m.user_uuid for m in session.query(ChatRoomMember.user_uuid).filter(
                     ChatRoomMember.room_uuid == room_uuid
-                ).all()
-                
-                for member in members:
-                    member_sid = uuid_to_sid.get(member.user_uuid)
-                    if member_sid:
-                        socketio.emit('chat', data, to=member_sid)
-                        # 그룹 메시지 알림 전송
-                        socketio.emit('new_message', {
-                            'sender_uuid': sender_uuid, 
-                            'room_uuid': room_uuid
-                        }, to=member_sid)
-                        socketio.emit('group_message', {
-                            'room_uuid': room_uuid, 
-                            'sender_uuid': sender_uuid
-                        }, to=member_sid)
-        else:
-            # 1:1 채팅 메시지 처리 (기존 로직)
-            receiver_sid = uuid_to_sid.get(receiver_uuid)
-            
-            if receiver_sid:
-                socketio.emit('chat', data, to=receiver_sid)  # 🔥 수신자에게만 전송
-                socketio.emit('new_message', {'sender_uuid': sender_uuid}, to=receiver_sid)  # ✅ 추가
+                )]
 
-            sender_sid = uuid_to_sid.get(data.get('sender_uuid'))
-            if sender_sid and sender_sid != receiver_sid:
-                socketio.emit('chat', data, to=sender_sid)  # 🔥 본인에게도 전송
+            events = [
+                ('chat', data),
+                # 그룹 메시지 알림 전송
+                ('new_message', {'sender_uuid': sender_uuid, 'room_uuid': room_uuid}),
+                ('group_message', {'room_uuid': room_uuid, 'sender_uuid': sender_uuid}),
+            ]
+            fanout.deliver('group', member_uuids, connections, lambda _: events, send_fn=delivery.send)
+        else:
+            # 1:1 채팅 메시지 처리 - 수신자에게는 메시지 + 알림, 본인에게는 메시지만
+            receiver_events = [('chat', data), ('new_message', {'sender_uuid': sender_uuid})]
+            sender_events = [('chat', data)]
+            targets = [receiver_uuid] + ([sender_uuid] if sender_uuid != receiver_uuid else [])
+            fanout.deliver('direct', targets, connections,
+                           lambda u: receiver_events if u == receiver_uuid else sender_events,
+                           send_fn=delivery.send)
 
     @socketio.on('disconnect')
     def handle_disconnect():
+        SOCKET_EVENTS.inc(event='disconnect')
         sid = request.sid
-        disconnected_uuid = connected_users.pop(sid, None)
-
-        if disconnected_uuid:
-            uuid_to_sid.pop(disconnected_uuid, None)
-        print(f"🔴 연결 해제: {disconnected_uuid}")
+        # 다른 탭 / 기기 연결이 남아 있으면 접속 중 그대로
+        disconnected_uuid, went_offline = connections.disconnect(sid)
+        rate_limit.forget('socket_chat', f'sid:{sid}')
+        fanout.forget(sid)
+        logger.info("🔴 연결 해제", extra={'user_uuid': disconnected_uuid, 'sample': 'socket.disconnect'})
 
         # 접속 사용자 목록 갱신
-        with db.session() as session:
-            user_list = session.query(User.name, User.user_uuid, User.department).filter(
-                User.user_uuid.in_(connected_users.values())
-            ).all()
-
-            socketio.emit('user_list', [
-                {'uuid': u.user_uuid, 'name': u.name, 'department': u.department}
-                for u in user_list
-            ])
+        if went_offline:
+            with db.session() as session:
+                _broadcast_user_list(session)
@@ -0,0 +1,252 @@
+# storage.py
+"""첨부파일 저장소 (Message.file_path 에는 저장소 key 를 기록)
+
+key 형식: '<폴더>/<파일명>' (예: 'group_<room_uuid>/20250101_120000_홍길동_a.pdf')
+ARCHIVE_PREFIX 아래는 첨부파일이 아닌 내부 보관 파일 (고아 파일 GC 대상 아님)
+
+    STORAGE_BACKEND=local   STORAGE_LOCAL_ROOT=backend/chat_files (기본)
+    STORAGE_BACKEND=s3      S3_BUCKET, S3_PREFIX, S3_ENDPOINT_URL, S3_REGION
+                            S3_MULTIPART_THRESHOLD=8MB 이상은 multipart 업로드 (S3_MULTIPART_CHUNKSIZE 단위)
+
+S3 호환 저장소 로컬 테스트 (MinIO):
+    docker run -p 9000:9000 -e MINIO_ROOT_USER=minio -e MINIO_ROOT_PASSWORD=minio123 minio/minio server /data
+    STORAGE_BACKEND=s3 S3_ENDPOINT_URL=http://localhost:9000 S3_BUCKET=chat-files \\
+    AWS_ACCESS_KEY_ID=minio AWS_SECRET_ACCESS_KEY=minio123
+"""
+import logging
+import os
+import posixpath
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.exceptions import ClientError
+except ImportError:  # 선택 의존성 (STORAGE_BACKEND=s3 일 때만 필요)
+    boto3 = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCAL_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chat_files')
+CHUNK_SIZE = 64 * 1024
+ARCHIVE_PREFIX = '_archives'
+
+
+class StorageError(Exception):
+    """잘못된 key / 저장소 접근 실패"""
+
+
+def make_key(*parts):
+    """폴더 / 파일명 → 저장소 key ('..' 등 상위 경로 불가)"""
+    key = posixpath.normpath('/'.join(p.strip('/') for p in parts if p))
+    if key.startswith('..') or key.startswith('/') or key == '.':
+        raise StorageError(f"❌ 잘못된 저장소 key: {key}")
+    return key
+
+
+class LocalStorage:
+    """로컬 디스크 (단일 서버 / 공유 볼륨)"""
+
+    name = 'local'
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key):
+        path = os.path.abspath(os.path.join(self.root, make_key(key)))
+        if not path.startswith(self.root + os.sep):
+            raise StorageError(f"❌ 잘못된 저장소 key: {key}")
+        return path
+
+    def save(self, key, fileobj, content_type=None):
+        """스트림을 청크 단위로 임시 파일에 쓴 뒤 rename → 쓰다 실패해도 반쯤 쓴 파일이 남지 않음"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                shutil.copyfileobj(fileobj, out, CHUNK_SIZE)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return os.path.getsize(path)
+
+    def open(self, key):
+        """읽기용 파일 객체 (send_file 이 청크 단위로 전송)"""
+        try:
+            return open(self._path(key), 'rb')
+        except FileNotFoundError:
+            raise StorageError(f"❌ 파일 없음: {key}") from None
+
+    def exists(self, key):
+        return os.path.isfile(self._path(key))
+
+    def size(self, key):
+        return os.path.getsize(self._path(key))
+
+    def delete(self, key):
+        path = self._path(key)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        # 비게 된 상위 폴더 정리 (저장소 루트는 유지)
+        parent = os.path.dirname(path)
+        while parent != self.root:
+            try:
+                os.rmdir(parent)
+            except OSError:
+                break
+            parent = os.path.dirname(parent)
+
+    def iter_keys(self, prefix=''):
+        """저장된 key 목록 (정렬 순서)"""
+        for key, _, _ in self.iter_objects(prefix):
+            yield key
+
+    def iter_objects(self, prefix='', start_after=''):
+        """(key, 크기, 수정 시각 UTC) 를 key 사전순으로 - start_after 이하 key 는 건너뜀
+
+        디렉터리 key 를 '<이름>/' 로 보고 정렬해 S3 목록과 같은 순서를 만들고,
+        start_after 보다 앞선 디렉터리는 내려가지 않는다 (체크포인트 이후부터 이어서 탐색).
+        """
+        base = self._path(prefix) if prefix else self.root
+        yield from self._walk(base, make_key(prefix) + '/' if prefix else '', start_after)
+
+    def _walk(self, path, key_prefix, start_after):
+        try:
+            entries = list(os.scandir(path))
+        except FileNotFoundError:
+            return
+        names = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                names.append((key_prefix + entry.name + '/', entry))
+            elif entry.is_file(follow_symlinks=False) and not entry.name.startswith('.upload-'):
+                names.append((key_prefix + entry.name, entry))
+        for key, entry in sorted(names, key=lambda x: x[0]):
+            if key.endswith('/'):
+                if key < start_after and not start_after.startswith(key):
+                    continue  # 하위 key 가 모두 start_after 보다 앞섬
+                yield from self._walk(entry.path, key, start_after)
+            elif key > start_after:
+                stat = entry.stat()
+                yield key, stat.st_size, datetime.utcfromtimestamp(stat.st_mtime)
+
+
+class S3Storage:
+    """S3 호환 오브젝트 스토리지 (AWS S3, MinIO 등)"""
+
+    name = 's3'
+
+    def __init__(self, bucket, prefix='', endpoint_url=None, region=None,
+                 multipart_threshold=8 * 1024 * 1024, multipart_chunksize=8 * 1024 * 1024):
+        if boto3 is None:
+            raise StorageError("❌ STORAGE_BACKEND=s3 에는 boto3 패키지가 필요합니다.")
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.client = boto3.client('s3', endpoint_url=endpoint_url, region_name=region)
+        # ✅ threshold 이상은 multipart 업로드 (파트 단위로 스트리밍 → 메모리에 전체를 올리지 않음)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+        )
+
+    def _object_key(self, key):
+        key = make_key(key)
+        return f'{self.prefix}/{key}' if self.prefix else key
+
+    def save(self, key, fileobj, content_type=None):
+        extra = {'ContentType': content_type} if content_type else None
+        self.client.upload_fileobj(fileobj, self.bucket, self._object_key(key),
+                                   ExtraArgs=extra, Config=self.transfer_config)
+        return self.size(key)
+
+    def open(self, key):
+        """StreamingBody (read() 로 청크 단위 스트리밍)"""
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))['Body']
+        except ClientError as e:
+            raise StorageError(f"❌ 파일 없음: {key} ({e})") from None
+
+    def _head(self, key):
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+    def exists(self, key):
+        return self._head(key) is not None
+
+    def size(self, key):
+        head = self._head(key)
+        if head is None:
+            raise StorageError(f"❌ 파일 없음: {key}")
+        return head['ContentLength']
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+    def iter_keys(self, prefix=''):
+        for key, _, _ in self.iter_objects(prefix):
+            yield key
+
+    def iter_objects(self, prefix='', start_after=''):
+        """(key, 크기, 수정 시각 UTC) - S3 목록은 원래 key 사전순, StartAfter 로 이어서 조회"""
+        full_prefix = self._object_key(prefix) if prefix else (f'{self.prefix}/' if self.prefix else '')
+        strip = len(self.prefix) + 1 if self.prefix else 0
+        params = {'Bucket': self.bucket, 'Prefix': full_prefix}
+        if start_after:
+            params['StartAfter'] = self._object_key(start_after)
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(**params):
+            for obj in page.get('Contents', []):
+                modified = obj['LastModified'].astimezone(timezone.utc).replace(tzinfo=None)
+                yield obj['Key'][strip:], obj['Size'], modified
+
+
+def _local(config):
+    return LocalStorage(config.get('STORAGE_LOCAL_ROOT') or DEFAULT_LOCAL_ROOT)
+
+
+def _s3(config):
+    return S3Storage(
+        bucket=config['S3_BUCKET'],
+        prefix=config.get('S3_PREFIX', ''),
+        endpoint_url=config.get('S3_ENDPOINT_URL'),
+        region=config.get('S3_REGION'),
+        multipart_threshold=config.get('S3_MULTIPART_THRESHOLD', 8 * 1024 * 1024),
+        multipart_chunksize=config.get('S3_MULTIPART_CHUNKSIZE', 8 * 1024 * 1024),
+    )
+
+
+STORAGE_BACKENDS = {
+    'local': _local,
+    's3': _s3,
+}
+
+_storage = None
+
+
+def init_storage(app):
+    """STORAGE_BACKEND 설정으로 저장소 생성 → get_storage()"""
+    global _storage
+    backend = app.config.get('STORAGE_BACKEND', 'local')
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"❌ 지원하지 않는 STORAGE_BACKEND: {backend} ({', '.join(STORAGE_BACKENDS)})")
+    _storage = STORAGE_BACKENDS[backend](app.config)
+    logger.info("✅ 첨부파일 저장소", extra={'backend': backend})
+    return _storage
+
+
+def get_storage():
+    global _storage
+    if _storage is None:
+        _storage = LocalStorage(DEFAULT_LOCAL_ROOT)
+    return _storage
@@ -0,0 +1,181 @@
+# tasks.py
+"""API 요청에서 분리한 후속 작업 (jobs.enqueue 로 등록 → worker 가 commit 이후 실행)
+
+payload 는 JSON 으로 저장되므로 ORM 객체 대신 id / uuid 를 넘기고, 실행 시점에 다시 조회한다.
+재시도될 수 있으므로 여러 번 실행해도 결과가 같도록 작성한다.
+"""
+import json
+import logging
+import os
+import tempfile
+from itertools import groupby
+
+from sqlalchemy import case, or_, select
+
+from db import db
+from jobs import job
+from models import ChatRoom, ChatRoomMember, Message, User
+import fanout
+import read_status
+import room_cache
+from storage import ARCHIVE_PREFIX, CHUNK_SIZE, StorageError, get_storage, make_key
+from tombstones import emit_sync
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_REALTIME = 10  # 소켓 알림 / 채팅방 목록 (사용자가 바로 보는 것)
+
+
+def room_member_names(room_uuid):
+    """[(user_uuid, name), ...] - 탈퇴 등으로 users 에 없는 멤버는 이름 None"""
+    return (
+        db.session.query(ChatRoomMember.user_uuid, User.name)
+        .outerjoin(User, User.user_uuid == ChatRoomMember.user_uuid)
+        .filter(ChatRoomMember.room_uuid == room_uuid)
+        .all()
+    )
+
+
+@job('message_fanout', priority=PRIORITY_REALTIME)
+def message_fanout(message_id, notify=True):
+    """새 메시지: 채팅방 목록 캐시 갱신 + (notify) 대상자에게 new_message 알림"""
+    from sockets import connections
+
+    msg = db.session.get(Message, message_id)
+    if msg is None or msg.deleted_at is not None:
+        return
+
+    if msg.room_uuid:
+        room = ChatRoom.query.filter_by(room_uuid=msg.room_uuid).first()
+        if room is None or room.deleted_at is not None:
+            return
+        members = room_member_names(room.room_uuid)
+        room_cache.group_message_sent(room, msg, members, read_status.room_watermarks(room.room_uuid))
+        if notify:
+            events = [
+                ('new_message', {'sender_uuid': msg.sender_uuid, 'room_uuid': msg.room_uuid,
+                                 'message': msg.message_text}),
+                ('group_message', {'room_uuid': msg.room_uuid, 'sender_uuid': msg.sender_uuid,
+                                   'message': msg.message_text}),
+            ]
+            fanout.deliver('group_notify', [u for u, _ in members], connections, lambda _: events)
+        return
+
+    sender = User.query.filter_by(user_uuid=msg.sender_uuid).first()
+    receiver = User.query.filter_by(user_uuid=msg.receiver_uuid).first()
+    if sender is None or receiver is None:
+        return
+    room_cache.direct_message_sent(sender, receiver, msg)
+    if notify:
+        fanout.deliver('direct_notify', [receiver.user_uuid], connections, lambda _: [('new_message', {
+            'sender_uuid': sender.user_uuid,
+            'receiver_uuid': receiver.user_uuid,
+            'message': msg.message_text
+        })])
+
+
+@job('room_removed', priority=PRIORITY_REALTIME)
+def room_removed(user_uuids, key, is_group=None):
+    """방 / 1:1 대화 삭제: 목록 캐시에서 제거 + (is_group 지정 시) room_deleted 알림"""
+    room_cache.room_removed(user_uuids, key)
+    if is_group is not None:
+        emit_sync(user_uuids, 'room_deleted', {'uuid': key, 'is_group': is_group})
+
+
+@job('message_deleted', priority=PRIORITY_REALTIME)
+def message_deleted(message_id, room_uuid, user_uuids):
+    room_cache.invalidate(user_uuids)
+    emit_sync(user_uuids, 'message_deleted', {'message_id': message_id, 'room_uuid': room_uuid})
+
+
+@job('room_lists_invalidated', priority=PRIORITY_REALTIME)
+def room_lists_invalidated(user_uuids):
+    room_cache.invalidate(user_uuids)
+
+
+def user_archive_key(user_uuid):
+    return make_key(ARCHIVE_PREFIX, 'deleted_users', f'{user_uuid}.ndjson')
+
+
+def _line(value):
+    return json.dumps(value, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def _iter_lines(fileobj):
+    """저장소 파일 객체(로컬 파일 / S3 StreamingBody) → 줄 단위 bytes (CHUNK_SIZE 씩 읽음)"""
+    rest = b''
+    while True:
+        chunk = fileobj.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        *lines, rest = (rest + chunk).split(b'\n')
+        yield from lines
+    if rest:
+        yield rest
+
+
+def write_user_archive(user, batch_size=1000):
+    """삭제할 사용자의 1:1 메시지를 저장소 파일(NDJSON)로 스트리밍 → key (삭제와 같은 트랜잭션, commit 전에)
+
+    첫 줄: {'user_name', 'employee_id', 'partners': [[상대 users.id, 이름], ...]}
+    이후:  [시각, 보낸 users.id, 받은 users.id, 내용] - 상대방별로 모아 시간순
+    """
+    partner = case((Message.sender_id == user.id, Message.receiver_id), else_=Message.sender_id)
+    direct = (or_(Message.sender_id == user.id, Message.receiver_id == user.id), Message.receiver_id.isnot(None))
+    partners = db.session.query(User.id, User.name).filter(User.id.in_(select(partner).where(*direct))).all()
+
+    key = user_archive_key(user.user_uuid)
+    with tempfile.TemporaryFile() as out:
+        out.write(_line({'user_name': user.name, 'employee_id': user.employee_id,
+                         'partners': [list(p) for p in partners]}))
+        result = db.session.execute(
+            select(Message.timestamp, Message.sender_id, Message.receiver_id, Message.message_text)
+            .where(*direct).order_by(partner, Message.timestamp, Message.id),
+            execution_options={'stream_results': True, 'yield_per': batch_size},
+        )
+        try:
+            for row in result:
+                out.write(_line([str(row.timestamp), row.sender_id, row.receiver_id, row.message_text]))
+        finally:
+            result.close()
+        out.seek(0)
+        get_storage().save(key, out, content_type='application/x-ndjson')
+    return key
+
+
+@job('archive_user_logs', concurrency=1)
+def archive_user_logs(user_id, user_uuid):
+    """삭제된 사용자의 1:1 대화 로그를 상대방별 파일로 백업 (write_user_archive 가 저장한 파일을 읽어서)
+
+    파일은 상대방별로 정렬되어 있으므로 한 번에 상대 한 명의 파일만 열고 쓴다. 끝나면 보관 파일 삭제.
+    """
+    storage = get_storage()
+    key = user_archive_key(user_uuid)
+    try:
+        archive = storage.open(key)
+    except StorageError:
+        logger.warning("⚠️ 백업할 대화 로그 파일 없음 (이미 처리됨)", extra={'user_uuid': user_uuid, 'path': key})
+        return
+
+    try:
+        lines = _iter_lines(archive)
+        header = json.loads(next(lines))
+        user_name, names = header['user_name'], dict(header['partners'])
+        base_path = os.path.join("deleted_user_logs", f"{user_name}_{header['employee_id']}")
+        os.makedirs(base_path, exist_ok=True)
+
+        files = 0
+        rows = (json.loads(line) for line in lines)
+        for other_id, entries in groupby(rows, key=lambda r: r[2] if r[1] == user_id else r[1]):
+            other_name = names.get(other_id)
+            if other_name is None:
+                continue
+            with open(os.path.join(base_path, f"{user_name}-{other_name}.txt"), 'w', encoding='utf-8') as f:
+                for timestamp, sender_id, _, text in entries:
+                    f.write(f"[{timestamp}] {'→' if sender_id == user_id else '←'} {text}\n")
+            files += 1
+    finally:
+        archive.close()
+
+    storage.delete(key)
+    logger.info("🗄️ 삭제된 사용자 대화 로그 백업", extra={'user_folder': base_path, 'files': files})
@@ -0,0 +1,109 @@
+# tests/conftest.py
+"""테스트 공통 설정
+
+- app.py 는 import 시점에 create_app() 을 실행하므로 환경 변수를 먼저 지정
+- DB: 임시 디렉터리의 SQLite 파일 2개 (primary + replica_0, db_routing 테스트용)
+  → replica 는 기본적으로 제외 상태(읽기도 primary), replica 테스트에서만 켠다
+- QUERY_DEBUG + QUERY_BUDGET_STRICT: @query_budget 초과 / N+1 이면 QueryBudgetExceeded
+- 테스트마다 모든 테이블을 비우고 프로세스 캐시(채팅방 목록, 사용자 목록, JWT)를 초기화
+"""
+import hashlib
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_TMP = tempfile.mkdtemp(prefix='hi_msg_tests_')
+PRIMARY_DB = os.path.join(_TMP, 'primary.db')
+REPLICA_DB = os.path.join(_TMP, 'replica.db')
+
+os.environ.update({
+    'REACT_APP_REA_BASE': 'http://localhost:3000',
+    'FLASK_SECRET_KEY': 'test-secret-key-0123456789abcdef',
+    'DATABASE_URL': f'sqlite:///{PRIMARY_DB}',
+    'DATABASE_REPLICA_URLS': f'sqlite:///{REPLICA_DB}',
+    'DB_REPLICA_CHECK_INTERVAL': '3600',
+    'QUERY_DEBUG': '1',
+    'QUERY_BUDGET_STRICT': '1',
+    'RATE_LIMIT_ENABLED': '0',
+    'PURGE_ENABLED': '0',
+    'ATTACHMENT_GC_ENABLED': '0',
+    'ANALYTICS_ENABLED': '0',
+    'JWT_REVOCATION_REFRESH': '0',
+    'LOG_LEVEL': 'WARNING',
+    'STORAGE_LOCAL_ROOT': os.path.join(_TMP, 'files'),
+})
+os.chdir(_TMP)  # chat_logs 등 상대 경로 파일은 임시 디렉터리에
+
+import app as app_module  # noqa: E402
+from db import db  # noqa: E402
+from db_routing import router  # noqa: E402
+from models import User  # noqa: E402
+import directory  # noqa: E402
+import logging_setup  # noqa: E402
+import room_cache  # noqa: E402
+import tokens  # noqa: E402
+
+
+@pytest.fixture(scope='session', autouse=True)
+def app():
+    yield app_module.app
+    logging_setup.setup_logging().stop()  # pytest 가 출력 캡처를 닫기 전에 로그 writer 종료
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(autouse=True)
+def _clean_state(app, monkeypatch):
+    monkeypatch.setattr(router, 'healthy', set())  # replica 제외 (db_routing 테스트에서만 켬)
+    router.last_write.clear()
+    yield
+    with app.app_context():
+        db.session.rollback()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+    room_cache._backend = room_cache.LocalRoomCache(ttl=300)
+    directory._snapshot = None
+    tokens._cache.clear()
+    tokens._versions.clear()
+    tokens._local.clear()
+    router.last_write.clear()
+
+
+@pytest.fixture
+def make_user(app):
+    """승인된 사용자 생성 → User (detached, user_uuid / id 사용 가능)"""
+    def _make(name=None, admin=False, approved=True, password='pw', department='개발'):
+        name = name or f'user-{uuid.uuid4().hex[:8]}'
+        with app.app_context():
+            user = User(
+                name=name, employee_id=uuid.uuid4().hex[:12], email=f'{name}@example.com', username=name,
+                department=department, password_hash=hashlib.sha256(password.encode()).hexdigest(),
+                is_approved=approved, is_admin=admin,
+            )
+            db.session.add(user)
+            db.session.commit()
+            db.session.refresh(user)
+            db.session.expunge(user)
+            return user
+    return _make
+
+
+@pytest.fixture
+def auth(app):
+    """User → Authorization 헤더"""
+    from flask_jwt_extended import create_access_token
+
+    def _auth(user):
+        with app.app_context():
+            return {'Authorization': f'Bearer {create_access_token(identity=user.user_uuid)}'}
+    return _auth
@@ -0,0 +1,138 @@
+# tests/test_background_loops.py
+"""백그라운드 전송 루프: 예외가 나도 계속 돌고, 어떤 이유로든 끝나면 실행 중 표시를 풀어 다음 호출이 다시 시작"""
+import pytest
+
+import delivery
+import fanout
+import payloads
+
+
+class _Stop(BaseException):
+    """except Exception 으로 잡히지 않는 종료 (greenlet kill 등)"""
+
+
+def _stop(*_):
+    raise _Stop()
+
+
+class _FakeSocketIO:
+    def __init__(self):
+        self.emitted = []
+        self.started = []
+
+    def emit(self, event, data, to=None, callback=None):
+        self.emitted.append((event, to))
+
+    def start_background_task(self, fn):
+        self.started.append(fn)
+
+
+@pytest.fixture
+def payload_loop(monkeypatch):
+    sio = _FakeSocketIO()
+    monkeypatch.setattr(payloads, '_socketio', sio)
+    monkeypatch.setattr(payloads, '_interval', 0)
+    monkeypatch.setattr(payloads, '_frames', {})
+    monkeypatch.setattr(payloads, '_flusher_running', False)
+    return sio
+
+
+def test_payload_flush_loop_survives_errors(payload_loop, monkeypatch):
+    real_flush = payloads.flush
+    calls = []
+
+    def flaky_flush():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError('인코딩 실패')
+        return real_flush()
+
+    monkeypatch.setattr(payloads, 'flush', flaky_flush)
+    payloads.queue('sid-1', [('resync', {'dropped': 1})])
+    assert payloads._flusher_running
+
+    payloads._flush_loop()
+    assert len(calls) == 2
+    assert payload_loop.emitted == [(payloads.FRAME_EVENT, 'sid-1')]
+    assert not payloads._flusher_running
+
+
+def test_payload_flush_keeps_other_sids_when_one_fails(payload_loop, monkeypatch):
+    real_encode = payloads.encode_events
+
+    def encode_events(events, memo):
+        if events[0][1] is None:
+            raise TypeError('인코딩할 수 없는 데이터')
+        return real_encode(events, memo)
+
+    monkeypatch.setattr(payloads, 'encode_events', encode_events)
+    payloads._frames.update({'bad': ([('resync', None)], []), 'good': ([('resync', {'dropped': 1})], [])})
+    payloads.flush()
+    assert payload_loop.emitted == [(payloads.FRAME_EVENT, 'good')]
+
+
+def test_payload_flush_loop_resets_flag_on_exit(payload_loop, monkeypatch):
+    monkeypatch.setattr(payloads, 'flush', _stop)
+    payloads.queue('sid-1', [('resync', {'dropped': 1})])
+    with pytest.raises(_Stop):
+        payloads._flush_loop()
+    assert not payloads._flusher_running
+
+    payloads.queue('sid-1', [('resync', {'dropped': 1})])  # 다음 queue 가 루프를 다시 시작
+    assert len(payload_loop.started) == 2
+
+
+def test_fanout_flush_loop_survives_errors(monkeypatch):
+    monkeypatch.setattr(fanout, 'FLUSH_INTERVAL', 0)
+    monkeypatch.setattr(fanout, '_pending', {'a': {'events': {}, 'dropped': 1}, 'b': {'events': {}, 'dropped': 2}})
+    monkeypatch.setattr(fanout, '_flusher_running', True)
+    sent = []
+
+    def flush_one(sid):
+        if sid == 'a':
+            raise RuntimeError('연결 확인 실패')
+        sent.append(sid)
+        fanout._pending.clear()
+
+    monkeypatch.setattr(fanout, '_flush_one', flush_one)
+    fanout._flush_loop()
+    assert sent == ['b']
+    assert not fanout._flusher_running
+
+
+def test_fanout_flush_loop_resets_flag_on_exit(monkeypatch):
+    monkeypatch.setattr(fanout, 'FLUSH_INTERVAL', 0)
+    monkeypatch.setattr(fanout, '_pending', {'a': {'events': {}, 'dropped': 1}})
+    monkeypatch.setattr(fanout, '_flusher_running', True)
+    monkeypatch.setattr(fanout, '_flush_one', _stop)
+    with pytest.raises(_Stop):
+        fanout._flush_loop()
+    assert not fanout._flusher_running
+
+
+def test_delivery_check_loop_survives_errors(monkeypatch):
+    monkeypatch.setattr(delivery, 'CHECK_INTERVAL', 0)
+    monkeypatch.setattr(delivery, '_pending', {'u': {}})
+    monkeypatch.setattr(delivery, '_checker_running', True)
+    calls = []
+
+    def check_expired(now):
+        calls.append(now)
+        if len(calls) == 1:
+            raise RuntimeError('연결 조회 실패')
+        delivery._pending.clear()
+
+    monkeypatch.setattr(delivery, '_check_expired', check_expired)
+    delivery._check_loop()
+    assert len(calls) == 2
+    assert not delivery._checker_running
+
+
+def test_delivery_check_loop_resets_flag_on_exit(monkeypatch):
+    monkeypatch.setattr(delivery, 'CHECK_INTERVAL', 0)
+    monkeypatch.setattr(delivery, '_pending', {'u': {}})
+    monkeypatch.setattr(delivery, '_checker_running', True)
+    monkeypatch.setattr(delivery, '_check_expired', _stop)
+    with pytest.raises(_Stop):
+        delivery._check_loop()
+    assert not delivery._checker_running
@@ -0,0 +1,34 @@
+# tests/test_conversations.py
+"""1:1 대화 동시 생성: 먼저 조회할 때 없던 행을 상대가 만들어 unique 충돌 → 잠금 읽기로 그 행을 돌려줌"""
+import pytest
+
+import conversations
+from db import db
+from models import DirectConversation
+
+
+def test_create_race_returns_other_row(app, make_user, monkeypatch):
+    alice, bob = make_user(), make_user()
+    low, high = conversations.ordered_pair(alice.user_uuid, bob.user_uuid)
+    with app.app_context():
+        with db.engine.begin() as conn:  # 다른 요청이 먼저 commit
+            conn.execute(DirectConversation.__table__.insert().values(user_low_uuid=low, user_high_uuid=high))
+        monkeypatch.setattr(conversations, 'find_direct_conversation', lambda a, b: None)  # 충돌 전 snapshot
+
+        conversation = conversations.get_or_create_direct_conversation(alice.user_uuid, bob.user_uuid)
+        assert conversation is not None
+        assert (conversation.user_low_uuid, conversation.user_high_uuid) == (low, high)
+        assert DirectConversation.query.count() == 1
+
+
+def test_create_race_without_row_raises(app, make_user, monkeypatch):
+    alice, bob = make_user(), make_user()
+    low, high = conversations.ordered_pair(alice.user_uuid, bob.user_uuid)
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(DirectConversation.__table__.insert().values(user_low_uuid=low, user_high_uuid=high))
+        monkeypatch.setattr(conversations, 'find_direct_conversation', lambda a, b: None)
+        monkeypatch.setattr(DirectConversation.query_class, 'first', lambda self: None)
+
+        with pytest.raises(conversations.ConversationRaceError):
+            conversations.get_or_create_direct_conversation(alice.user_uuid, bob.user_uuid)
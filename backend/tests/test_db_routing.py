@@ -0,0 +1,72 @@
+# tests/test_db_routing.py
+"""replica 라우팅: SQLite 파일 2개(primary / replica_0)에 같은 사용자를 다른 부서로 넣고
+/api/users/me 응답의 부서로 어느 DB 에서 읽었는지 확인"""
+import pytest
+from sqlalchemy import insert
+
+from conftest import REPLICA_DB
+from db import db
+from db_routing import router
+from models import User
+
+REPLICA = 'replica_0'
+
+
+@pytest.fixture
+def replica(app):
+    engine = router.replicas[REPLICA]
+    assert engine.url.database == REPLICA_DB
+    db.metadata.create_all(engine)  # db.create_all 은 기본 bind 테이블만 만든다
+    yield engine
+    with engine.begin() as conn:
+        for table in reversed(db.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
+@pytest.fixture
+def make_pair(make_user, replica):
+    """primary 에는 부서 'primary', replica 에는 같은 사용자가 부서 'replica' 로"""
+    def _make():
+        user = make_user(department='primary')
+        columns = {c.name: getattr(user, c.key) for c in User.__table__.columns}
+        with replica.begin() as conn:
+            conn.execute(insert(User.__table__).values({**columns, 'department': 'replica'}))
+        return user
+    return _make
+
+
+@pytest.fixture
+def user(make_pair):
+    user = make_pair()
+    router.healthy.add(REPLICA)
+    return user
+
+
+def _read_from(client, auth, user):
+    response = client.get('/api/users/me', headers=auth(user))
+    assert response.status_code == 200
+    return response.get_json()['department']
+
+
+def test_read_only_goes_to_replica(client, auth, user):
+    assert _read_from(client, auth, user) == 'replica'
+
+
+def test_sticky_to_primary_after_write(client, auth, user, make_pair, monkeypatch):
+    other = make_pair()
+    response = client.post('/api/messages', json={'receiver_uuid': other.user_uuid, 'text': 'hi'},
+                           headers=auth(user))
+    assert response.status_code == 201
+    assert _read_from(client, auth, user) == 'primary'   # DB_STICKY_SECONDS 안: 방금 쓴 사용자는 primary
+    assert _read_from(client, auth, other) == 'replica'  # 쓰지 않은 사용자는 그대로 replica
+
+    monkeypatch.setattr(router, 'sticky_seconds', 0)
+    assert _read_from(client, auth, user) == 'replica'
+
+
+def test_unhealthy_replica_falls_back_to_primary(client, auth, user):
+    router._mark(REPLICA, False, None)
+    assert _read_from(client, auth, user) == 'primary'
+
+    router._mark(REPLICA, True, 0)
+    assert _read_from(client, auth, user) == 'replica'
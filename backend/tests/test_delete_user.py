@@ -0,0 +1,91 @@
+# tests/test_delete_user.py
+"""사용자 삭제: 백업 작업 payload 는 id 만, 메시지는 일괄 삭제, 로그 파일은 작업이 저장소 파일에서 생성"""
+import os
+import time
+
+import directory
+import jobs
+import tasks
+from db import db
+from models import Message, MessageRead, User
+from storage import get_storage
+from tasks import user_archive_key
+
+
+def _wait_job(job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        record = jobs.get_job(job_id)
+        if record['status'] in ('done', 'failed'):
+            return record
+        time.sleep(0.05)
+    raise AssertionError(f'작업이 끝나지 않음: {jobs.get_job(job_id)}')
+
+
+def test_delete_user_archives_by_id(app, client, make_user, auth):
+    admin = make_user(admin=True)
+    alice, bob, carol = make_user(name='alice'), make_user(name='bob'), make_user(name='carol')
+    for sender, receiver, text in ((alice, bob, 'hi bob'), (bob, alice, 'hi alice'), (carol, alice, 'yo'),
+                                   (bob, carol, 'not alice')):
+        assert client.post('/api/messages', json={'receiver_uuid': receiver.user_uuid, 'text': text},
+                           headers=auth(sender)).status_code == 201
+    room = client.post('/api/create-chat-room', json={'members': [alice.user_uuid, bob.user_uuid], 'name': 'g'},
+                       headers=auth(alice)).get_json()['room_uuid']
+    assert client.post('/api/messages', json={'room_uuid': room, 'text': 'group'},
+                       headers=auth(alice)).status_code == 201
+    assert client.post(f'/api/chat-rooms/{room}/mark-read', headers=auth(bob)).status_code == 200
+
+    response = client.delete(f'/api/delete-user/{alice.id}', headers=auth(admin))
+    assert response.status_code == 200
+    assert '백업 완료' not in response.get_json()['message']
+
+    with app.app_context():
+        assert db.session.get(User, alice.id) is None
+        assert [m.message_text for m in Message.query.all()] == ['not alice']
+        assert MessageRead.query.count() == 0
+
+    record = jobs.list_jobs(name='archive_user_logs', limit=1)[0]
+    assert record['payload'] == {'user_id': alice.id, 'user_uuid': alice.user_uuid}
+    assert _wait_job(record['id'])['status'] == 'done'
+
+    folder = os.path.join('deleted_user_logs', f'alice_{alice.employee_id}')
+    with open(os.path.join(folder, 'alice-bob.txt'), encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert [line.split('] ', 1)[1] for line in lines] == ['→ hi bob', '← hi alice']
+    with open(os.path.join(folder, 'alice-carol.txt'), encoding='utf-8') as f:
+        assert f.read().endswith('] ← yo\n')
+    assert sorted(os.listdir(folder)) == ['alice-bob.txt', 'alice-carol.txt']
+    assert not get_storage().exists(user_archive_key(alice.user_uuid))
+
+
+def test_failed_delete_removes_archive(app, client, make_user, auth, monkeypatch):
+    admin, alice, bob = make_user(admin=True), make_user(name='alice'), make_user(name='bob')
+    assert client.post('/api/messages', json={'receiver_uuid': bob.user_uuid, 'text': 'hi bob'},
+                       headers=auth(alice)).status_code == 201
+    archived = []
+    real_write = tasks.write_user_archive
+
+    def write_user_archive(user):
+        key = real_write(user)
+        archived.append(get_storage().exists(key))
+        return key
+
+    def fail(user_uuid=None):
+        raise RuntimeError('commit 전 실패')
+
+    monkeypatch.setattr(tasks, 'write_user_archive', write_user_archive)
+    monkeypatch.setattr(directory, 'record_change', fail)
+    response = client.delete(f'/api/delete-user/{alice.id}', headers=auth(admin))
+    assert response.status_code == 500
+    assert archived == [True]
+
+    assert not get_storage().exists(user_archive_key(alice.user_uuid))  # 업로드한 파일 제거
+    assert not [j for j in jobs.list_jobs(name='archive_user_logs', limit=100)
+                if j['payload']['user_uuid'] == alice.user_uuid]  # 작업도 등록되지 않음
+    with app.app_context():
+        assert db.session.get(User, alice.id) is not None
+        assert [m.message_text for m in Message.query.all()] == ['hi bob']
+
+
+def test_delete_unknown_user(client, make_user, auth):
+    assert client.delete('/api/delete-user/999999', headers=auth(make_user(admin=True))).status_code == 404
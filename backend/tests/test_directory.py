@@ -0,0 +1,118 @@
+# tests/test_directory.py
+"""사용자 목록: 초성 / 아이디 접두어 검색, ?since 변경분, ETag 304"""
+import directory
+from db import db
+from models import DirectoryChange
+
+
+def _user(i, name, username):
+    return {'id': i, 'uuid': f'u{i}', 'name': name, 'username': username,
+            'position': None, 'department': '개발', 'is_admin': False}
+
+
+SNAP = directory.Snapshot(1, [
+    _user(1, '김철수', 'cskim'),
+    _user(2, '김창호', 'chkim'),
+    _user(3, '강철민', 'kang'),
+    _user(4, '박지민', 'jmpark'),
+    _user(5, 'Alice', 'alice01'),
+])
+
+
+def _names(query):
+    return [u['name'] for u in SNAP.search(query)]
+
+
+def test_search_by_chosung():
+    assert _names('ㄱㅊ') == ['강철민', '김창호', '김철수']
+    assert _names('ㄱㅊㅅ') == ['김철수']
+
+
+def test_search_mixed_syllable_and_chosung():
+    assert _names('김ㅊ') == ['김창호', '김철수']
+    assert _names('김철') == ['김철수']
+    assert _names('박ㅊ') == []
+
+
+def test_search_by_username_prefix():
+    assert _names('ch') == ['김창호']
+    assert _names('JMP') == ['박지민']
+    assert _names('al') == ['Alice']  # 이름 / 아이디 둘 다 맞아도 한 번만
+    assert _names('  ') == []
+
+
+def test_search_limit():
+    assert len(SNAP.search('ㄱ', limit=2)) == 2
+
+
+def _record(app, *uuids):
+    with app.app_context():
+        version = directory.record_changes(list(uuids))
+        db.session.commit()
+        return version
+
+
+def _snapshot(app):
+    with app.app_context():
+        return directory.snapshot()
+
+
+def test_changes_since_upsert_and_remove(app, client, make_user, auth):
+    admin, alice, bob = make_user(admin=True), make_user(name='alice'), make_user(name='bob')
+    since = _record(app, admin.user_uuid, alice.user_uuid, bob.user_uuid)
+
+    assert client.delete(f'/api/delete-user/{bob.id}', headers=auth(admin)).status_code == 200
+    _record(app, alice.user_uuid)
+    snap = _snapshot(app)
+    with app.app_context():
+        upsert, remove = directory.changes_since(snap, since)
+    assert [u['uuid'] for u in upsert] == [alice.user_uuid]
+    assert remove == [bob.user_uuid]
+
+    response = client.get(f'/api/users?since={since}', headers=auth(alice))
+    assert response.get_json() == {'version': snap.version, 'upsert': upsert, 'remove': remove}
+    assert client.get(f'/api/users?since={snap.version}', headers=auth(alice)).get_json()['upsert'] == []
+
+
+def test_changes_since_without_history_returns_full(app, client, make_user, auth):
+    alice = make_user(name='alice')
+    _record(app, alice.user_uuid, alice.user_uuid, alice.user_uuid)
+    with app.app_context():
+        DirectoryChange.query.filter(DirectoryChange.version <= 2).delete()  # HISTORY 를 넘겨 정리된 이력
+        db.session.commit()
+    snap = _snapshot(app)
+    with app.app_context():
+        assert directory.changes_since(snap, 1) is None
+        assert directory.changes_since(snap, 2) == ([snap.by_uuid[alice.user_uuid]], [])
+
+    body = client.get('/api/users?since=1', headers=auth(alice)).get_json()
+    assert body['full'] is True
+    assert [u['uuid'] for u in body['users']] == [alice.user_uuid]
+
+
+def test_changes_since_full_reload_marker(app, make_user):
+    alice = make_user()
+    _record(app, alice.user_uuid)
+    version = _record(app, None)  # 전체 변경
+    with app.app_context():
+        assert directory.changes_since(_snapshot(app), version - 2) is None
+
+
+def test_users_etag_not_modified(app, client, make_user, auth):
+    alice = make_user(name='alice')
+    _record(app, alice.user_uuid)
+    first = client.get('/api/users', headers=auth(alice))
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert etag == f'W/"{_snapshot(app).etag}"'
+
+    cached = client.get('/api/users', headers={**auth(alice), 'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.get_data() == b''
+    assert cached.headers['ETag'] == etag
+
+    _record(app, make_user(name='bob').user_uuid)  # 버전이 바뀌면 다시 전체
+    changed = client.get('/api/users', headers={**auth(alice), 'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert len(changed.get_json()) == 2
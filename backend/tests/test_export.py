@@ -0,0 +1,37 @@
+# tests/test_export.py
+"""대화 내보내기: 사용자 조건은 그 사용자의 메시지만, 없는 사용자는 404 (전체로 넓어지지 않음)"""
+import json
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def users(client, make_user, auth):
+    admin, alice, bob, carol = make_user(admin=True), make_user(), make_user(), make_user()
+    for sender, receiver in ((alice, bob), (bob, carol)):
+        assert client.post('/api/messages', json={'receiver_uuid': receiver.user_uuid, 'text': 'hi'},
+                           headers=auth(sender)).status_code == 201
+    return admin, alice, bob, carol
+
+
+def _export(client, auth, admin, **params):
+    return client.get('/api/admin/export', query_string=params, headers=auth(admin))
+
+
+def test_export_user_messages(client, auth, users):
+    admin, alice, bob, _ = users
+    response = _export(client, auth, admin, user_uuid=alice.user_uuid)
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [(r['sender_uuid'], r['receiver_uuid']) for r in rows] == [(alice.user_uuid, bob.user_uuid)]
+
+
+@pytest.mark.parametrize('target', ['user_uuid', 'other_uuid'])
+def test_export_unknown_user(client, auth, users, target):
+    admin, alice, _, _ = users
+    params = {'user_uuid': alice.user_uuid, 'other_uuid': str(uuid.uuid4())} if target == 'other_uuid' \
+        else {'user_uuid': str(uuid.uuid4())}
+    response = _export(client, auth, admin, **params)
+    assert response.status_code == 404
+    assert '존재하지 않는 사용자' in response.get_json()['error']
@@ -0,0 +1,49 @@
+# tests/test_jobs.py
+"""MemoryQueue: 우선순위 / 실행 예정 시각 / 동시 실행 제한(skip_names) 순서와 대량 대기열 처리"""
+import time
+from datetime import datetime, timedelta
+
+from jobs import MemoryQueue
+
+
+def _drain(queue, skip_names=()):
+    names = []
+    while (record := queue.claim('w', skip_names)) is not None:
+        names.append(record['payload']['n'])
+    return names
+
+
+def test_claim_order():
+    queue = MemoryQueue()
+    now = datetime.utcnow()
+    queue.add('low', {'n': 'low'}, 0, now - timedelta(seconds=2), 5)
+    queue.add('high', {'n': 'high-late'}, 10, now - timedelta(seconds=1), 5)
+    queue.add('high', {'n': 'high-early'}, 10, now - timedelta(seconds=1), 5)
+    queue.add('high', {'n': 'future'}, 10, now + timedelta(hours=1), 5)
+    queue.add('other', {'n': 'other'}, 0, now - timedelta(seconds=1), 5)
+
+    assert _drain(queue, skip_names=['high']) == ['low', 'other']
+    assert _drain(queue) == ['high-late', 'high-early']  # 같은 우선순위 / 시각은 등록 순서
+
+
+def test_retry_requeues_at_run_at():
+    queue = MemoryQueue()
+    job_id = queue.add('a', {'n': 'a'}, 0, datetime.utcnow(), 5)
+    assert queue.claim('w', ()) is not None
+    queue.finish(job_id, 'queued', 'boom', retry_at=datetime.utcnow() + timedelta(hours=1))
+    assert queue.claim('w', ()) is None
+    queue.finish(job_id, 'failed', 'boom')
+    assert queue.retry(job_id)
+    assert queue.claim('w', ())['attempts'] == 1
+
+
+def test_drain_is_not_quadratic():
+    queue = MemoryQueue(history=10)
+    now = datetime.utcnow()
+    for i in range(20000):
+        queue.add('bulk', {'n': i}, 0, now, 5)
+    queue.add('limited', {'n': 'limited'}, 5, now, 5)
+    started = time.perf_counter()
+    drained = _drain(queue, skip_names=['limited'])
+    assert drained == list(range(20000))
+    assert time.perf_counter() - started < 5
@@ -0,0 +1,41 @@
+# tests/test_metrics.py
+"""/metrics 접근 제한: METRICS_TOKEN (Bearer) 또는 METRICS_ALLOW_IPS"""
+import pytest
+
+OUTSIDE = {'REMOTE_ADDR': '10.1.2.3'}
+
+
+@pytest.fixture
+def metrics_config(app, monkeypatch):
+    def _config(token=None, allow=('127.0.0.1', '::1')):
+        monkeypatch.setitem(app.config, 'METRICS_TOKEN', token)
+        monkeypatch.setitem(app.config, 'METRICS_ALLOW_IPS', list(allow))
+    return _config
+
+
+def test_default_allows_loopback_only(client, metrics_config):
+    metrics_config()
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert b'# TYPE http_request' in response.data
+
+    assert client.get('/metrics', environ_base=OUTSIDE).status_code == 403
+
+
+def test_allowlist(client, metrics_config):
+    metrics_config(allow=['10.1.2.3'])
+    assert client.get('/metrics', environ_base=OUTSIDE).status_code == 200
+    assert client.get('/metrics').status_code == 403
+
+
+def test_bearer_token_required_when_configured(client, metrics_config):
+    metrics_config(token='s3cret')
+    response = client.get('/metrics')  # 토큰이 있으면 loopback 도 토큰 필요
+    assert response.status_code == 401
+    assert response.headers['WWW-Authenticate'].startswith('Bearer')
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Basic s3cret'}).status_code == 401
+
+    ok = client.get('/metrics', headers={'Authorization': 'Bearer s3cret'}, environ_base=OUTSIDE)
+    assert ok.status_code == 200
+    assert ok.content_type.startswith('text/plain; version=0.0.4')
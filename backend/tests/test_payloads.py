@@ -0,0 +1,132 @@
+# tests/test_payloads.py
+"""압축 전송 인코딩: frontend/src/compact.js 의 표 / 복원 규칙과 맞는지 (참조, 시각, delivery)"""
+import ast
+import os
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import payloads
+
+COMPACT_JS = os.path.join(os.path.dirname(__file__), '..', '..', 'frontend', 'src', 'compact.js')
+
+
+def _js_table(name):
+    """compact.js 의 `const NAME = { a: 1, b: 'x', ... };` → dict"""
+    with open(COMPACT_JS, encoding='utf-8') as f:
+        source = f.read()
+    body = re.search(rf'const {name} = \{{(.*?)\}};', source, re.S).group(1)
+    return dict(
+        (key, ast.literal_eval(value))
+        for key, value in re.findall(r"(\w+):\s*('[^']*'|\d+)", body)
+    )
+
+
+JS_EVENT_CODES = _js_table('EVENT_CODES')
+JS_KEYS = _js_table('KEYS')
+EVENT_NAMES = {code: name for name, code in JS_EVENT_CODES.items()}
+FULL_KEYS = {short: full for full, short in JS_KEYS.items()}
+
+
+def _naive_iso(ms):
+    """compact.js naiveIso: new Date(ms).toISOString().slice(0, -1)"""
+    value = datetime(1970, 1, 1) + timedelta(milliseconds=ms)
+    return value.isoformat(timespec='milliseconds')
+
+
+def _expand(value):
+    if isinstance(value, list):
+        return [_expand(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    out = {}
+    for key, v in value.items():
+        full = FULL_KEYS.get(key, key)
+        out[full] = _naive_iso(v) if full == 'timestamp' and isinstance(v, int) else _expand(v)
+    return out
+
+
+def _decode(entries):
+    """compact.js decodeEvents 와 같은 복원"""
+    events = []
+    for code, data, *rest in entries:
+        event = EVENT_NAMES.get(code, code)
+        if data is None and rest and isinstance(rest[0], int):
+            ref, keys = rest
+            source = events[ref][1]
+            events.append([event, {FULL_KEYS.get(k, k): source[FULL_KEYS.get(k, k)] for k in keys}])
+        elif event == 'delivery':
+            events.append([event, {'id': data['id'], 'events': _decode(data['e'])}])
+        else:
+            events.append([event, _expand(data)])
+    return events
+
+
+def test_tables_match_frontend():
+    assert JS_EVENT_CODES == payloads.EVENT_CODES
+    assert JS_KEYS == payloads.KEYS
+    assert len(set(payloads.KEYS.values())) == len(payloads.KEYS)  # 짧은 key 가 겹치면 복원 불가
+
+
+def test_contained_event_is_sent_as_reference():
+    chat = {'message_id': 7, 'sender_uuid': 's', 'room_uuid': 'g', 'text': 'hi',
+            'timestamp': '2024-05-01T09:30:00.123'}
+    group_message = {'room_uuid': 'g', 'message_id': 7, 'text': 'hi'}
+    entries = payloads.encode_events([('chat', chat), ('group_message', group_message)], {})
+
+    assert entries[1] == [payloads.EVENT_CODES['group_message'], None, 0, ['g', 'i', 't']]
+    assert _decode(entries) == [['chat', chat], ['group_message', group_message]]
+
+
+def test_not_contained_event_is_sent_in_full():
+    first = {'message_id': 1, 'text': 'a'}
+    second = {'message_id': 1, 'text': 'b'}  # 값이 다르면 참조하지 않음
+    entries = payloads.encode_events([('chat', first), ('chat', second)], {})
+    assert entries[1] == [1, {'i': 1, 't': 'b'}]
+
+
+@pytest.mark.parametrize('value,expected', [
+    (datetime(2024, 5, 1, 9, 30, 0, 123000), '2024-05-01T09:30:00.123'),
+    ('2024-05-01T09:30:00.123456', '2024-05-01T09:30:00.123'),  # 밀리초까지
+    ('2024-05-01T09:30:00', '2024-05-01T09:30:00.000'),
+])
+def test_naive_timestamp_round_trips_as_epoch_ms(value, expected):
+    entries = payloads.encode_events([('new_message', {'timestamp': value})], {})
+    encoded = entries[0][1]['ts']
+    assert isinstance(encoded, int)
+    assert encoded == int(datetime.fromisoformat(expected).replace(tzinfo=timezone.utc).timestamp() * 1000)
+    assert _decode(entries)[0][1]['timestamp'] == expected
+
+
+@pytest.mark.parametrize('value', [
+    '2024-05-01T09:30:00+09:00',  # 시간대가 붙은 값은 그대로
+    datetime(2024, 5, 1, tzinfo=timezone.utc).isoformat(),
+    '어제',
+    None,
+])
+def test_other_timestamps_are_left_alone(value):
+    entries = payloads.encode_events([('new_message', {'timestamp': value})], {})
+    assert entries[0][1] == {'ts': value}
+
+
+def test_nested_room_list_and_delivery():
+    update = {'upsert': [{'uuid': 'r1', 'name': '방', 'last_message': 'x', 'is_group': True, 'unread_count': 2,
+                          'timestamp': datetime(2024, 5, 1, 0, 0)}], 'remove': ['r2']}
+    chat = {'message_id': 3, 'text': 'hi'}
+    delivery = {'id': 'abc-1', 'events': [['chat', chat], ['new_message', {'message_id': 3}]]}
+    entries = payloads.encode_events([('room_list_update', update), ('delivery', delivery)], {})
+
+    assert entries[0][1]['up'][0] == {'u': 'r1', 'n': '방', 'lm': 'x', 'ig': True, 'uc': 2, 'ts': 1714521600000}
+    assert entries[1][1]['e'][1] == [payloads.EVENT_CODES['new_message'], None, 0, ['i']]
+    decoded = _decode(entries)
+    assert decoded[0][1]['upsert'][0]['timestamp'] == '2024-05-01T00:00:00.000'
+    assert decoded[1] == ['delivery', delivery]
+
+
+def test_same_data_is_encoded_once():
+    data = {'message_id': 1, 'text': 'a'}
+    memo = {}
+    first = payloads.encode_events([('chat', data)], memo)
+    second = payloads.encode_events([('chat', data)], memo)
+    assert first[0][1] is second[0][1]
@@ -0,0 +1,114 @@
+# tests/test_query_budget.py
+"""@query_budget 검사 (strict): N+1 이면 QueryBudgetExceeded, 선언된 예산마다 실제 요청이 예산 안인지"""
+import pytest
+
+import app as app_module
+from db import db
+from models import Message, PasswordResetRequest, User
+from query_budget import QueryBudgetExceeded, query_budget
+
+
+@query_budget(1)
+def _n_plus_one():
+    users = User.query.all()
+    return {u.user_uuid: Message.query.filter_by(sender_id=u.id).count() for u in users}
+
+
+# 요청을 받기 전에만 라우트를 추가할 수 있으므로 수집(import) 시점에 등록
+app_module.app.add_url_rule('/_test/n-plus-one', '_test_n_plus_one', _n_plus_one)
+
+
+@pytest.fixture(autouse=True)
+def _propagate(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'TESTING', True)  # after_request 의 예외를 500 대신 그대로
+
+
+def test_n_plus_one_raises(client, make_user):
+    for _ in range(6):
+        make_user()
+    with pytest.raises(QueryBudgetExceeded) as exc:
+        client.get('/_test/n-plus-one')
+    assert '쿼리 예산 초과' in str(exc.value)
+    assert 'N+1 의심' in str(exc.value)
+
+
+def test_not_strict_only_reports(app, client, make_user, monkeypatch):
+    monkeypatch.setitem(app.config, 'QUERY_BUDGET_STRICT', False)
+    for _ in range(6):
+        make_user()
+    response = client.get('/_test/n-plus-one')
+    assert response.status_code == 200
+    assert int(response.headers['X-Query-Count']) == 7
+
+
+@pytest.fixture
+def data(app, client, make_user, auth):
+    """선언된 예산 라우트를 호출할 수 있는 최소 데이터 (관리자, 1:1 대화, 그룹 방, 승인 대기, 재설정 요청)"""
+    admin = make_user(admin=True)
+    alice, bob = make_user(), make_user()
+    pending = make_user(approved=False)
+    for text in ('hi', 'yo'):
+        assert client.post('/api/messages', json={'receiver_uuid': bob.user_uuid, 'text': text},
+                           headers=auth(alice)).status_code == 201
+    room = client.post('/api/create-chat-room', json={'members': [admin.user_uuid, alice.user_uuid, bob.user_uuid],
+                                                      'name': 'g'}, headers=auth(alice)).get_json()['room_uuid']
+    for text in ('a', 'b', 'c'):
+        assert client.post('/api/messages', json={'room_uuid': room, 'text': text},
+                           headers=auth(alice)).status_code == 201
+    with app.app_context():
+        db.session.add(PasswordResetRequest(username=pending.username, employee_id=pending.employee_id,
+                                            department=pending.department, user_uuid=pending.user_uuid))
+        db.session.commit()
+    return {'admin': admin, 'alice': alice, 'bob': bob, 'room': room}
+
+
+# (endpoint, method, path, 요청하는 사용자)
+BUDGETED = [
+    ('user_bp.get_users', 'GET', '/api/users', 'alice'),
+    ('user_bp.search_users', 'GET', '/api/users/search?q=user', 'alice'),
+    ('user_bp.get_my_info', 'GET', '/api/users/me', 'alice'),
+    ('get_messages', 'GET', '/api/messages/{bob}', 'alice'),
+    ('get_pending_users', 'GET', '/api/pending-users', 'admin'),
+    ('admin_stats', 'GET', '/api/admin/stats', 'admin'),
+    ('get_group_chat', 'GET', '/api/chat-rooms/{room}', 'bob'),
+    ('mark_group_messages_read', 'POST', '/api/chat-rooms/{room}/mark-read', 'bob'),
+    ('get_password_reset_requests', 'GET', '/api/admin/password-reset-requests', 'admin'),
+    ('get_chat_rooms', 'GET', '/api/chat-rooms', 'bob'),  # room_cache 가 비어 있으므로 전체 계산 경로
+]
+
+
+def test_every_declared_budget_is_covered(app):
+    declared = {name for name, view in app.view_functions.items()
+                if getattr(view, 'query_budget', None) is not None and not name.startswith('_test')}
+    assert declared == {endpoint for endpoint, *_ in BUDGETED}
+
+
+@pytest.mark.parametrize('endpoint,method,path,who', BUDGETED, ids=[b[0] for b in BUDGETED])
+def test_route_within_budget(app, client, auth, data, endpoint, method, path, who):
+    path = path.format(bob=data['bob'].user_uuid, room=data['room'])
+    response = client.open(path, method=method, headers=auth(data[who]))
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert int(response.headers['X-Query-Count']) <= app.view_functions[endpoint].query_budget
+
+
+def test_chat_rooms_queries_do_not_grow_with_rooms(app, client, make_user, auth):
+    alice, bob, carol = make_user(name='alice'), make_user(name='bob'), make_user(name='carol')
+    rooms = []
+    for i in range(6):
+        room = client.post('/api/create-chat-room', json={'members': [alice.user_uuid, bob.user_uuid, carol.user_uuid],
+                                                          'name': f'g{i}' if i % 2 else ''},
+                           headers=auth(alice)).get_json()['room_uuid']
+        for _ in range(i + 1):
+            client.post('/api/messages', json={'room_uuid': room, 'text': f'm{i}'}, headers=auth(alice))
+        rooms.append(room)
+    client.post('/api/messages', json={'room_uuid': rooms[0], 'text': 'reply'}, headers=auth(bob))
+    assert client.post(f'/api/chat-rooms/{rooms[1]}/mark-read', headers=auth(bob)).status_code == 200
+
+    response = client.get('/api/chat-rooms', headers=auth(bob))
+    assert response.status_code == 200
+    assert int(response.headers['X-Query-Count']) <= app.view_functions['get_chat_rooms'].query_budget
+    listed = {r['uuid']: r for r in response.get_json()}
+    assert listed[rooms[0]]['last_message'] == 'reply'
+    assert listed[rooms[0]]['name'] == 'alice, carol'
+    assert listed[rooms[1]]['name'] == 'g1'
+    assert [listed[r]['unread_count'] for r in rooms] == [1, 0, 3, 4, 5, 6]
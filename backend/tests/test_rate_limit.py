@@ -0,0 +1,71 @@
+# tests/test_rate_limit.py
+"""토큰 버킷: 초당 rate 개씩 충전 (burst 상한), 제한되면 429 + Retry-After"""
+from types import SimpleNamespace
+
+import pytest
+
+import rate_limit
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(rate_limit, 'time', SimpleNamespace(monotonic=clock))  # 이 모듈의 시계만
+    return clock
+
+
+def test_take_refills_at_rate_up_to_burst(clock):
+    limiter = rate_limit.RateLimiter('t', rate=2, burst=3)
+    assert [limiter.take('k') for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.take('k') == pytest.approx(0.5)  # 토큰 1개까지 0.5초
+
+    clock.now += 0.25
+    assert limiter.take('k') == pytest.approx(0.25)
+    clock.now += 0.25
+    assert limiter.take('k') == 0.0
+
+    clock.now += 60  # 오래 쉬어도 burst 까지만
+    assert [limiter.take('k') for _ in range(4)][-1] == pytest.approx(0.5)
+
+
+def test_take_buckets_are_per_key(clock):
+    limiter = rate_limit.RateLimiter('t', rate=1, burst=1)
+    assert limiter.take('a') == 0.0
+    assert limiter.take('a') > 0
+    assert limiter.take('b') == 0.0
+    limiter.forget('a')
+    assert limiter.take('a') == 0.0
+
+
+def test_zero_rate_never_refills(clock):
+    limiter = rate_limit.RateLimiter('t', rate=0, burst=1)
+    assert limiter.take('k') == 0.0
+    clock.now += 3600
+    assert limiter.take('k') == float('inf')
+
+
+def test_route_returns_429_with_retry_after(client, make_user, monkeypatch, clock):
+    monkeypatch.setattr(rate_limit, '_enabled', True)
+    monkeypatch.setitem(rate_limit._limiters, 'api_auth', rate_limit.RateLimiter('api_auth', 0.2, 2))
+    make_user(name='alice', password='pw')
+
+    def login(username='alice'):
+        return client.post('/api/login', json={'username': username, 'password': 'wrong'})
+
+    assert [login().status_code for _ in range(2)] == [401, 401]
+    limited = login()
+    assert limited.status_code == 429
+    assert limited.headers['Retry-After'] == '5'  # 0.2/초 → 5초 (정수로 올림)
+    assert 'error' in limited.get_json()
+
+    assert login('bob').status_code != 429  # 같은 IP 라도 username 이 다르면 다른 버킷
+    clock.now += 5
+    assert login().status_code == 401
@@ -0,0 +1,52 @@
+# tests/test_room_cache.py
+"""채팅방 목록 캐시: 메시지 fan-out 작업이 읽음 표시보다 늦게 실행돼도 안 읽음 수가 맞는지"""
+from datetime import datetime, timedelta
+
+import pytest
+
+import room_cache
+import tasks
+from db import db
+from models import Message
+
+
+@pytest.fixture
+def room(client, make_user, auth):
+    alice, bob = make_user(), make_user()
+    room_uuid = client.post('/api/create-chat-room', json={'members': [alice.user_uuid, bob.user_uuid],
+                                                           'name': 'g'}, headers=auth(alice)).get_json()['room_uuid']
+    assert client.get('/api/chat-rooms', headers=auth(bob)).status_code == 200  # bob 목록 캐시 생성
+    return alice, bob, room_uuid
+
+
+def _message(sender, room_uuid, timestamp):
+    """fan-out 작업을 등록하지 않고 메시지만 저장 (작업은 테스트가 원하는 시점에 직접 실행)"""
+    msg = Message(sender_id=sender.id, sender_uuid=sender.user_uuid, room_uuid=room_uuid,
+                  message_text='hi', timestamp=timestamp)
+    db.session.add(msg)
+    db.session.commit()
+    return msg.id
+
+
+def _unread(user, room_uuid):
+    return room_cache._backend.get(user.user_uuid)[room_uuid]['unread_count']
+
+
+def test_read_before_fanout_is_not_lost(app, client, auth, room):
+    alice, bob, room_uuid = room
+    with app.app_context():
+        message_id = _message(alice, room_uuid, datetime.utcnow())
+    assert client.post(f'/api/chat-rooms/{room_uuid}/mark-read', headers=auth(bob)).status_code == 200
+
+    with app.app_context():
+        tasks.message_fanout(message_id, notify=False)
+    assert _unread(bob, room_uuid) == 0
+
+
+def test_message_after_read_counts(app, client, auth, room):
+    alice, bob, room_uuid = room
+    assert client.post(f'/api/chat-rooms/{room_uuid}/mark-read', headers=auth(bob)).status_code == 200
+    with app.app_context():
+        message_id = _message(alice, room_uuid, datetime.utcnow() + timedelta(seconds=1))
+        tasks.message_fanout(message_id, notify=False)
+    assert _unread(bob, room_uuid) == 1
@@ -0,0 +1,75 @@
+# tests/test_socket_auth.py
+"""소켓 인증 제한: 재연결해도 유지되는 key (접속 IP + 사용자), handshake 인증도 제한"""
+import pytest
+from flask_jwt_extended import create_access_token
+
+import app as app_module
+import rate_limit
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    """요청 제한 켜기 (충전 없이 burst 만큼만 허용)"""
+    def _limits(auth=2, auth_ip=100):
+        monkeypatch.setattr(rate_limit, '_enabled', True)
+        monkeypatch.setitem(rate_limit._limiters, 'socket_auth', rate_limit.RateLimiter('socket_auth', 0.001, auth))
+        monkeypatch.setitem(rate_limit._limiters, 'socket_auth_ip',
+                            rate_limit.RateLimiter('socket_auth_ip', 0.001, auth_ip))
+    return _limits
+
+
+def _token(app, user):
+    with app.app_context():
+        return create_access_token(identity=user.user_uuid)
+
+
+def _connect(app, token):
+    return app_module.socketio.test_client(app, auth={'token': token})
+
+
+def test_handshake_auth_is_throttled_across_reconnects(app, make_user, limits):
+    limits(auth=2)
+    token = _token(app, make_user())
+
+    for _ in range(2):  # 연결 → 해제를 반복해도 버킷이 새로 생기지 않음
+        client = _connect(app, token)
+        assert client.is_connected()
+        client.disconnect()
+
+    client = _connect(app, token)
+    assert not client.is_connected()  # 제한되면 연결 거절
+
+
+def test_handshake_ip_limit_counts_invalid_tokens(app, make_user, limits):
+    limits(auth_ip=2)
+    for _ in range(2):
+        assert not _connect(app, 'not-a-token').is_connected()
+
+    client = _connect(app, _token(app, make_user()))  # 같은 IP 의 유효한 토큰도 제한
+    assert not client.is_connected()
+
+
+def test_authenticate_event_reports_rate_limit(app, make_user, limits):
+    limits(auth=1)
+    token = _token(app, make_user())
+    client = app_module.socketio.test_client(app)
+
+    client.emit('authenticate', {'token': token})
+    client.get_received()
+    client.emit('authenticate', {'token': token})
+    events = [e for e in client.get_received() if e['name'] == 'rate_limited']
+    assert events and events[0]['args'][0]['event'] == 'authenticate'
+    client.disconnect()
+
+
+def test_authenticate_limit_survives_reconnect(app, make_user, limits):
+    limits(auth=1)
+    token = _token(app, make_user())
+    client = app_module.socketio.test_client(app)
+    client.emit('authenticate', {'token': token})
+    client.disconnect()
+
+    client = app_module.socketio.test_client(app)  # 새 sid 로 재연결해도 같은 사용자 버킷
+    client.emit('authenticate', {'token': token})
+    assert any(e['name'] == 'rate_limited' for e in client.get_received())
+    client.disconnect()
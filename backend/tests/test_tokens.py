@@ -0,0 +1,56 @@
+# tests/test_tokens.py
+"""토큰 폐기: 'ver' claim 으로 비교하므로 비밀번호 변경과 같은 초에 발급된 토큰도 폐기"""
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import decode_token
+
+import tokens
+from db import db
+from models import User
+
+
+def _me(client, headers):
+    return client.get('/api/users/me', headers=headers).status_code
+
+
+def test_password_change_revokes_same_second_token(app, client, make_user, auth):
+    user = make_user(password='old')
+    old = auth(user)
+    assert _me(client, old) == 200  # 검증 결과 캐시에도 들어감
+
+    response = client.put('/api/users/me/password', json={'current_password': 'old', 'new_password': 'new'},
+                          headers=auth(user))  # 같은 초에 발급된 토큰으로 변경
+    assert response.status_code == 200
+    new = {'Authorization': f"Bearer {response.get_json()['token']}"}
+
+    assert _me(client, old) == 401
+    assert _me(client, new) == 200
+    with app.app_context():
+        assert decode_token(response.get_json()['token'])[tokens.VERSION_CLAIM] == 1
+
+
+def test_revocation_from_other_process(app, client, make_user, auth):
+    user = make_user()
+    old = auth(user)
+    assert _me(client, old) == 200
+
+    with app.app_context():  # 다른 프로세스가 폐기한 것처럼 DB 만 변경
+        tokens.mark_revoked(db.session.get(User, user.id))
+        db.session.commit()
+    assert _me(client, old) == 200  # 아직 다시 읽기 전
+
+    with app.app_context():
+        tokens.load_revocations(timedelta(hours=1))
+
+    assert _me(client, old) == 401
+    assert _me(client, auth(user)) == 200
+
+
+def test_old_revocations_are_dropped(app, make_user):
+    user = make_user()
+    with app.app_context():
+        db.session.query(User).filter_by(id=user.id).update(
+            {'token_version': 3, 'tokens_valid_after': datetime.utcnow() - timedelta(hours=2)})
+        db.session.commit()
+        assert tokens.load_revocations(timedelta(hours=1)) == 0
+    assert user.user_uuid not in tokens._versions
@@ -0,0 +1,201 @@
+# tokens.py
+"""JWT 검증 캐시 + 토큰 폐기 (비밀번호 변경 / 재설정)
+
+검증 캐시
+- 소켓 연결마다 decode_token, REST 요청마다 @jwt_required() 가 서명을 다시 검증하지 않도록
+  검증에 성공한 토큰의 claims 를 LRU 로 보관 (key: 토큰 sha256, 최대 JWT_CACHE_SIZE 개, 0 = 사용 안 함)
+- 만료(exp)가 지난 항목은 버리고 원래 검증으로 → 만료 오류 응답은 기존과 같음
+- 검증에 실패한 토큰은 보관하지 않음
+- flask_jwt_extended 의 토큰 해석 경로(JWTManager._decode_jwt_from_config) 하나에 걸어서
+  decode_token / @jwt_required() 모두 캐시를 거친다 (CachingJWTManager)
+
+토큰 폐기
+- 토큰마다 발급 시점의 users.token_version 을 'ver' claim 으로 (additional_claims_loader, 발급 시 DB 조회)
+- 비밀번호를 바꾸면 token_version 을 1 올림 → 'ver' 가 더 작은 토큰은 RevokedTokenError (401)
+  (iat 는 초 단위라 같은 초에 발급된 토큰을 구분하지 못하므로 시각이 아니라 버전으로 비교)
+- 요청마다 DB 를 읽지 않도록 토큰 수명(JWT_ACCESS_TOKEN_EXPIRES) 안에 폐기된(users.tokens_valid_after) 사용자의
+  버전만 메모리에 보관
+  (시작 시 + JWT_REVOCATION_REFRESH 초마다 DB 에서 다시 읽음 → 다른 프로세스의 폐기도 반영)
+- 폐기한 프로세스에서는 바로: 캐시 항목 제거 + 그 사용자의 소켓 연결 종료
+
+    mark_revoked(user)      # 비밀번호 변경과 같은 트랜잭션에서
+    db.session.commit()
+    revoke(user)            # commit 이후
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import jwt
+from flask_jwt_extended import JWTManager
+from flask_jwt_extended.exceptions import RevokedTokenError
+
+from db import db
+from metrics import JWT_CACHE, registry
+from models import User
+
+logger = logging.getLogger(__name__)
+
+_max_size = 10000
+_leeway = 0
+_cache = OrderedDict()   # sha256(token) -> (claims, header)
+_versions = {}           # user_uuid -> token_version (이보다 작은 'ver' 의 토큰은 폐기)
+_local = {}              # user_uuid -> (token_version, monotonic) 이 프로세스에서 폐기한 것 (DB 다시 읽을 때 유지)
+_lock = threading.Lock()
+_socketio = None
+_connections = None
+
+
+def _key(encoded_token):
+    if isinstance(encoded_token, str):
+        encoded_token = encoded_token.encode()
+    return hashlib.sha256(encoded_token).digest()
+
+
+VERSION_CLAIM = 'ver'
+
+
+def is_revoked(claims):
+    version = _versions.get(claims.get('sub'))
+    return version is not None and claims.get(VERSION_CLAIM, 0) < version
+
+
+def version_claims(identity):
+    """발급하는 토큰에 사용자의 현재 token_version (메모리 목록은 다른 프로세스의 폐기가 늦게 반영되므로 DB 에서)"""
+    version = db.session.query(User.token_version).filter(User.user_uuid == identity).scalar()
+    return {VERSION_CLAIM: version or 0}
+
+
+class CachingJWTManager(JWTManager):
+    """서명 검증 결과를 캐시하고 폐기된 토큰을 거절하는 JWTManager"""
+
+    def __init__(self, app=None, add_context_processor=False):
+        super().__init__(app, add_context_processor)
+        self.additional_claims_loader(version_claims)
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        if csrf_value is not None or allow_expired or not _max_size:
+            return self._verify(encoded_token, csrf_value, allow_expired)
+
+        key = _key(encoded_token)
+        with _lock:
+            cached = _cache.get(key)
+            if cached is not None:
+                _cache.move_to_end(key)
+        if cached is not None:
+            claims, header = cached
+            if claims.get('exp') is None or time.time() < claims['exp'] + _leeway:
+                if is_revoked(claims):
+                    self._drop(key)
+                    JWT_CACHE.inc(result='revoked')
+                    raise RevokedTokenError(header, claims)
+                JWT_CACHE.inc(result='hit')
+                return dict(claims)
+            self._drop(key)
+            JWT_CACHE.inc(result='expired')  # 아래 검증에서 만료 오류
+
+        claims = self._verify(encoded_token, csrf_value, allow_expired)
+        JWT_CACHE.inc(result='miss')
+        with _lock:
+            _cache[key] = (claims, self._header(encoded_token))
+            while len(_cache) > _max_size:
+                _cache.popitem(last=False)
+        return dict(claims)
+
+    def _verify(self, encoded_token, csrf_value, allow_expired):
+        claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        if is_revoked(claims):
+            JWT_CACHE.inc(result='revoked')
+            raise RevokedTokenError(self._header(encoded_token), claims)
+        return claims
+
+    @staticmethod
+    def _header(encoded_token):
+        return jwt.get_unverified_header(encoded_token)
+
+    @staticmethod
+    def _drop(key):
+        with _lock:
+            _cache.pop(key, None)
+
+
+# ---------------------------------------------------------------------------
+# 폐기
+# ---------------------------------------------------------------------------
+
+def mark_revoked(user):
+    """지금까지 발급된 user 의 토큰 폐기 표시 (commit 은 호출한 쪽, 이후 revoke(user))"""
+    user.token_version = User.token_version + 1  # 동시에 폐기해도 한 번씩 증가 (commit 후 다시 읽힘)
+    user.tokens_valid_after = datetime.utcnow()
+
+
+def revoke(user):
+    """commit 된 폐기를 이 프로세스에 바로 반영 - 캐시 항목 제거 + 소켓 연결 종료"""
+    user_uuid = user.user_uuid
+    _versions[user_uuid] = max(user.token_version, _versions.get(user_uuid, 0))
+    _local[user_uuid] = (_versions[user_uuid], time.monotonic())
+    with _lock:
+        for key in [k for k, (claims, _) in _cache.items() if claims.get('sub') == user_uuid]:
+            del _cache[key]
+    if _connections is not None:
+        for sid in _connections.sids(user_uuid):
+            try:
+                _socketio.server.disconnect(sid, namespace='/')
+            except Exception:
+                logger.exception("❌ 폐기된 토큰의 소켓 연결 종료 실패", extra={'user_uuid': user_uuid})
+    logger.info("🔒 토큰 폐기", extra={'user_uuid': user_uuid})
+
+
+def load_revocations(lifetime):
+    """토큰 수명 안에 폐기된 사용자 목록을 DB 에서 다시 읽음 (수명이 지난 항목은 제거)"""
+    since = datetime.utcnow() - lifetime
+    fresh = dict(db.session.query(User.user_uuid, User.token_version).filter(
+        User.tokens_valid_after.isnot(None), User.tokens_valid_after >= since,
+    ).all())
+    # 읽는 동안 이 프로세스에서 폐기한 사용자는 유지 (수명이 지난 폐기는 그 전 토큰도 만료되었으므로 제거)
+    cutoff = time.monotonic() - lifetime.total_seconds()
+    for user_uuid, (version, revoked_at) in list(_local.items()):
+        if revoked_at < cutoff:
+            _local.pop(user_uuid, None)
+        elif version > fresh.get(user_uuid, 0):
+            fresh[user_uuid] = version
+    _versions.clear()
+    _versions.update(fresh)
+    return len(fresh)
+
+
+def init_tokens(app, socketio, connections):
+    """JWT_CACHE_SIZE / JWT_REVOCATION_REFRESH 설정 + 폐기 목록 읽기 (app context 안에서 호출)"""
+    global _max_size, _leeway, _socketio, _connections
+    _max_size = max(0, app.config.get('JWT_CACHE_SIZE', 10000))
+    _leeway = app.config.get('JWT_DECODE_LEEWAY', 0)
+    _socketio = socketio
+    _connections = connections
+    registry.gauge('jwt_cache_size', '검증 결과를 보관 중인 JWT 수', func=lambda: len(_cache))
+
+    lifetime = app.config.get('JWT_ACCESS_TOKEN_EXPIRES') or timedelta(minutes=15)
+    try:
+        load_revocations(lifetime)
+    except Exception:
+        logger.exception("❌ 토큰 폐기 목록 읽기 실패 (migration 확인: users.token_version)")
+        db.session.rollback()
+    interval = app.config.get('JWT_REVOCATION_REFRESH', 30)
+    if not interval:
+        return None
+
+    def _loop():
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                try:
+                    load_revocations(lifetime)
+                except Exception:
+                    logger.exception("❌ 토큰 폐기 목록 갱신 실패")
+                    db.session.rollback()
+
+    thread = threading.Thread(target=_loop, name='jwt-revocations', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,270 @@
+# tombstones.py
+"""메시지 / 채팅방 soft delete + 백그라운드 정리(purge)
+
+요청 처리 중에는 삭제 시각만 기록하고 (읽기 쿼리에서 바로 제외), 실제 행 / 첨부파일 삭제와
+채팅 로그 백업은 purger 가 작은 배치 단위로 나눠서 처리한다.
+
+    Message.deleted_at            개별 메시지 삭제
+    ChatRoom.deleted_at           그룹 채팅방 삭제 (메시지 / 멤버 / 읽음 상태는 purge 때 정리)
+    DirectConversation.cleared_at 1:1 대화 삭제 - 이 시각까지의 메시지 숨김
+
+환경 변수
+    PURGE_ENABLED=1         백그라운드 purger 실행 여부
+    PURGE_INTERVAL=60       정리 주기(초)
+    PURGE_BATCH_SIZE=200    배치당 최대 메시지 수
+    PURGE_BATCH_PAUSE=0.5   배치 사이 대기(초) - 잠금 / 디스크 I/O 분산
+    PURGE_HOURS=0-24        정리 허용 시간대 (예: 20-7 → 업무 시간 제외, 자정 넘김 허용)
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+import click
+from flask.cli import with_appcontext
+from db import db
+from models import ChatRoom, ChatRoomMember, DirectConversation, GroupChatReadStatus, Message, MessageRead, User
+from conversations import refresh_last_message
+from storage import get_storage
+from attachments import release
+import fanout
+
+logger = logging.getLogger(__name__)
+
+CHAT_LOG_DIR = 'chat_logs'
+
+
+# ---------------------------------------------------------------------------
+# 읽기 경로: 삭제 표시된 데이터 숨김
+# ---------------------------------------------------------------------------
+
+def visible_messages():
+    """soft delete 되지 않은 메시지 필터"""
+    return Message.deleted_at.is_(None)
+
+
+def is_message_visible(message):
+    """메시지 자체 / 소속 그룹방 / 1:1 대화 삭제 여부 확인"""
+    if message.deleted_at is not None:
+        return False
+    if message.room_uuid:
+        room = ChatRoom.query.filter_by(room_uuid=message.room_uuid).first()
+        return room is not None and room.deleted_at is None
+    if message.conversation_id:
+        conversation = DirectConversation.query.get(message.conversation_id)
+        if conversation and conversation.cleared_at and message.timestamp <= conversation.cleared_at:
+            return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# 쓰기 경로: 삭제 표시 (호출한 쪽에서 commit)
+# ---------------------------------------------------------------------------
+
+def tombstone_message(message):
+    message.deleted_at = datetime.utcnow()
+    # 1:1 대화의 마지막 메시지였다면 목록용 정보 갱신
+    if message.conversation_id:
+        conversation = DirectConversation.query.get(message.conversation_id)
+        if conversation and conversation.last_message_id == message.id:
+            refresh_last_message(conversation, exclude_id=message.id)
+
+
+def tombstone_room(room):
+    room.deleted_at = datetime.utcnow()
+
+
+def clear_direct_conversation(conversation):
+    """1:1 대화 삭제 - 지금까지의 메시지는 숨기고, 행은 유지 (다음 메시지 전송 시 재사용)"""
+    conversation.cleared_at = datetime.utcnow()
+    conversation.last_message_id = None
+    conversation.last_message_at = None
+
+
+def emit_sync(user_uuids, event, payload):
+    """접속 중인 대상 사용자에게 삭제 동기화 이벤트 전송"""
+    from sockets import connections
+
+    fanout.deliver('sync', set(user_uuids), connections, lambda _: [(event, payload)])
+
+
+# ---------------------------------------------------------------------------
+# purge: 실제 삭제 (배치 단위 commit)
+# ---------------------------------------------------------------------------
+
+def _append_log(filename, lines):
+    os.makedirs(CHAT_LOG_DIR, exist_ok=True)
+    with open(os.path.join(CHAT_LOG_DIR, filename), 'a', encoding='utf-8') as f:
+        for line in lines:
+            f.write(line + "\n")
+
+
+def _delete_messages(messages):
+    """행 삭제 commit 후 첨부파일 삭제 (commit 실패 시 파일이 먼저 사라지지 않도록)"""
+    ids = [m.id for m in messages]
+    file_paths = [m.file_path for m in messages if m.file_path]
+
+    release(messages)
+    MessageRead.query.filter(MessageRead.message_id.in_(ids)).delete(synchronize_session=False)
+    Message.query.filter(Message.id.in_(ids)).delete(synchronize_session=False)
+    db.session.commit()
+
+    storage = get_storage()
+    for key in file_paths:
+        try:
+            storage.delete(key)
+        except Exception as e:
+            logger.warning("⚠️ 첨부파일 삭제 실패", extra={'path': key, 'error': str(e)})
+    return len(ids)
+
+
+def _purge_deleted_messages(batch_size):
+    messages = (
+        Message.query.filter(Message.deleted_at.isnot(None))
+        .order_by(Message.id).limit(batch_size).all()
+    )
+    return _delete_messages(messages) if messages else 0
+
+
+def _purge_cleared_conversation(conversation, batch_size):
+    """대화 삭제 시각 이전 메시지를 로그로 백업 후 삭제 → 다 지우면 cleared_at 해제
+
+    반환: (삭제한 메시지 수, 완료 여부)
+    """
+    messages = (
+        Message.query.filter(Message.conversation_id == conversation.id,
+                             Message.timestamp <= conversation.cleared_at)
+        .order_by(Message.timestamp, Message.id).limit(batch_size).all()
+    )
+    if messages:
+        names = dict(
+            db.session.query(User.user_uuid, User.name)
+            .filter(User.user_uuid.in_([conversation.user_low_uuid, conversation.user_high_uuid]))
+            .all()
+        )
+        low = names.get(conversation.user_low_uuid, conversation.user_low_uuid)
+        high = names.get(conversation.user_high_uuid, conversation.user_high_uuid)
+        _append_log(f"{low}-{high}_chat.txt", [
+            f"[{m.timestamp}] {names.get(m.sender_uuid, m.sender_uuid)}: {m.message_text}" for m in messages
+        ])
+        count = _delete_messages(messages)
+    else:
+        count = 0
+
+    if count < batch_size:
+        # 정리 중에 다시 삭제된 경우(cleared_at 변경)는 다음 주기에 이어서 처리
+        DirectConversation.query.filter_by(id=conversation.id, cleared_at=conversation.cleared_at) \
+            .update({'cleared_at': None}, synchronize_session=False)
+        db.session.commit()
+        return count, True
+    return count, False
+
+
+def _purge_deleted_room(room, batch_size):
+    """방 메시지를 로그로 백업 후 삭제 → 다 지우면 읽음 상태 / 멤버 / 방 삭제
+
+    반환: (삭제한 메시지 수, 완료 여부)
+    """
+    messages = (
+        Message.query.filter(Message.room_uuid == room.room_uuid)
+        .order_by(Message.timestamp, Message.id).limit(batch_size).all()
+    )
+    count = 0
+    if messages:
+        _append_log(f"group_{room.room_uuid}_chat.txt", [
+            f"[{m.timestamp}] {m.sender_uuid}: {m.message_text}" for m in messages
+        ])
+        count = _delete_messages(messages)
+
+    if count < batch_size:
+        room_uuid = room.room_uuid
+        GroupChatReadStatus.query.filter_by(room_uuid=room_uuid).delete()
+        ChatRoomMember.query.filter_by(room_uuid=room_uuid).delete()
+        db.session.delete(room)
+        db.session.commit()
+        logger.info("🧹 삭제된 그룹 채팅방 정리 완료", extra={'room_uuid': room_uuid})
+        return count, True
+    return count, False
+
+
+def purge(batch_size=200, pause=0.5, should_continue=lambda: True):
+    """삭제 표시된 데이터를 모두 정리 (배치마다 commit 후 pause 초 대기) → 삭제한 메시지 수"""
+    total = 0
+
+    def _step(count):
+        nonlocal total
+        total += count
+        if pause and count:
+            time.sleep(pause)
+
+    while should_continue():
+        count = _purge_deleted_messages(batch_size)
+        _step(count)
+        if count < batch_size:
+            break
+
+    for purge_one, pending in (
+        (_purge_cleared_conversation, DirectConversation.query.filter(DirectConversation.cleared_at.isnot(None))),
+        (_purge_deleted_room, ChatRoom.query.filter(ChatRoom.deleted_at.isnot(None))),
+    ):
+        for target in pending.all():
+            done = False
+            while not done and should_continue():
+                count, done = purge_one(target, batch_size)
+                _step(count)
+
+    if total:
+        logger.info("🧹 soft delete 정리", extra={'messages': total})
+    return total
+
+
+def _parse_hours(text):
+    start, end = (int(h) for h in text.split('-', 1))
+    return start, end
+
+
+def in_purge_window(hours, now=None):
+    """PURGE_HOURS 시간대 안인지 (20-7 처럼 자정을 넘기는 구간 지원)"""
+    start, end = hours
+    hour = (now or datetime.now()).hour
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+def init_purger(app):
+    """백그라운드 purger 시작 (PURGE_ENABLED)"""
+    if not app.config.get('PURGE_ENABLED'):
+        return None
+
+    interval = app.config.get('PURGE_INTERVAL', 60)
+    batch_size = app.config.get('PURGE_BATCH_SIZE', 200)
+    pause = app.config.get('PURGE_BATCH_PAUSE', 0.5)
+    hours = _parse_hours(app.config.get('PURGE_HOURS', '0-24'))
+
+    def _loop():
+        while True:
+            time.sleep(interval)
+            if not in_purge_window(hours):
+                continue
+            with app.app_context():
+                try:
+                    purge(batch_size, pause, should_continue=lambda: in_purge_window(hours))
+                except Exception:
+                    logger.exception("❌ soft delete 정리 실패")
+                    db.session.rollback()
+
+    thread = threading.Thread(target=_loop, name='tombstone-purger', daemon=True)
+    thread.start()
+    return thread
+
+
+@click.command('purge-deleted')
+@click.option('--batch-size', default=200, show_default=True, help='배치당 최대 메시지 수')
+@click.option('--pause', default=0.0, show_default=True, help='배치 사이 대기(초)')
+@with_appcontext
+def purge_command(batch_size, pause):
+    """삭제 표시된 메시지 / 채팅방을 지금 정리"""
+    count = purge(batch_size, pause)
+    click.echo(f"✅ 메시지 {count}건 정리")
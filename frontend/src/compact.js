@@ -0,0 +1,143 @@
+// 소켓 압축 전송 디코더 (backend/payloads.py 와 짝)
+// authenticate 에 COMPACT_HANDSHAKE 를 보내면 서버가 이벤트를 짧은 시간 모아 'frame' 하나(MessagePack)로 보낸다.
+// frame = [[code, data], [code, null, ref, keys], ...] → [[event, data], ...] 로 복원
+// EVENT_CODES / KEYS 는 payloads.py 의 표와 같아야 한다 (바꾸면 서버와 함께 PROTOCOL_VERSION 증가)
+
+export const PROTOCOL_VERSION = 1;
+export const COMPACT_HANDSHAKE = { encoding: 'msgpack', encoding_version: PROTOCOL_VERSION };
+
+const EVENT_CODES = {
+  chat: 1, new_message: 2, group_message: 3, delivery: 4, room_list_update: 5,
+  user_list: 6, resync: 7, rate_limited: 8, message_deleted: 9, room_deleted: 10,
+};
+const KEYS = {
+  message_id: 'i', sender_uuid: 's', receiver_uuid: 'r', room_uuid: 'g', text: 't',
+  message: 'm', timestamp: 'ts', file_name: 'fn', file_type: 'ft',
+  uuid: 'u', name: 'n', department: 'd', last_message: 'lm', is_group: 'ig',
+  unread_count: 'uc', upsert: 'up', remove: 'rm', refresh: 'rf', dropped: 'dr',
+  event: 'ev', retry_after: 'ra',
+};
+
+const EVENT_NAMES = Object.fromEntries(Object.entries(EVENT_CODES).map(([name, code]) => [code, name]));
+const FULL_KEYS = Object.fromEntries(Object.entries(KEYS).map(([full, short]) => [short, full]));
+
+// ---------------------------------------------------------------------------
+// MessagePack (서버 → 클라이언트 방향만 쓰므로 디코딩만)
+// ---------------------------------------------------------------------------
+
+const textDecoder = new TextDecoder();
+
+export function unpack(buffer) {
+  const bytes = buffer instanceof Uint8Array ? buffer : new Uint8Array(buffer);
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  let pos = 0;
+
+  const str = (n) => {
+    const value = textDecoder.decode(bytes.subarray(pos, pos + n));
+    pos += n;
+    return value;
+  };
+  const bin = (n) => {
+    const value = bytes.slice(pos, pos + n);
+    pos += n;
+    return value;
+  };
+  const array = (n) => {
+    const value = new Array(n);
+    for (let i = 0; i < n; i++) value[i] = read();
+    return value;
+  };
+  const map = (n) => {
+    const value = {};
+    for (let i = 0; i < n; i++) {
+      const key = read();
+      value[key] = read();
+    }
+    return value;
+  };
+  const u8 = () => view.getUint8(pos++);
+  const u16 = () => { const v = view.getUint16(pos); pos += 2; return v; };
+  const u32 = () => { const v = view.getUint32(pos); pos += 4; return v; };
+
+  function read() {
+    const type = u8();
+    if (type <= 0x7f) return type;
+    if (type <= 0x8f) return map(type & 0x0f);
+    if (type <= 0x9f) return array(type & 0x0f);
+    if (type <= 0xbf) return str(type & 0x1f);
+    if (type >= 0xe0) return type - 0x100;
+    let value;
+    switch (type) {
+      case 0xc0: return null;
+      case 0xc2: return false;
+      case 0xc3: return true;
+      case 0xc4: return bin(u8());
+      case 0xc5: return bin(u16());
+      case 0xc6: return bin(u32());
+      case 0xca: value = view.getFloat32(pos); pos += 4; return value;
+      case 0xcb: value = view.getFloat64(pos); pos += 8; return value;
+      case 0xcc: return u8();
+      case 0xcd: return u16();
+      case 0xce: return u32();
+      case 0xcf: value = Number(view.getBigUint64(pos)); pos += 8; return value;
+      case 0xd0: value = view.getInt8(pos); pos += 1; return value;
+      case 0xd1: value = view.getInt16(pos); pos += 2; return value;
+      case 0xd2: value = view.getInt32(pos); pos += 4; return value;
+      case 0xd3: value = Number(view.getBigInt64(pos)); pos += 8; return value;
+      case 0xd9: return str(u8());
+      case 0xda: return str(u16());
+      case 0xdb: return str(u32());
+      case 0xdc: return array(u16());
+      case 0xdd: return array(u32());
+      case 0xde: return map(u16());
+      case 0xdf: return map(u32());
+      default: throw new Error(`지원하지 않는 MessagePack 형식: 0x${type.toString(16)}`);
+    }
+  }
+
+  return read();
+}
+
+// ---------------------------------------------------------------------------
+// 짧은 key / 이벤트 번호 / 시각 복원
+// ---------------------------------------------------------------------------
+
+// 서버가 epoch 밀리초로 바꾼 UTC naive 시각 → JSON 으로 받을 때와 같은 naive ISO 문자열
+const naiveIso = (ms) => new Date(ms).toISOString().slice(0, -1);
+
+function expand(value) {
+  if (Array.isArray(value)) return value.map(expand);
+  if (value === null || typeof value !== 'object' || value instanceof Uint8Array) return value;
+  const out = {};
+  Object.entries(value).forEach(([key, v]) => {
+    const full = FULL_KEYS[key] || key;
+    out[full] = full === 'timestamp' && typeof v === 'number' ? naiveIso(v) : expand(v);
+  });
+  return out;
+}
+
+export function decodeEvents(entries) {
+  const events = [];
+  entries.forEach(([code, data, ref, keys]) => {
+    const event = EVENT_NAMES[code] || code;
+    if (data === null && typeof ref === 'number') {
+      // 앞 이벤트 데이터에 모두 들어 있는 데이터 → 그 중 keys 만
+      const source = events[ref][1];
+      const picked = {};
+      keys.forEach((key) => {
+        const full = FULL_KEYS[key] || key;
+        picked[full] = source[full];
+      });
+      events.push([event, picked]);
+    } else if (event === 'delivery') {
+      events.push([event, { id: data.id, events: decodeEvents(data.e) }]);
+    } else {
+      events.push([event, expand(data)]);
+    }
+  });
+  return events;
+}
+
+export function decodeFrame(buffer) {
+  return decodeEvents(unpack(buffer));
+}
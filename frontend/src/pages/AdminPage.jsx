@@ -11,8 +11,16 @@ function AdminPage() {
   const [pendingUsers, setPendingUsers] = useState([]);
   const [approvedUsers, setApprovedUsers] = useState([]);
   const [passwordResetRequests, setPasswordResetRequests] = useState([]);
+  // 대기열은 페이지 단위로 조회 (next_cursor 가 있으면 더 불러오기)
+  const [pendingCursor, setPendingCursor] = useState(null);
+  const [pendingTotal, setPendingTotal] = useState(0);
+  const [resetCursor, setResetCursor] = useState(null);
+  const [resetTotal, setResetTotal] = useState(0);
+  const [selectedPending, setSelectedPending] = useState(new Set());
+  const [selectedResets, setSelectedResets] = useState(new Set());
   const [loading, setLoading] = useState(false);
   const [showAllUsers, setShowAllUsers] = useState(false); // 더보기 상태
+  const [stats, setStats] = useState(null); // 최근 30일 메시지 통계
 
   const navigate = useNavigate();
 
@@ -57,7 +65,7 @@ function AdminPage() {
 
       console.log('✅ 관리자 권한 확인됨');
 
-      await Promise.all([loadPendingUsers(), loadApprovedUsers(), loadPasswordResetRequests()]);
+      await Promise.all([loadPendingUsers(), loadApprovedUsers(), loadPasswordResetRequests(), loadStats()]);
 
     } catch (err) {
       console.error('❌ 관리자 확인 또는 유저 불러오기 실패:', err.response || err.message);
@@ -70,12 +78,17 @@ function AdminPage() {
     initialize();
   }, [initialize]); // initialize를 의존성 배열에 추가하여 경고를 해결
 
-  const loadPendingUsers = async () => {
+  const loadPendingUsers = async (cursor = null) => {
     const token = localStorage.getItem('token');
     const pending = await axios.get(`${API_BASE}/api/pending-users`, {
+      params: cursor ? { cursor } : {},
       headers: { Authorization: `Bearer ${token}` }
     });
-    setPendingUsers(pending.data);
+    const { items = [], next_cursor = null, total = 0 } = pending.data || {};
+    setPendingUsers(prev => (cursor ? [...prev, ...items] : items));
+    setPendingCursor(next_cursor);
+    setPendingTotal(total);
+    if (!cursor) setSelectedPending(new Set());
   };
 
   const loadApprovedUsers = async () => {
@@ -91,18 +104,41 @@ function AdminPage() {
     setApprovedUsers(usersList.filter(u => u.uuid !== myUuid)); // 자기 자신 제외
   };
 
-  const loadPasswordResetRequests = async () => {
+  const loadPasswordResetRequests = async (cursor = null) => {
     try {
       const token = localStorage.getItem('token');
       const response = await axios.get(`${API_BASE}/api/admin/password-reset-requests`, {
+        params: cursor ? { cursor } : {},
         headers: { Authorization: `Bearer ${token}` }
       });
-      setPasswordResetRequests(response.data);
+      const { items = [], next_cursor = null, total = 0 } = response.data || {};
+      setPasswordResetRequests(prev => (cursor ? [...prev, ...items] : items));
+      setResetCursor(next_cursor);
+      setResetTotal(total);
+      if (!cursor) setSelectedResets(new Set());
     } catch (error) {
       console.error('❌ 비밀번호 재설정 요청 목록 로딩 실패:', error);
     }
   };
 
+  const loadStats = async () => {
+    try {
+      const token = localStorage.getItem('token');
+      const res = await axios.get(`${API_BASE}/api/admin/stats`, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      setStats(res.data);
+    } catch (error) {
+      console.error('❌ 메시지 통계 로딩 실패:', error);
+    }
+  };
+
+  const formatBytes = (bytes) => {
+    if (bytes >= 1024 * 1024 * 1024) return `${(bytes / (1024 * 1024 * 1024)).toFixed(1)}GB`;
+    if (bytes >= 1024 * 1024) return `${(bytes / (1024 * 1024)).toFixed(1)}MB`;
+    return `${Math.round(bytes / 1024)}KB`;
+  };
+
   const handleApprove = async (userId) => {
     const token = localStorage.getItem('token');
     try {
@@ -181,6 +217,50 @@ function AdminPage() {
     }
   };
 
+  const toggleSelected = (setter, id) => {
+    setter(prev => {
+      const next = new Set(prev);
+      if (next.has(id)) next.delete(id); else next.add(id);
+      return next;
+    });
+  };
+
+  // 선택한 항목 일괄 처리 (한 번의 요청)
+  const handleBulkUsers = async (action) => {
+    const token = localStorage.getItem('token');
+    const ids = [...selectedPending];
+    if (ids.length === 0) return;
+    if (!window.confirm(`선택한 ${ids.length}명을 ${action === 'approve' ? '승인' : '거절'}하시겠습니까?`)) return;
+    try {
+      const res = await axios.post(`${API_BASE}/api/admin/users/${action}`, { ids }, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      alert(`${res.data.updated}명 처리 완료`);
+      await loadPendingUsers();
+      if (action === 'approve') await loadApprovedUsers();
+    } catch (err) {
+      console.error('❌ 일괄 처리 실패:', err.response || err.message);
+      alert(err.response?.data?.error || '❌ 일괄 처리 실패');
+    }
+  };
+
+  const handleBulkResets = async (action) => {
+    const token = localStorage.getItem('token');
+    const ids = [...selectedResets];
+    if (ids.length === 0) return;
+    if (!window.confirm(`선택한 ${ids.length}건을 ${action === 'approve' ? '승인' : '거부'}하시겠습니까?`)) return;
+    try {
+      const res = await axios.post(`${API_BASE}/api/admin/password-reset/${action}`, { ids }, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      alert(`${res.data.updated}건 처리 완료`);
+      await loadPasswordResetRequests();
+    } catch (error) {
+      console.error('❌ 일괄 처리 실패:', error);
+      alert(error.response?.data?.error || '일괄 처리 중 오류가 발생했습니다.');
+    }
+  };
+
   const goToMain = () => navigate('/main');
 
   // 표시할 사용자 목록 (5명 제한 또는 전체)
@@ -195,15 +275,62 @@ function AdminPage() {
         <button onClick={goToMain} style={{ marginRight: '10px' }}>🏠 메인 페이지로 이동</button>
       </div>
 
+      {/* 0. 메시지 통계 (최근 30일, 주기적으로 집계된 값) */}
+      {stats && (
+        <section className="stats-section">
+          <h3>📊 메시지 통계 <span className="user-count">({stats.from} ~ {stats.to})</span></h3>
+          <p>
+            메시지 {stats.totals.messages.toLocaleString()}건 | 활성 사용자 {stats.totals.active_users}명 |
+            첨부파일 {stats.totals.files.toLocaleString()}개 ({formatBytes(stats.totals.file_bytes)})
+          </p>
+          <ul>
+            {stats.departments.slice(0, 10).map(d => (
+              <li key={d.department || '-'}>
+                <strong>{d.department || '부서 없음'}</strong> | 메시지 {d.messages.toLocaleString()}건
+              </li>
+            ))}
+          </ul>
+          <ul>
+            {stats.rooms.slice(0, 10).map(r => (
+              <li key={r.room}>
+                <strong>{r.name || r.room}</strong> | 메시지 {r.messages.toLocaleString()}건 | 첨부 {formatBytes(r.file_bytes)}
+              </li>
+            ))}
+          </ul>
+          {stats.updated_at && (
+            <span className="request-date">
+              집계 시각: {new Date(stats.updated_at + 'Z').toLocaleString('ko-KR')}
+            </span>
+          )}
+        </section>
+      )}
+
       {/* 1. 승인 대기 사용자 */}
       <section className="pending-section">
-        <h3>🕓 승인 대기 사용자</h3>
+        <h3>🕓 승인 대기 사용자 <span className="user-count">({pendingTotal}명)</span></h3>
         {pendingUsers.length === 0 ? (
           <p>대기 중인 사용자가 없습니다.</p>
         ) : (
+          <>
+          <div className="button-group">
+            <label>
+              <input
+                type="checkbox"
+                checked={selectedPending.size === pendingUsers.length}
+                onChange={e => setSelectedPending(e.target.checked ? new Set(pendingUsers.map(u => u.id)) : new Set())}
+              /> 전체 선택
+            </label>
+            <button disabled={selectedPending.size === 0} onClick={() => handleBulkUsers('approve')}>✅ 선택 승인 ({selectedPending.size})</button>
+            <button disabled={selectedPending.size === 0} onClick={() => handleBulkUsers('reject')}>❌ 선택 거절</button>
+          </div>
           <ul>
             {pendingUsers.map(user => (
               <li key={user.id}>
+                <input
+                  type="checkbox"
+                  checked={selectedPending.has(user.id)}
+                  onChange={() => toggleSelected(setSelectedPending, user.id)}
+                />
                 <strong>{user.name}</strong> ({user.username}) | {user.email}
                 <div className="button-group">
                   <button onClick={() => handleApprove(user.id)}>✅ 승인</button>
@@ -212,24 +339,45 @@ function AdminPage() {
               </li>
             ))}
           </ul>
+          {pendingCursor && (
+            <button className="show-more-btn" onClick={() => loadPendingUsers(pendingCursor)}>더보기</button>
+          )}
+          </>
         )}
       </section>
 
       {/* 2. 비밀번호 재설정 요청 */}
       <section className="password-reset-section">
-        <h3>🔒 비밀번호 재설정 요청</h3>
+        <h3>🔒 비밀번호 재설정 요청 <span className="user-count">({resetTotal}건)</span></h3>
         {passwordResetRequests.length === 0 ? (
           <p>비밀번호 재설정 요청이 없습니다.</p>
         ) : (
+          <>
+          <div className="button-group">
+            <label>
+              <input
+                type="checkbox"
+                checked={selectedResets.size === passwordResetRequests.length}
+                onChange={e => setSelectedResets(e.target.checked ? new Set(passwordResetRequests.map(r => r.id)) : new Set())}
+              /> 전체 선택
+            </label>
+            <button disabled={selectedResets.size === 0} onClick={() => handleBulkResets('approve')}>✅ 선택 승인 ({selectedResets.size})</button>
+            <button disabled={selectedResets.size === 0} onClick={() => handleBulkResets('reject')}>❌ 선택 거부</button>
+          </div>
           <ul>
             {passwordResetRequests.map(request => (
               <li key={request.id}>
+                <input
+                  type="checkbox"
+                  checked={selectedResets.has(request.id)}
+                  onChange={() => toggleSelected(setSelectedResets, request.id)}
+                />
                 <strong>{request.username}</strong> | {request.email}
                 <span className="request-info">
                   사번: {request.employee_id} | 부서: {request.department}
                 </span>
                 <span className="request-date">
-                  요청일: {new Date(request.created_at).toLocaleDateString('ko-KR')}
+                  요청일: {new Date(request.requested_at).toLocaleDateString('ko-KR')}
                 </span>
                 <div className="button-group">
                   <button onClick={() => handleApprovePasswordReset(request.id)}>✅ 승인</button>
@@ -238,6 +386,10 @@ function AdminPage() {
               </li>
             ))}
           </ul>
+          {resetCursor && (
+            <button className="show-more-btn" onClick={() => loadPasswordResetRequests(resetCursor)}>더보기</button>
+          )}
+          </>
         )}
       </section>
 
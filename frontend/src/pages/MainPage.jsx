@@ -140,7 +140,6 @@ function MainPage() {
     if (!token) return;
 
     socket.connect();
-    socket.emit('authenticate', { token });
 
     socket.on('user_list', (data) => {
       setOnlineUsers(data.map(u => u.uuid));
@@ -149,32 +148,39 @@ function MainPage() {
     socket.on('new_message', ({ sender_uuid, room_uuid }) => {
       console.log('새 메시지 수신:', { sender_uuid, room_uuid });
       
-      if (room_uuid) {
-        // 그룹 채팅 메시지인 경우 - 백엔드에서 실제 안 읽음 수를 계산하므로 fetchChatRooms만 호출
-        console.log('그룹 채팅 메시지 수신 - 채팅방 목록 갱신');
-        fetchChatRooms(); // 채팅방 목록 즉시 갱신 (백엔드에서 실제 안 읽음 수 계산)
-      } else {
+      // 채팅방 목록은 room_list_update 로 갱신됨 (그룹 안 읽음 수도 백엔드에서 계산)
+      if (!room_uuid) {
         // 1:1 채팅 메시지인 경우 - 기존 로직 유지
         setUnreadMap(prev => {
           const updated = { ...prev, [sender_uuid]: (prev[sender_uuid] || 0) + 1 };
           localStorage.setItem('unreadMap', JSON.stringify(updated));
           return updated;
         });
-        fetchChatRooms(); // 채팅방 목록 갱신
       }
     });
 
-    // 그룹 메시지 이벤트 - 백엔드에서 실제 안 읽음 수를 계산하므로 fetchChatRooms만 호출
-    socket.on('group_message', ({ room_uuid, sender_uuid }) => {
-      console.log('그룹 메시지 이벤트 수신:', { room_uuid, sender_uuid });
-      fetchChatRooms(); // 채팅방 목록 즉시 갱신 (백엔드에서 실제 안 읽음 수 계산)
+    // 채팅방 목록 변경분 - 바뀐 항목만 교체/삭제 (refresh 면 전체 재조회)
+    socket.on('room_list_update', ({ upsert = [], remove = [], refresh }) => {
+      if (refresh) {
+        fetchChatRooms();
+        return;
+      }
+      setChatRooms(prev => {
+        const changed = new Set([...upsert.map(r => r.uuid), ...remove]);
+        const rest = prev.filter(r => !changed.has(r.uuid));
+        return [...upsert, ...rest].sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
+      });
     });
 
+    // 연결이 밀려 서버가 이벤트를 버린 경우 → 목록 전체 재조회
+    socket.on('resync', fetchChatRooms);
+
     return () => {
       socket.disconnect();
       socket.off('user_list');
       socket.off('new_message');
-      socket.off('group_message');
+      socket.off('room_list_update');
+      socket.off('resync', fetchChatRooms);
     };
   }, [token, fetchChatRooms]);
 
@@ -275,19 +281,37 @@ function MainPage() {
     }
   };
   
-  // 검색 기능 추가
+  // 검색 기능 추가 - 이름 / 아이디는 서버 검색 (초성 지원, 예: 'ㄱㅊㅅ'), 부서 / 직급은 목록에서
   useEffect(() => {
-    if (searchQuery.trim() === '') {
+    const query = searchQuery.trim();
+    if (query === '') {
       setFilteredUsers([]);
-    } else {
-      const filtered = users.filter(user => 
-        user.name.toLowerCase().includes(searchQuery.toLowerCase()) ||
-        user.department.toLowerCase().includes(searchQuery.toLowerCase()) ||
-        user.position.toLowerCase().includes(searchQuery.toLowerCase())
-      );
-      setFilteredUsers(filtered);
+      return;
     }
-  }, [searchQuery, users]);
+    const local = users.filter(user =>
+      user.name.toLowerCase().includes(query.toLowerCase()) ||
+      (user.department || '').toLowerCase().includes(query.toLowerCase()) ||
+      (user.position || '').toLowerCase().includes(query.toLowerCase())
+    );
+    setFilteredUsers(local);
+
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      axios.get(`${API_BASE}/api/users/search`, {
+        params: { q: query },
+        headers: { Authorization: `Bearer ${token}` }
+      }).then(res => {
+        if (cancelled || !Array.isArray(res.data)) return;
+        const seen = new Set(res.data.map(u => u.uuid));
+        setFilteredUsers([...res.data, ...local.filter(u => !seen.has(u.uuid))]);
+      }).catch(err => console.error('사용자 검색 실패:', err));
+    }, 200);
+
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchQuery, users, token]);
 
   const clearSearch = () => {
     setSearchQuery('');
@@ -34,23 +34,20 @@ function MessagePage() {
 
     const fetchAll = async () => {
       try {
-        const res = await axios.get(`${API_BASE}/api/users`, {
-          headers: { Authorization: `Bearer ${token}` }
-        });
+        if (targetUuid) {
+          // 1:1 대화는 나와 상대방 정보만 조회 (전체 사용자 목록 X)
+          const res = await axios.get(`${API_BASE}/api/users`, {
+            params: { uuids: `${uuid},${targetUuid}` },
+            headers: { Authorization: `Bearer ${token}` }
+          });
 
-        console.log('API 응답 데이터:', res.data); // 디버깅용
-        
-        // API 응답이 배열인지 확인하고 안전하게 처리
-        const usersList = Array.isArray(res.data) ? res.data : 
-                         (res.data.users && Array.isArray(res.data.users)) ? res.data.users : [];
-        
-        console.log('처리된 사용자 목록:', usersList); // 디버깅용
-        setUsers(usersList);
+          // API 응답이 배열인지 확인하고 안전하게 처리
+          const usersList = Array.isArray(res.data) ? res.data : [];
+          setUsers(usersList);
 
-        const me = usersList.find(u => u.uuid === uuid);
-        if (me) setMyName(me.name);
+          const me = usersList.find(u => u.uuid === uuid);
+          if (me) setMyName(me.name);
 
-        if (targetUuid) {
           const targetUser = usersList.find(u => u.uuid === targetUuid);
           if (targetUser) {
             setSelectedUser(targetUser);
@@ -71,6 +68,10 @@ function MessagePage() {
           });
 
           const { members = [], messages: msgs = [] } = roomRes.data || {};
+          // 그룹 채팅은 멤버 목록으로 보낸 사람 이름 표시
+          setUsers(members);
+          const me = members.find(m => m.uuid === uuid);
+          if (me) setMyName(me.name);
           setSelectedUser({
             uuid: null, // 그룹 채팅에서는 uuid를 사용하지 않음
             name: members.map(m => m.name).join(', ') + ' 그룹채팅',
@@ -94,7 +95,6 @@ function MessagePage() {
     if (!token) return;
 
     socket.connect();
-    socket.emit('authenticate', { token });
 
     const handleIncomingMessage = (msg) => {
       if (
@@ -113,10 +113,42 @@ function MessagePage() {
       }
     };
 
+    // 다른 사용자 / 다른 기기에서 삭제된 메시지 반영
+    const handleMessageDeleted = ({ message_id }) => {
+      setMessages(prev => prev.filter(m => m.message_id !== message_id));
+    };
+
+    // 연결이 밀려 서버가 이벤트를 버린 경우 → 현재 대화 메시지 다시 조회
+    const handleResync = async () => {
+      try {
+        if (roomUuid) {
+          const roomRes = await axios.get(`${API_BASE}/api/chat-rooms/${roomUuid}`, {
+            headers: { Authorization: `Bearer ${token}` }
+          });
+          const msgs = roomRes.data?.messages;
+          setMessages(Array.isArray(msgs) ? msgs : []);
+        } else if (selectedUser?.uuid) {
+          const msgRes = await axios.get(`${API_BASE}/api/messages/${selectedUser.uuid}`, {
+            headers: { Authorization: `Bearer ${token}` }
+          });
+          const messagesList = Array.isArray(msgRes.data) ? msgRes.data :
+                             (msgRes.data.messages && Array.isArray(msgRes.data.messages)) ? msgRes.data.messages : [];
+          setMessages(messagesList);
+        }
+        scrollToBottom();
+      } catch (err) {
+        console.error('메시지 재동기화 실패', err);
+      }
+    };
+
     socket.on('chat', handleIncomingMessage);
+    socket.on('message_deleted', handleMessageDeleted);
+    socket.on('resync', handleResync);
 
     return () => {
       socket.off('chat', handleIncomingMessage);
+      socket.off('message_deleted', handleMessageDeleted);
+      socket.off('resync', handleResync);
       socket.disconnect();
     };
   }, [token, selectedUser, myUuid, roomUuid]); // roomUuid 의존성 추가
@@ -359,12 +391,7 @@ function MessagePage() {
       // 삭제 성공 후 메뉴 숨기기
       setShowDeleteMenu(null);
       
-      // 소켓으로 삭제 알림 전송 (다른 사용자들에게 실시간 반영)
-      socket.emit('message_deleted', {
-        message_id: messageId,
-        room_uuid: roomUuid,
-        target_uuid: !roomUuid ? selectedUser?.uuid : undefined
-      });
+      // 다른 사용자에게는 서버가 message_deleted 이벤트로 전달
       
       console.log('메시지가 삭제되었습니다.');
       
@@ -47,6 +47,8 @@ function Mypage() {
         headers: { Authorization: `Bearer ${token}` }
       });
 
+      // 기존 토큰은 폐기되므로 새로 받은 토큰으로 교체
+      if (res.data.token) localStorage.setItem('token', res.data.token);
       alert(res.data.message || '비밀번호 변경 성공');
       setCurrentPassword('');
       setNewPassword('');
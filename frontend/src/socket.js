@@ -1,8 +1,68 @@
 import { io } from 'socket.io-client';
+import { COMPACT_HANDSHAKE, decodeFrame } from './compact';
 
+// 연결 handshake 에서 인증 + 이벤트 인코딩 협상 (재연결할 때마다 저장된 최신 토큰으로)
 const socket = io('http://localhost:5050', {
     autoConnect: false,
-    transports: ['websocket']
+    transports: ['websocket'],
+    auth: (cb) => cb({ token: localStorage.getItem('token'), ...COMPACT_HANDSHAKE })
+});
+
+// 토큰이 거절된 경우 (만료 / 비밀번호 변경으로 폐기) - 서버가 연결을 받지 않으므로 재연결하지 않음
+socket.on('connect_error', (err) => {
+    console.warn('소켓 연결 실패', err.message);
+    // 서버가 거절한 연결은 자동 재연결하지 않으므로, 인증 요청 제한이면 안내된 시간 뒤 다시 연결
+    if (err.message === 'rate_limited' && !socket.active) {
+        setTimeout(() => socket.connect(), Math.ceil((err.data?.retry_after || 1) * 1000));
+    }
+});
+
+const dispatch = (events) => {
+    events.forEach(([event, data]) => {
+        if (event === 'delivery') {
+            handleDelivery(data);
+        } else {
+            socket.listeners(event).forEach((handler) => handler(data));
+        }
+    });
+};
+
+// 서버가 한 사용자에게 보낼 이벤트를 묶어서 보낸 경우 ([[event, data], ...]) → 각 이벤트 핸들러로 전달
+socket.on('bundle', dispatch);
+
+// 서버가 전송 확인(ack)을 기다리는 메시지 ({ id, events: [[event, data], ...] })
+// ack 가 늦으면 서버가 같은 id 로 다시 보내므로 최근 id 는 한 번만 처리
+const seenDeliveries = new Set();
+const MAX_SEEN_DELIVERIES = 500;
+
+function handleDelivery({ id, events }) {
+    if (seenDeliveries.has(id)) return;
+    seenDeliveries.add(id);
+    if (seenDeliveries.size > MAX_SEEN_DELIVERIES) {
+        seenDeliveries.delete(seenDeliveries.values().next().value);
+    }
+    dispatch(events);
+}
+
+socket.on('delivery', (data, ack) => {
+    handleDelivery(data);
+    if (typeof ack === 'function') ack(data.id);
+});
+
+// 압축 전송 (MessagePack frame, 짧은 시간 모은 이벤트) → 풀어서 전달, 안에 든 delivery 는 frame ack 로 한 번에 확인
+socket.on('frame', (buffer, ack) => {
+    try {
+        dispatch(decodeFrame(buffer));
+    } catch (err) {
+        console.error('소켓 frame 해석 실패', err);
+        return;
+    }
+    if (typeof ack === 'function') ack();
+});
+
+// 이벤트를 너무 빨리 보내 서버가 버린 경우
+socket.on('rate_limited', ({ event, retry_after }) => {
+    console.warn(`요청 제한: ${event} (${retry_after}초 후 다시 시도)`);
 });
 
 export default socket;
\ No newline at end of file